@@ -0,0 +1,99 @@
+"""Compare the list-of-dicts analytics helpers with the columnar versions.
+
+Generates synthetic in-memory transactions (the records the main window
+keeps), runs the original per-function passes and the TransactionColumns
+reductions, checks they agree to the paise and prints timings.
+
+    python -m benchmarks.bench_analytics [rows]
+"""
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+from utils.achievements import check_achievements
+from utils.analytics import NUMPY_AVAILABLE, TransactionColumns
+from utils.heatmap import get_daily_spending
+
+CATEGORIES = ['Food', 'Transport', 'Shopping', 'Bills', 'Entertainment', 'Health', 'Salary', 'Other']
+
+
+def synthetic_records(count, seed=11):
+    rng = random.Random(seed)
+    start = date.today() - timedelta(days=3 * 365)
+    days = [(start + timedelta(days=offset)).isoformat() for offset in range(3 * 365)]
+    return [{
+        "date": rng.choice(days),
+        "type": "Income" if rng.random() < 0.1 else "Expense",
+        "amount": round(rng.uniform(10, 5000), 2),
+        "category": rng.choice(CATEGORIES),
+        "notes": "",
+    } for _ in range(count)]
+
+
+# The row-at-a-time implementations these helpers replaced
+def category_totals_rows(transactions):
+    # Former predict_expenses body
+    predictions = {}
+    for cat in set(t["category"] for t in transactions):
+        predictions[cat] = sum(t["amount"] for t in transactions if t["category"] == cat)
+    return predictions
+
+
+def get_daily_spending_rows(transactions):
+    daily = {}
+    for t in transactions:
+        daily.setdefault(t["date"], 0)
+        if t["type"] == "Expense":
+            daily[t["date"]] += t["amount"]
+    return daily
+
+
+def savings_rows(transactions):
+    return sum(t["amount"] for t in transactions if t["type"] == "Income") - \
+           sum(t["amount"] for t in transactions if t["type"] == "Expense")
+
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+def same_to_paise(a, b):
+    return a.keys() == b.keys() and all(round(a[key] * 100) == round(b[key] * 100) for key in a)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    records = synthetic_records(count)
+    print(f"{count} rows, numpy {'available' if NUMPY_AVAILABLE else 'not installed (pure Python fallback)'}")
+
+    old_categories, t_categories = timed(category_totals_rows, records)
+    old_daily, t_daily = timed(get_daily_spending_rows, records)
+    old_savings, t_savings = timed(savings_rows, records)
+    row_total = t_categories + t_daily + t_savings
+
+    columns, t_load = timed(TransactionColumns, records)
+    new_categories, c_categories = timed(TransactionColumns.category_totals, columns)
+    new_daily, c_daily = timed(get_daily_spending, columns)
+    _, c_achievements = timed(check_achievements, columns)
+    totals = columns.type_totals()
+    new_savings = totals.get("Income", 0) - totals.get("Expense", 0)
+    column_total = t_load + c_categories + c_daily + c_achievements
+
+    print(f"{'':<20}{'rows':>10}{'columnar':>10}")
+    print(f"{'load columns':<20}{'':>10}{t_load:>9.3f}s")
+    print(f"{'category totals':<20}{t_categories:>9.3f}s{c_categories:>9.3f}s")
+    print(f"{'get_daily_spending':<20}{t_daily:>9.3f}s{c_daily:>9.3f}s")
+    print(f"{'check_achievements':<20}{t_savings:>9.3f}s{c_achievements:>9.3f}s")
+    print(f"{'total':<20}{row_total:>9.3f}s{column_total:>9.3f}s  ({row_total / column_total:.1f}x)")
+
+    ok = (same_to_paise(old_categories, new_categories) and same_to_paise(old_daily, new_daily)
+          and round(old_savings * 100) == round(new_savings * 100))
+    print("results match" if ok else "RESULTS DIFFER")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
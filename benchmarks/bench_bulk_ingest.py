@@ -0,0 +1,71 @@
+"""Compare row-by-row and bulk transaction ingest.
+
+Run from the project root against the database in config.py:
+
+    python -m benchmarks.bench_bulk_ingest [rows]
+
+A throwaway user is created for the run and deleted afterwards.
+"""
+import random
+import sys
+import time
+import uuid
+from datetime import date, timedelta
+
+from database.db_manager import DBManager
+
+MERCHANTS = ['Swiggy order', 'Uber trip', 'Amazon purchase', 'Netflix subscription',
+             'Electricity bill', 'Pharmacy', 'Cafe coffee', 'Metro card recharge']
+
+
+def synthetic_rows(count, seed=42):
+    rng = random.Random(seed)
+    start = date.today() - timedelta(days=365)
+    return [{
+        'type': 'expense',
+        'amount': round(rng.uniform(20, 5000), 2),
+        'description': f"{rng.choice(MERCHANTS)} #{i}",
+        'transaction_date': start + timedelta(days=rng.randrange(365)),
+    } for i in range(count)]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    db = DBManager()
+    if not db.connect():
+        sys.exit(1)
+
+    username = f"bench_{uuid.uuid4().hex[:8]}"
+    if not db.create_user(username, "bench"):
+        sys.exit(1)
+    user_id = db.execute_query("SELECT id FROM Users WHERE username = %s", (username,), fetch_results=True)[0][0]
+    db.current_user_id = user_id
+
+    try:
+        rows = synthetic_rows(count)
+        half = count // 2
+
+        started = time.perf_counter()
+        for row in rows[:half]:
+            db.add_transaction_with_smart_features(user_id, row['type'], row['amount'], None,
+                                                   row['description'], row['transaction_date'])
+        row_elapsed = time.perf_counter() - started
+
+        started = time.perf_counter()
+        summary = db.add_transactions_bulk(user_id, rows[half:])
+        bulk_elapsed = time.perf_counter() - started
+
+        print(f"row-by-row: {half} rows in {row_elapsed:.2f}s ({half / row_elapsed:.0f} rows/s)")
+        print(f"bulk:       {count - half} rows in {bulk_elapsed:.2f}s "
+              f"({(count - half) / bulk_elapsed:.0f} rows/s), inserted={summary['inserted']} "
+              f"duplicates={summary['duplicates']} invalid={summary['invalid']}")
+        print(f"speedup:    {(row_elapsed / half) / (bulk_elapsed / (count - half)):.1f}x")
+    finally:
+        db.execute_query("DELETE FROM FinancialInsights WHERE user_id = %s", (user_id,))
+        db.execute_query("DELETE FROM Transactions WHERE user_id = %s", (user_id,))
+        db.execute_query("DELETE FROM Users WHERE id = %s", (user_id,))
+        db.disconnect()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""Year view of the calendar heatmap from the daily array against re-aggregating.
+
+Builds ``rows`` expense and income records over five years, then times:
+
+- re-aggregating per render: summing the records per day (get_daily_spending)
+  and coloring a year's days with get_heat_color
+- building a HeatmapEngine from the same records once
+- HeatmapEngine.year_view and colors_between for one calendar page
+- one incremental add and remove, followed by a fresh year view
+
+and checks that the engine's daily totals match the re-aggregated ones.
+
+    python -m benchmarks.bench_heatmap [rows]
+"""
+import random
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+
+from utils.heatmap import HeatmapEngine, get_daily_spending, get_heat_color
+
+
+def make_records(rows, seed=5):
+    rng = random.Random(seed)
+    start = date.today() - timedelta(days=5 * 365)
+    return [{"date": (start + timedelta(days=rng.randrange(5 * 365))).isoformat(),
+             "type": rng.choice(["Expense", "Expense", "Income"]),
+             "amount": round(rng.uniform(5, 2500), 2), "category": "Food", "notes": "", "tags": []}
+            for _ in range(rows)]
+
+
+def median_ms(call, repeat=7):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        call()
+        times.append((time.perf_counter() - started) * 1000)
+    return statistics.median(times)
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    records = make_records(rows)
+    year = date.today().year - 1
+
+    def rerender():
+        daily = get_daily_spending(records)
+        first = date(year, 1, 1)
+        return {day: get_heat_color(daily.get(day.isoformat(), 0))
+                for day in (first + timedelta(days=offset) for offset in range(365))}
+
+    print(f"{rows} records over five years, year view of {year}")
+    print(f"re-aggregate per render:   {median_ms(rerender, 3):9.1f}ms")
+    started = time.perf_counter()
+    engine = HeatmapEngine.from_transactions(records)
+    print(f"build engine once:         {(time.perf_counter() - started) * 1000:9.1f}ms")
+    print(f"engine year view:          {median_ms(lambda: engine.year_view(year)):9.3f}ms")
+    first = date(year, 6, 1)
+    print(f"engine calendar page:      {median_ms(lambda: engine.colors_between(first - timedelta(days=14), first + timedelta(days=45))):9.3f}ms")
+
+    def edit():
+        engine.add(date(year, 6, 15), 420)
+        engine.remove(date(year, 6, 15), 420)
+        engine.year_view(year)
+    print(f"add + remove + year view:  {median_ms(edit):9.3f}ms")
+
+    for day, total in get_daily_spending(records).items():
+        if abs(engine.total(day) - total) > 0.01:
+            print(f"MISMATCH on {day}: {engine.total(day)} != {total}")
+            sys.exit(1)
+    print(f"breaks (paise): {engine.breaks()}")
+
+
+if __name__ == '__main__':
+    main()
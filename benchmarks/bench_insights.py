@@ -0,0 +1,104 @@
+"""Time the nightly insight job over many synthetic users.
+
+Builds a throwaway SQLite database with users, categories, budgets, two
+months of MonthlyAggregates and a backlog of expired insights, then times:
+
+- per-user generation (one user per call, as generate_spending_insights does)
+- the set-based generate_insights_for_users pass over everyone
+- a second pass, to show upserts keep FinancialInsights from growing
+- prune_expired_insights
+
+    python -m benchmarks.bench_insights [users]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from database.db_manager import DBManager
+
+CATEGORIES = ['Food & Dining', 'Transportation', 'Shopping', 'Entertainment', 'Bills & Utilities']
+
+
+def seed(db, users, seed=7):
+    rng = random.Random(seed)
+    now = datetime.now()
+    months = [(now.year, now.month), (now.year, now.month - 1) if now.month > 1 else (now.year - 1, 12)]
+    with db.transaction() as cursor:
+        cursor.executemany("INSERT INTO Users (id, username, hashed_password) VALUES (%s, %s, %s)",
+                           [(user_id, f"bench_{user_id}", "x") for user_id in range(1, users + 1)])
+        categories, aggregates, budgets, stale = [], [], [], []
+        category_id = 0
+        for user_id in range(1, users + 1):
+            for name in CATEGORIES:
+                category_id += 1
+                categories.append((category_id, user_id, name, 'expense'))
+                for year, month in months:
+                    aggregates.append((user_id, year, month, category_id, 'expense',
+                                       round(rng.uniform(500, 8000), 2), rng.randint(1, 40)))
+                if rng.random() < 0.4:
+                    budgets.append((user_id, category_id, round(rng.uniform(1000, 6000), 2),
+                                    now.date().replace(day=1), now.date() + timedelta(days=30)))
+            stale.append((user_id, 'suggestion', 'Old tip', 'Expired', 'low', '{}', '2000-01',
+                          now - timedelta(days=1)))
+        cursor.executemany("INSERT INTO Categories (id, user_id, name, type) VALUES (%s, %s, %s, %s)",
+                           categories)
+        cursor.executemany("""
+            INSERT INTO MonthlyAggregates (user_id, year, month, category_id, type, total_amount, transaction_count)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)""", aggregates)
+        cursor.executemany("""
+            INSERT INTO Budgets (user_id, category_id, monthly_limit, start_date, end_date)
+            VALUES (%s, %s, %s, %s, %s)""", budgets)
+        cursor.executemany("""
+            INSERT INTO FinancialInsights (user_id, insight_type, title, description, priority, data, period,
+                                           expires_at)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)""", stale)
+
+
+def insight_count(db):
+    return db.execute_query("SELECT COUNT(*) FROM FinancialInsights", fetch_results=True)[0][0]
+
+
+def main():
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    directory = tempfile.mkdtemp(prefix="walletwhiz_bench_")
+    db = DBManager({'backend': 'sqlite', 'sqlite': {'path': os.path.join(directory, 'insights.db')}})
+    if not db.connect():
+        sys.exit(1)
+    try:
+        started = time.perf_counter()
+        seed(db, users)
+        print(f"seeded {users} users in {time.perf_counter() - started:.1f}s")
+
+        sample = list(range(1, min(users, 500) + 1))
+        started = time.perf_counter()
+        for user_id in sample:
+            db.generate_spending_insights(user_id)
+        per_user = (time.perf_counter() - started) / len(sample)
+        print(f"per-user:   {per_user * 1000:.2f}ms/user, ~{per_user * users:.1f}s for {users} users")
+
+        started = time.perf_counter()
+        written = db.generate_insights_for_users()
+        elapsed = time.perf_counter() - started
+        print(f"set-based:  {written} insights for {users} users in {elapsed:.2f}s "
+              f"({elapsed / users * 1000:.3f}ms/user, {per_user * users / elapsed:.1f}x)")
+
+        before = insight_count(db)
+        db.generate_insights_for_users()
+        print(f"re-run:     FinancialInsights rows {before} -> {insight_count(db)}")
+
+        started = time.perf_counter()
+        pruned = db.prune_expired_insights()
+        print(f"prune:      {pruned} expired rows in {time.perf_counter() - started:.2f}s, "
+              f"{insight_count(db)} left")
+    finally:
+        db.disconnect()
+        for name in os.listdir(directory):
+            os.remove(os.path.join(directory, name))
+        os.rmdir(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""Measure the memory held by in-memory transaction histories.
+
+Builds the same synthetic transactions three ways and reports what
+tracemalloc attributes to each: plain dicts (as the window used to keep
+them, with a fresh date/category string and tags list per row), Transaction
+objects, and one TransactionArray.
+
+    python -m benchmarks.bench_memory [rows]
+"""
+import gc
+import random
+import sys
+import tracemalloc
+from datetime import date, timedelta
+
+from models.transaction import Transaction, TransactionArray
+
+CATEGORIES = ['Food', 'Transport', 'Shopping', 'Bills', 'Entertainment', 'Health', 'Salary', 'Other']
+NOTES = ['', '', '', 'Lunch #food', 'Cab to office', 'Groceries #home', 'Movie night']
+
+
+def synthetic_values(count, seed=5):
+    rng = random.Random(seed)
+    start = date.today() - timedelta(days=3 * 365)
+    for _ in range(count):
+        day = start + timedelta(days=rng.randrange(3 * 365))
+        notes = rng.choice(NOTES)
+        # join() builds a new string per row, like values read from widgets or CSV files
+        yield (day, "".join(["Ex", "pense"]) if rng.random() < 0.9 else "".join(["In", "come"]),
+               round(rng.uniform(10, 5000), 2), "".join(rng.choice(CATEGORIES)), notes,
+               [word[1:] for word in notes.split() if word.startswith("#")])
+
+
+def as_dicts(count):
+    return [{"id": i, "date": day.isoformat(), "type": kind, "amount": amount, "category": category,
+             "notes": notes, "tags": tags}
+            for i, (day, kind, amount, category, notes, tags) in enumerate(synthetic_values(count))]
+
+
+def iter_transactions(count):
+    for i, (day, kind, amount, category, notes, tags) in enumerate(synthetic_values(count)):
+        yield Transaction(day, kind, amount, category, notes, tags, i)
+
+
+def as_transactions(count):
+    return list(iter_transactions(count))
+
+
+def as_array(count):
+    return TransactionArray(iter_transactions(count))
+
+
+def measure(build, count):
+    gc.collect()
+    tracemalloc.start()
+    held = build(count)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del held
+    return current, peak
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    print(f"{count} transactions")
+    baseline = None
+    for label, build in (("dicts", as_dicts), ("Transaction", as_transactions), ("TransactionArray", as_array)):
+        current, peak = measure(build, count)
+        baseline = baseline or current
+        print(f"{label:<18}{current / 2**20:>8.1f} MiB held  {current / count:>6.0f} B/row  "
+              f"peak {peak / 2**20:>7.1f} MiB  ({baseline / current:.1f}x smaller than dicts)")
+
+
+if __name__ == '__main__':
+    main()
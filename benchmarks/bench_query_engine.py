@@ -0,0 +1,91 @@
+"""Per-stage timings of QueryEngine questions against scanning the records.
+
+Seeds one user with ``rows`` expense and income transactions over three
+years in a throwaway SQLite database (MonthlyAggregates rebuilt from them),
+then asks a fixed set of questions several times each. Prints, per
+question, the median parse/plan/execute times, the source the plan read,
+and the time the in-memory evaluation of the same plan (the Python loop
+analyze_expenses falls back to) takes over the same rows.
+
+    python -m benchmarks.bench_query_engine [rows]
+"""
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+from benchmarks.bench_restore import open_db
+from utils.query_engine import QueryEngine, QueryPlan, run_in_memory
+
+QUESTIONS = [
+    "How much did I spend on travel in June?",
+    "top 3 categories last quarter",
+    "how many transactions on food this year",
+    "average expense on shopping last month",
+    "monthly average food spending this year",
+    "spending by month in 2025",
+    "largest expense last 30 days",
+    "how much did I earn last 6 months",
+    "spent last 10 days",
+]
+
+
+def seed(db, user_id, rows, seed=3):
+    rng = random.Random(seed)
+    categories = {name: (category_id, kind) for category_id, name, kind in db.get_categories(user_id)}
+    names = list(categories)
+    start = date.today() - timedelta(days=3 * 365)
+    records = []
+    with db.transaction() as cursor:
+        for offset in range(0, rows, 50_000):
+            batch = []
+            for _ in range(min(50_000, rows - offset)):
+                name = rng.choice(names)
+                category_id, kind = categories[name]
+                day = start + timedelta(days=rng.randrange(3 * 365))
+                amount = round(rng.uniform(5, 800), 2)
+                batch.append((user_id, kind, amount, category_id, "bench", day))
+                records.append({"type": kind, "amount": amount, "category": name, "date": day.isoformat()})
+            cursor.executemany("""
+                INSERT INTO Transactions (user_id, type, amount, category_id, description, transaction_date)
+                VALUES (%s, %s, %s, %s, %s, %s)""", batch)
+    db.rebuild_monthly_aggregates(user_id)
+    return records
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    repeat = 7
+    db = open_db(os.path.join(tempfile.mkdtemp(prefix="walletwhiz_bench_"), 'questions.db'))
+    db.create_user('questions', 'x')
+    user_id = db.authenticate_user('questions', 'x')
+    started = time.perf_counter()
+    records = seed(db, user_id, rows)
+    print(f"seeded {rows} transactions in {time.perf_counter() - started:.1f}s")
+
+    engine = QueryEngine(db, user_id)
+    print(f"{'question':44} {'source':>12} {'parse':>8} {'plan':>8} {'execute':>8} {'scan':>9}")
+    for text in QUESTIONS:
+        results = [engine.ask(text) for _ in range(repeat)]
+        plan = results[0]["plan"]
+        medians = [statistics.median(result["timings"][stage] for result in results)
+                   for stage in ("parse", "plan", "execute")]
+        memory_plan = QueryPlan(plan.question, plan.date_from, plan.date_to, plan.categories, [],
+                                plan.unmatched, "memory")
+        started = time.perf_counter()
+        value, rows_ = run_in_memory(memory_plan, records)
+        scan_ms = (time.perf_counter() - started) * 1000
+        if value != results[0]["value"] and not (value and abs(value - results[0]["value"]) < 0.01):
+            print(f"MISMATCH for {text!r}: {results[0]['value']} != {value}")
+            sys.exit(1)
+        print(f"{text[:44]:44} {plan.source:>12} {medians[0]:6.3f}ms {medians[1]:6.3f}ms "
+              f"{medians[2]:6.2f}ms {scan_ms:7.1f}ms")
+        print(f"    {results[0]['answer'][:100]}")
+    db.disconnect()
+
+
+if __name__ == '__main__':
+    main()
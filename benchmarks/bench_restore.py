@@ -0,0 +1,118 @@
+"""Back up and restore a large synthetic account, reporting throughput and memory.
+
+Seeds one user with ``rows`` transactions in a throwaway SQLite database,
+writes a full snapshot plus one incremental (after updating 1% of the rows)
+with BackupEngine, then restores the chain into a fresh database with
+restore_backup in a child process, whose peak RSS is reported next to what
+holding every parsed row at once (as the old json.load restore did) would take.
+
+    python -m benchmarks.bench_restore [rows]
+"""
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+from database.db_manager import DBManager
+from utils.backup import BackupEngine, LocalDirectoryTarget
+from utils.restore import restore_backup
+
+
+def seed(db, user_id, rows, seed=9):
+    rng = random.Random(seed)
+    categories = [row[0] for row in db.get_categories(user_id) if row[2] == 'expense']
+    start = date.today() - timedelta(days=3 * 365)
+    with db.transaction() as cursor:
+        for offset in range(0, rows, 50_000):
+            batch = []
+            for _ in range(min(50_000, rows - offset)):
+                day = start + timedelta(days=rng.randrange(3 * 365))
+                # Entered on the day, so only the edits below are newer than the full snapshot
+                batch.append((user_id, 'expense', round(rng.uniform(10, 5000), 2), rng.choice(categories),
+                              f"Merchant {rng.randrange(5000)}", day, None if rng.random() < 0.7 else "note",
+                              f"{day} 12:00:00", f"{day} 12:00:00"))
+            cursor.executemany("""
+                INSERT INTO Transactions (user_id, type, amount, category_id, description, transaction_date, notes,
+                                          created_at, updated_at)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)""", batch)
+
+
+def peak_rss_kib():
+    # ru_maxrss survives fork+exec on Linux (a child starts at its parent's peak); VmHWM is reset by exec
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def open_db(path):
+    db = DBManager({'backend': 'sqlite', 'sqlite': {'path': path}})
+    if not db.connect():
+        sys.exit(1)
+    return db
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    directory = tempfile.mkdtemp(prefix="walletwhiz_bench_")
+    source = open_db(os.path.join(directory, 'source.db'))
+    source.create_user('source', 'x')
+    user_id = source.authenticate_user('source', 'x')
+
+    started = time.perf_counter()
+    seed(source, user_id, rows)
+    print(f"seeded {rows} transactions in {time.perf_counter() - started:.1f}s")
+
+    target = LocalDirectoryTarget(os.path.join(directory, 'backups'))
+    engine = BackupEngine(source, user_id, target)
+    started = time.perf_counter()
+    full = engine.run(full=True)
+    elapsed = time.perf_counter() - started
+    print(f"full backup:        {elapsed:.1f}s ({rows / elapsed:,.0f} rows/s), {full['bytes'] / 2 ** 20:.1f} MiB")
+    time.sleep(1.1)   # updated_at has one-second resolution
+    ids = source.execute_query("SELECT id FROM Transactions WHERE user_id = %s", (user_id,), fetch_results=True)
+    with source.transaction() as cursor:
+        cursor.executemany("UPDATE Transactions SET notes = 'edited' WHERE id = %s", ids[::100])
+    started = time.perf_counter()
+    incremental = engine.run()
+    print(f"incremental backup: {time.perf_counter() - started:.1f}s, "
+          f"{incremental['tables']['Transactions']['rows']} rows, {incremental['bytes'] / 2 ** 10:.0f} KiB")
+    source.disconnect()
+
+    # In a fresh process, so its peak RSS is the restore's and not the seeding's
+    child = subprocess.run([sys.executable, '-m', 'benchmarks.bench_restore', '--restore', directory, str(user_id)])
+    sys.exit(child.returncode)
+
+
+def restore(directory, source_user_id):
+    restored = open_db(os.path.join(directory, 'restored.db'))
+    restored.create_user('restored', 'x')
+    user_id = restored.authenticate_user('restored', 'x')
+    before = peak_rss_kib()
+    result = restore_backup(restored, source_user_id, user_id, LocalDirectoryTarget(os.path.join(directory, 'backups')))
+    peak = peak_rss_kib()
+    restored.disconnect()
+
+    rows = sum(result['rows'].values())
+    print(f"restore:            {result['seconds']:.1f}s ({result['rows_per_second']:,.0f} rows/s) "
+          f"from {result['snapshots']} snapshots, verified={result['verified']}")
+    for problem in result['problems']:
+        print(f"  {problem}")
+    # A list of every row, as json.load built, costs roughly 1 KiB per row
+    print(f"peak RSS: {peak / 1024:.0f} MiB, {(peak - before) / 1024:.0f} MiB above the process before restoring "
+          f"(holding every row in memory: ~{rows / 1024:.0f} MiB)")
+    return result['verified']
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['--restore']:
+        sys.exit(0 if restore(sys.argv[2], int(sys.argv[3])) else 1)
+    main()
@@ -0,0 +1,103 @@
+"""Time DBManager.post_due_schedules over many recurring schedules.
+
+Builds a throwaway SQLite database with users, one template per schedule
+and a mix of daily/weekly/monthly/quarterly/yearly schedules. Most are due
+today, as in a daily run; CATCH_UP_SHARE are up to 60 days behind, as
+after the app was closed for a while. Then times:
+
+- the first run, which posts every missed occurrence
+- a second run, which must post nothing (schedules already advanced)
+- a run after rewinding next_occurrence, which must skip every
+  occurrence as already posted instead of posting it twice
+
+    python -m benchmarks.bench_scheduler [schedules] [batch size]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+from database.db_manager import DBManager
+
+SCHEDULES_PER_USER = 20
+CATCH_UP_SHARE = 0.2
+FREQUENCIES = ['daily', 'weekly', 'weekly', 'monthly', 'monthly', 'monthly', 'quarterly', 'yearly']
+
+
+def seed(db, schedules, today, seed=3):
+    rng = random.Random(seed)
+    users = max(1, schedules // SCHEDULES_PER_USER)
+    with db.transaction() as cursor:
+        cursor.executemany("INSERT INTO Users (id, username, hashed_password) VALUES (%s, %s, %s)",
+                           [(user_id, f"bench_{user_id}", "x") for user_id in range(1, users + 1)])
+        cursor.executemany("INSERT INTO Categories (id, user_id, name, type) VALUES (%s, %s, %s, %s)",
+                           [(user_id, user_id, 'Bills & Utilities', 'expense') for user_id in range(1, users + 1)])
+        templates, rows = [], []
+        for schedule_id in range(1, schedules + 1):
+            user_id = (schedule_id - 1) % users + 1
+            frequency = rng.choice(FREQUENCIES)
+            lag = rng.randint(1, 60) if rng.random() < CATCH_UP_SHARE else 0
+            next_occurrence = today - timedelta(days=lag)
+            templates.append((schedule_id, user_id, f"Bill {schedule_id}", 'expense',
+                              round(rng.uniform(99, 5000), 2), user_id, f"Autopay {schedule_id}"))
+            end_date = today - timedelta(days=rng.randint(0, 30)) if rng.random() < 0.05 else None
+            rows.append((schedule_id, user_id, schedule_id, frequency, next_occurrence - timedelta(days=365),
+                         end_date, next_occurrence))
+        cursor.executemany("""
+            INSERT INTO TransactionTemplates (id, user_id, name, type, amount, category_id, description)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)""", templates)
+        cursor.executemany("""
+            INSERT INTO RecurringSchedules (id, user_id, template_id, frequency, start_date, end_date, next_occurrence)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)""", rows)
+    return rows
+
+
+def transaction_count(db):
+    return db.execute_query("SELECT COUNT(*) FROM Transactions", fetch_results=True)[0][0]
+
+
+def report(label, stats):
+    rate = stats['schedules'] / stats['seconds'] if stats['seconds'] else 0
+    print(f"{label:<10} {stats['schedules']:>7} schedules  {stats['posted']:>7} posted  "
+          f"{stats['skipped']:>7} skipped  {stats['deactivated']:>5} ended  "
+          f"{stats['seconds']:6.2f}s  ({rate:,.0f} schedules/s, "
+          f"{stats['posted'] / stats['seconds'] if stats['seconds'] else 0:,.0f} transactions/s)")
+
+
+def main():
+    schedules = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+    today = date.today()
+    directory = tempfile.mkdtemp(prefix="walletwhiz_bench_")
+    db = DBManager({'backend': 'sqlite', 'sqlite': {'path': os.path.join(directory, 'scheduler.db')}})
+    if not db.connect():
+        sys.exit(1)
+    try:
+        started = time.perf_counter()
+        rows = seed(db, schedules, today)
+        print(f"seeded {schedules} schedules in {time.perf_counter() - started:.1f}s")
+
+        first = db.post_due_schedules(today, batch_size)
+        report("first", first)
+        posted = transaction_count(db)
+
+        second = db.post_due_schedules(today, batch_size)
+        report("rerun", second)
+
+        with db.transaction() as cursor:
+            cursor.executemany("UPDATE RecurringSchedules SET next_occurrence = %s, is_active = TRUE WHERE id = %s",
+                               [(row[6], row[0]) for row in rows])
+        rewound = db.post_due_schedules(today, batch_size)
+        report("rewound", rewound)
+
+        ok = second['posted'] == 0 and rewound['posted'] == 0 and transaction_count(db) == posted
+        print("idempotent" if ok else "DUPLICATE POSTINGS")
+        sys.exit(0 if ok else 1)
+    finally:
+        db.disconnect()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+"""Latency of DBManager.search_transactions on a large synthetic account.
+
+Seeds one user with ``rows`` transactions in a throwaway SQLite database
+(descriptions, notes and locations drawn from Zipf-weighted vocabularies,
+so common words match many rows and rare ones few), then runs random
+searches: one or two words, prefixes, phrases, exclusions, some with a date
+range, amount range or category. Reports p50/p95/p99 for the first page
+through the FTS5 index and, on a sample, through the LIKE scan it replaces.
+
+    python -m benchmarks.bench_search [rows] [queries]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+from benchmarks.bench_restore import open_db
+
+MERCHANTS = ["starbucks", "amazon", "uber", "lyft", "walmart", "target", "costco", "netflix", "spotify", "shell",
+             "chevron", "safeway", "kroger", "ikea", "apple", "airbnb", "delta", "marriott", "chipotle", "subway"]
+WORDS = ["coffee", "groceries", "dinner", "lunch", "fuel", "ride", "airport", "subscription", "gift", "books",
+         "pharmacy", "rent", "utilities", "internet", "phone", "gym", "movie", "concert", "hotel", "flight",
+         "parking", "toll", "laundry", "repair", "insurance", "doctor", "dentist", "school", "daycare", "pets"]
+PLACES = ["downtown", "mall", "airport", "station", "market", "campus", "harbor", "uptown", "suburbs", "online"]
+
+
+def zipf_choice(rng, items):
+    return rng.choices(items, [1 / (rank + 1) for rank in range(len(items))])[0]
+
+
+def seed(db, user_id, rows, seed=5):
+    rng = random.Random(seed)
+    categories = [row[0] for row in db.get_categories(user_id) if row[2] == 'expense']
+    start = date.today() - timedelta(days=3 * 365)
+    with db.transaction() as cursor:
+        for offset in range(0, rows, 50_000):
+            batch = []
+            for _ in range(min(50_000, rows - offset)):
+                description = f"{zipf_choice(rng, MERCHANTS).title()} {zipf_choice(rng, WORDS)} #{rng.randrange(10_000)}"
+                notes = None if rng.random() < 0.6 else " ".join(zipf_choice(rng, WORDS) for _ in range(3))
+                location = None if rng.random() < 0.5 else zipf_choice(rng, PLACES)
+                batch.append((user_id, 'expense', round(rng.uniform(1, 2000), 2), rng.choice(categories),
+                              description, start + timedelta(days=rng.randrange(3 * 365)), notes, location))
+            cursor.executemany("""
+                INSERT INTO Transactions (user_id, type, amount, category_id, description, transaction_date,
+                                          notes, location)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)""", batch)
+    return categories
+
+
+def random_search(rng, categories):
+    """(text, filters) for one search as a user might type it"""
+    shape = rng.random()
+    if shape < 0.4:
+        text = rng.choice(MERCHANTS + WORDS)
+    elif shape < 0.6:
+        text = f"{rng.choice(MERCHANTS)} {rng.choice(WORDS)}"
+    elif shape < 0.75:
+        word = rng.choice(MERCHANTS + WORDS)
+        text = word[:rng.randint(2, max(2, len(word) - 1))]
+    elif shape < 0.9:
+        text = f'"{rng.choice(WORDS)} {rng.choice(WORDS)}"'
+    else:
+        text = f"{rng.choice(MERCHANTS)} -{rng.choice(WORDS)}"
+    filters = {}
+    if rng.random() < 0.3:
+        date_from = date.today() - timedelta(days=rng.randrange(3 * 365))
+        filters.update(date_from=date_from, date_to=date_from + timedelta(days=rng.choice([7, 30, 90])))
+    if rng.random() < 0.2:
+        filters.update(min_amount=rng.choice([50, 200, 500]))
+    if rng.random() < 0.2:
+        filters.update(category_id=rng.choice(categories))
+    return text, filters
+
+
+def percentiles(samples):
+    ordered = sorted(samples)
+    return [ordered[min(len(ordered) - 1, int(len(ordered) * q))] * 1000 for q in (0.5, 0.95, 0.99)]
+
+
+def timed_searches(db, user_id, searches):
+    samples, matched = [], 0
+    for text, filters in searches:
+        started = time.perf_counter()
+        page = db.search_transactions(user_id, text, **filters)
+        samples.append(time.perf_counter() - started)
+        matched += bool(page['results'])
+    return samples, matched
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    db = open_db(os.path.join(tempfile.mkdtemp(prefix="walletwhiz_bench_"), 'search.db'))
+    if not db.backend.fulltext:
+        print("this SQLite build has no FTS5")
+        sys.exit(1)
+    db.create_user('search', 'x')
+    user_id = db.authenticate_user('search', 'x')
+
+    started = time.perf_counter()
+    categories = seed(db, user_id, rows)
+    print(f"seeded and indexed {rows} transactions in {time.perf_counter() - started:.1f}s")
+
+    rng = random.Random(17)
+    searches = [random_search(rng, categories) for _ in range(count)]
+    timed_searches(db, user_id, searches[:20])   # warm the page cache
+    samples, matched = timed_searches(db, user_id, searches)
+    p50, p95, p99 = percentiles(samples)
+    print(f"{'':18} {'p50':>9} {'p95':>9} {'p99':>9}")
+    print(f"{'FTS5, ranked':18} {p50:7.1f}ms {p95:7.1f}ms {p99:7.1f}ms  ({count} searches, {matched} with results)")
+
+    sample = searches[:max(1, count // 10)]
+    db.backend.fulltext = False
+    samples, _ = timed_searches(db, user_id, sample)
+    db.backend.fulltext = True
+    p50, p95, p99 = percentiles(samples)
+    print(f"{'LIKE scan':18} {p50:7.1f}ms {p95:7.1f}ms {p99:7.1f}ms  ({len(sample)} searches)")
+
+    text = MERCHANTS[0]
+    started = time.perf_counter()
+    pages = 0
+    page = {'has_more': True}
+    while page['has_more'] and pages < 20:
+        pages += 1
+        page = db.search_transactions(user_id, text, page=pages)
+    print(f"paging {text!r}: {pages} pages in {(time.perf_counter() - started) * 1000:.0f}ms")
+    db.disconnect()
+
+
+if __name__ == '__main__':
+    main()
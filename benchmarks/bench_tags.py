@@ -0,0 +1,88 @@
+"""Compare scanning tag lookups with TagIndex on synthetic tagged transactions.
+
+Each transaction gets one to three tags drawn from a Zipf-like vocabulary.
+Times, for the old linear scans and for TagIndex:
+
+- autocompleting every prefix of a few tags, as while typing
+- filtering by one tag, by two tags (AND) and by either of three (OR)
+- keeping the index current: one add and one remove
+
+    python -m benchmarks.bench_tags [transactions] [vocabulary]
+"""
+import random
+import sys
+import time
+
+from models.transaction import Transaction
+from utils.tags import TagIndex
+
+
+def scan_suggest(transactions, prefix):
+    # The scan suggest_tags did before TagIndex
+    tags = set()
+    for t in transactions:
+        for tag in t.get("tags", []):
+            if tag.startswith(prefix):
+                tags.add(tag)
+    return list(tags)
+
+
+def make_transactions(count, vocabulary, seed=11):
+    rng = random.Random(seed)
+    words = [f"{rng.choice(['food', 'trip', 'work', 'home', 'gift', 'fuel', 'rent'])}{i}" for i in range(vocabulary)]
+    weights = [1 / (rank + 1) for rank in range(vocabulary)]
+    return [Transaction(20000 + i % 1000, "Expense", 10.0, "Food", "",
+                        set(rng.choices(words, weights, k=rng.randint(1, 3))), id=i + 1)
+            for i in range(count)], words
+
+
+def timed(call, repeat=1):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = call()
+    return (time.perf_counter() - started) / repeat, result
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    vocabulary = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    transactions, words = make_transactions(count, vocabulary)
+    typed = [words[0], words[7], words[150]]
+    prefixes = [word[:length] for word in typed for length in range(1, len(word) + 1)]
+
+    seconds, index = timed(lambda: TagIndex.from_transactions(transactions))
+    print(f"{count} transactions, {vocabulary} tags; index built in {seconds:.2f}s")
+
+    rows = [
+        ("autocomplete (per keystroke)",
+         lambda: [scan_suggest(transactions, prefix) for prefix in prefixes],
+         lambda: [index.suggest(prefix, 10) for prefix in prefixes], len(prefixes)),
+        ("filter one tag",
+         lambda: [t for t in transactions if typed[1] in t.get("tags", [])],
+         lambda: index.records(all_of=[typed[1]]), 1),
+        ("filter two tags (AND)",
+         lambda: [t for t in transactions if typed[0] in t.get("tags", []) and typed[1] in t.get("tags", [])],
+         lambda: index.records(all_of=typed[:2]), 1),
+        ("filter any of three (OR)",
+         lambda: [t for t in transactions if any(tag in t.get("tags", []) for tag in typed)],
+         lambda: index.records(any_of=typed), 1),
+    ]
+    print(f"{'':30} {'scan':>10} {'index':>10} {'speedup':>8}")
+    for label, scan, indexed, calls in rows:
+        scan_seconds, scanned = timed(scan)
+        index_seconds, found = timed(indexed, 5)
+        if calls == 1 and len(scanned) != len(found):
+            print(f"MISMATCH in {label}: {len(scanned)} != {len(found)}")
+            sys.exit(1)
+        print(f"{label:30} {scan_seconds / calls * 1000:8.2f}ms {index_seconds / calls * 1000:8.3f}ms "
+              f"{scan_seconds / index_seconds:7.0f}x")
+
+    new = Transaction(20000, "Expense", 5.0, "Food", "", [typed[0], "brandnew"], id=count + 1)
+    seconds, _ = timed(lambda: index.add(new.id, new.tags, new))
+    print(f"add one transaction:    {seconds * 1000:.3f}ms, suggest('brand') -> {index.suggest('brand')}")
+    seconds, _ = timed(lambda: index.remove(new.id))
+    print(f"remove one transaction: {seconds * 1000:.3f}ms, suggest('brand') -> {index.suggest('brand')}")
+
+
+if __name__ == '__main__':
+    main()
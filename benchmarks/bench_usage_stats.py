@@ -0,0 +1,100 @@
+"""Yearly top merchants from stored monthly sketches against an exact rescan.
+
+Seeds one user with ``rows`` expenses spread over last year in a throwaway
+SQLite database, with merchants drawn from a long-tailed vocabulary of
+``merchants`` names. Then times:
+
+- the exact answer: scanning the year and counting every merchant in a dict
+- the first DBManager.get_usage_stats for the year, which builds and stores
+  twelve monthly sketches
+- later calls, which merge the stored sketches
+- the same after one new transaction, which rebuilds only its month
+
+and reports the sketches' top-10 recall and error against the exact counts,
+the dict's size and the stored sketches' size.
+
+    python -m benchmarks.bench_usage_stats [rows] [merchants]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import date, timedelta
+
+from benchmarks.bench_restore import open_db
+from utils.dedup import normalize_description
+
+
+def seed(db, user_id, rows, merchants, year, seed=8):
+    rng = random.Random(seed)
+    names = [f"{rng.choice(['Cafe', 'Store', 'Mart', 'Fuel', 'Pharma', 'Books'])} {chr(65 + i % 26)}{i // 26:x}"
+             for i in range(merchants)]
+    weights = [1 / (rank + 1) for rank in range(merchants)]
+    category_id = next(row[0] for row in db.get_categories(user_id) if row[2] == 'expense')
+    start = date(year, 1, 1)
+    with db.transaction() as cursor:
+        for offset in range(0, rows, 50_000):
+            count = min(50_000, rows - offset)
+            batch = [(user_id, 'expense', round(rng.uniform(1, 500), 2), category_id, name,
+                      start + timedelta(days=rng.randrange(365)), rng.choice(['Pune', 'Mumbai', None]))
+                     for name in rng.choices(names, weights, k=count)]
+            cursor.executemany("""
+                INSERT INTO Transactions (user_id, type, amount, category_id, description, transaction_date, location)
+                VALUES (%s, %s, %s, %s, %s, %s, %s)""", batch)
+    db.rebuild_monthly_aggregates(user_id)
+    return category_id
+
+
+def exact_counts(db, user_id, year):
+    counts = Counter()
+    for (description,) in db.execute_query(
+            "SELECT description FROM Transactions WHERE user_id = %s AND transaction_date >= %s "
+            "AND transaction_date < %s AND type = 'expense'",
+            (user_id, date(year, 1, 1), date(year + 1, 1, 1)), fetch_results=True):
+        counts[normalize_description(description)] += 1
+    return counts
+
+
+def timed(call):
+    started = time.perf_counter()
+    result = call()
+    return (time.perf_counter() - started) * 1000, result
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    merchants = int(sys.argv[2]) if len(sys.argv) > 2 else 50_000
+    year = date.today().year - 1
+    db = open_db(os.path.join(tempfile.mkdtemp(prefix="walletwhiz_bench_"), 'usage.db'))
+    db.create_user('usage', 'x')
+    user_id = db.authenticate_user('usage', 'x')
+    started = time.perf_counter()
+    category_id = seed(db, user_id, rows, merchants, year)
+    print(f"seeded {rows} expenses over {year} from {merchants} merchants in {time.perf_counter() - started:.1f}s")
+
+    ms, exact = timed(lambda: exact_counts(db, user_id, year))
+    print(f"exact rescan:              {ms:8.0f}ms, dict of {len(exact)} merchants")
+    ms, stats = timed(lambda: db.get_usage_stats(user_id, year))
+    print(f"first call (build 12):     {ms:8.0f}ms")
+    ms, stats = timed(lambda: db.get_usage_stats(user_id, year))
+    print(f"merge 12 stored sketches:  {ms:8.1f}ms")
+    db.add_transaction(user_id, 'expense', 42, category_id, "Late entry", date(year, 6, 15))
+    ms, _ = timed(lambda: db.get_usage_stats(user_id, year))
+    print(f"after one new transaction: {ms:8.1f}ms (one month rebuilt)")
+
+    size = db.execute_query("SELECT SUM(LENGTH(data)) FROM UsageSketches WHERE user_id = %s", (user_id,),
+                            fetch_results=True)[0][0]
+    print(f"stored sketches: {size / 1024:.0f} KiB for 12 months")
+    top = stats.top('merchant', 10)
+    true_top = {name for name, _ in exact.most_common(10)}
+    worst = max(abs(total - exact[name]) / exact[name] for name, total, _ in top)
+    print(f"top-10 recall {len({name for name, _, _ in top} & true_top)}/10, worst count error {worst:.2%}")
+    for (name, total, error), (true_name, true_total) in zip(top[:5], exact.most_common(5)):
+        print(f"  {name:14} {total:7} (±{error:<5}) exact: {true_name:14} {true_total:7}")
+    db.disconnect()
+
+
+if __name__ == '__main__':
+    main()
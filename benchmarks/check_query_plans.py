@@ -0,0 +1,142 @@
+"""Query-plan regression check for the date-filtered DBManager queries.
+
+Runs get_transactions, get_budget_summary, get_dashboard_data,
+detect_spending_anomalies, check_duplicate_transaction and query_spending (both
+sources) for a throwaway user, captures every SELECT they
+issue, runs EXPLAIN on it and fails if Transactions or MonthlyAggregates is
+read with a full table scan, or if a date-filtered Transactions query is not
+served by an index range. Works with both the MySQL and SQLite backends.
+
+    python -m benchmarks.check_query_plans
+
+Exits with status 1 when any plan regresses.
+"""
+import re
+import sys
+import uuid
+from datetime import date, timedelta
+
+from database.db_manager import DBManager
+
+# Tables (and the aliases db_manager uses for them) that must never be fully scanned
+WATCHED_TABLES = {'transactions': 'Transactions', 't': 'Transactions',
+                  'monthlyaggregates': 'MonthlyAggregates', 'a': 'MonthlyAggregates'}
+
+
+class RecordingDBManager(DBManager):
+    """DBManager that remembers every SELECT it runs"""
+
+    def __init__(self):
+        super().__init__()
+        self.recorded = []
+        self._caller = None
+
+    def execute_query(self, query, params=None, fetch_results=False, fetch_id=False):
+        if fetch_results and query.lstrip().upper().startswith('SELECT'):
+            self.recorded.append((self._caller, query, tuple(params or ())))
+        return super().execute_query(query, params, fetch_results, fetch_id)
+
+
+# MONTH(t.transaction_date) = ... and friends hide the column from idx_user_date
+WRAPPED_DATE_FILTER = re.compile(r"WHERE.*\b(?:MONTH|YEAR|DATE)\(\s*(?:\w+\.)?transaction_date", re.S | re.I)
+
+
+def explain_problems(db, query, params):
+    """Return a list of plan problems for one query"""
+    problems = []
+    if WRAPPED_DATE_FILTER.search(query):
+        problems.append("transaction_date wrapped in a function inside WHERE")
+    if db.backend.name == 'sqlite':
+        return problems + _sqlite_problems(db, query, params)
+    return problems + _mysql_problems(db, query, params)
+
+
+def _mysql_problems(db, query, params):
+    problems = []
+    date_filtered = 'transaction_date >=' in query
+    for row in db.execute_query("EXPLAIN " + query, params, fetch_results=True) or []:
+        table, access_type = row[2], row[4]
+        watched = WATCHED_TABLES.get((table or '').lower())
+        if not watched:
+            continue
+        if access_type == 'ALL':
+            problems.append(f"full scan of {watched}")
+        elif watched == 'Transactions' and date_filtered and access_type != 'range':
+            problems.append(f"Transactions read with '{access_type}' access instead of a date range")
+    return problems
+
+
+def _sqlite_problems(db, query, params):
+    problems = []
+    date_filtered = 'transaction_date >=' in query
+    for row in db.execute_query("EXPLAIN QUERY PLAN " + query, params, fetch_results=True) or []:
+        detail = row[3]
+        words = detail.split()
+        if len(words) < 2 or words[0] not in ('SCAN', 'SEARCH'):
+            continue
+        watched = WATCHED_TABLES.get(words[1].lower())
+        if not watched:
+            continue
+        if words[0] == 'SCAN':
+            problems.append(f"full scan of {watched} ({detail})")
+        elif watched == 'Transactions' and date_filtered and 'transaction_date>' not in detail:
+            problems.append(f"Transactions not narrowed by date ({detail})")
+    return problems
+
+
+def main():
+    db = RecordingDBManager()
+    if not db.connect():
+        sys.exit(1)
+
+    username = f"plans_{uuid.uuid4().hex[:8]}"
+    if not db.create_user(username, "plans"):
+        sys.exit(1)
+    user_id = db.execute_query("SELECT id FROM Users WHERE username = %s", (username,), fetch_results=True)[0][0]
+
+    failures = 0
+    try:
+        today = date.today()
+        db.add_transactions_bulk(user_id, [{
+            'type': 'expense', 'amount': 100 + i, 'category': 'Shopping',
+            'description': f"Plan check row {i}", 'transaction_date': today - timedelta(days=i),
+        } for i in range(400)], generate_insights=False)
+
+        checks = [
+            ('get_transactions(month)', lambda: db.get_transactions(user_id, today.month, today.year)),
+            ('get_transactions(limit)', lambda: db.get_transactions(user_id, limit=5)),
+            ('get_budget_summary', lambda: db.get_budget_summary(user_id, today.month, today.year)),
+            ('get_dashboard_data', lambda: db.get_dashboard_data(user_id, today.month, today.year)),
+            ('detect_spending_anomalies', lambda: db.detect_spending_anomalies(user_id)),
+            ('check_duplicate_transaction',
+             lambda: db.check_duplicate_transaction(user_id, 100, "Unmatched row", today)),
+            ('query_spending(transactions)',
+             lambda: db.query_spending(user_id, 'max', date_from=today - timedelta(days=30), date_to=today,
+                                       group_by='category')),
+            ('query_spending(aggregates)',
+             lambda: db.query_spending(user_id, 'sum', date_from=date(today.year, 1, 1),
+                                       date_to=date(today.year, 12, 31), group_by='month', source='aggregates')),
+        ]
+        db.recorded.clear()
+        for name, call in checks:
+            db._caller = name
+            call()
+
+        for caller, query, params in db.recorded:
+            problems = explain_problems(db, query, params)
+            status = "FAIL" if problems else "ok"
+            print(f"[{status}] {caller}: {' '.join(query.split())[:90]}")
+            for problem in problems:
+                print(f"       {problem}")
+            failures += bool(problems)
+    finally:
+        db.execute_query("DELETE FROM Transactions WHERE user_id = %s", (user_id,))
+        db.execute_query("DELETE FROM Users WHERE id = %s", (user_id,))
+        db.disconnect()
+
+    print(f"{failures} query plan regression(s)")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,31 @@
 # config.py
 
-# MySQL Database Configuration
+# Database Configuration
 DB_CONFIG = {
+    "backend": "mysql",  # "mysql", or "sqlite" for single-user installs without a server
     "host": "localhost",
     "user": "root",      # <<< FIXED: Use your actual MySQL username
     "password": "siddhant", # <<< IMPORTANT: Replace with your MySQL password
-    "database": "walletwhiz_db"
+    "database": "walletwhiz_db",
+    # Connection pool (see database/connection_pool.py); not passed to the driver
+    "pool_size": 5,
+    "pool_checkout_timeout": 10,  # seconds to wait for a free connection
+    "pool_return_timeout": 300,   # connections held longer are discarded on return
+    "pool_idle_check": 30,        # only ping connections idle longer than this
+    # Used when backend is "sqlite" (see database/backends.py for all options)
+    "sqlite": {
+        "path": "walletwhiz_data.db",
+        "synchronous": "NORMAL"
+    }
+}
+
+# Scheduled database backups (see utils/backup.py)
+BACKUP_CONFIG = {
+    "target": "local",    # name in utils.backup.BACKUP_TARGETS
+    "path": "backups",    # directory for the "local" target
+    "interval": "daily",  # "hourly", "daily", "weekly" or seconds
+    "full_every": 7,      # every 7th snapshot is full, the rest incremental
+    "keep_full": 2        # snapshots older than the 2nd most recent full one are deleted
 }
 
 # UI Configuration
@@ -0,0 +1,293 @@
+import os
+import re
+import sqlite3
+import threading
+from datetime import date, datetime
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Dict, Tuple
+
+from database.connection_pool import split_pool_config
+
+# Optional MySQL driver; the SQLite backend works without it
+try:
+    import mysql.connector
+    MYSQL_AVAILABLE = True
+except ImportError:
+    MYSQL_AVAILABLE = False
+
+
+class BackendError(Exception):
+    """Raised when the configured storage backend cannot be used"""
+
+
+# Every exception a backend may raise for a failed statement or connection
+DB_ERRORS = (BackendError, sqlite3.Error) + ((mysql.connector.Error,) if MYSQL_AVAILABLE else ())
+
+SQLITE_DEFAULTS = {
+    "path": "walletwhiz_data.db",
+    "synchronous": "NORMAL",   # safe with WAL: only the last transactions can be lost on power failure
+    "cache_size_kb": 16384,
+    "statement_cache": 256,    # compiled statements kept per connection
+    "busy_timeout_ms": 5000,
+}
+
+
+class MySQLBackend:
+    """mysql-connector backend; queries are already written in MySQL dialect"""
+
+    name = "mysql"
+    fulltext = True   # InnoDB FULLTEXT index ft_transactions_text
+    # InnoDB cannot defer foreign keys, so bulk loads switch the checks off for their session
+    defer_constraints_sql = ("SET foreign_key_checks = 0",)
+    restore_constraints_sql = ("SET foreign_key_checks = 1",)
+
+    def __init__(self, config: Dict[str, Any]):
+        if not MYSQL_AVAILABLE:
+            raise BackendError("mysql-connector-python is not installed")
+        driver_args, self.pool_args = split_pool_config(config)
+        driver_args.pop("backend", None)
+        driver_args.pop("sqlite", None)
+        # Pooled connections run in autocommit mode so a read never leaves a
+        # stale snapshot open on a connection that another worker picks up
+        driver_args.setdefault("autocommit", True)
+        self.driver_args = driver_args
+
+    def connect(self):
+        return mysql.connector.connect(**self.driver_args)
+
+    @staticmethod
+    def is_alive(conn) -> bool:
+        return conn.is_connected()
+
+    def describe(self) -> str:
+        return f"MySQL database {self.driver_args.get('database')}"
+
+
+# Columns added after a table's first release, with an optional fixup for existing rows;
+# CREATE TABLE IF NOT EXISTS leaves older database files untouched
+SQLITE_ADDED_COLUMNS = (
+    ("Transactions", "fingerprint", "TEXT", None),
+    ("FinancialInsights", "period", "TEXT NOT NULL DEFAULT ''",
+     "DELETE FROM FinancialInsights WHERE id NOT IN "
+     "(SELECT MAX(id) FROM FinancialInsights GROUP BY user_id, insight_type, title)"),
+)
+
+
+# FTS5 index over the searchable Transactions columns, kept in sync by triggers;
+# separate from schema_sqlite.sql since SQLite can be built without FTS5
+SQLITE_FULLTEXT_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS TransactionSearch USING fts5(
+    description, notes, location,
+    content='Transactions', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+);
+CREATE TRIGGER IF NOT EXISTS trg_transactions_search_insert AFTER INSERT ON Transactions
+BEGIN
+    INSERT INTO TransactionSearch (rowid, description, notes, location)
+    VALUES (NEW.id, NEW.description, NEW.notes, NEW.location);
+END;
+CREATE TRIGGER IF NOT EXISTS trg_transactions_search_delete AFTER DELETE ON Transactions
+BEGIN
+    INSERT INTO TransactionSearch (TransactionSearch, rowid, description, notes, location)
+    VALUES ('delete', OLD.id, OLD.description, OLD.notes, OLD.location);
+END;
+CREATE TRIGGER IF NOT EXISTS trg_transactions_search_update AFTER UPDATE OF description, notes, location
+ON Transactions
+BEGIN
+    INSERT INTO TransactionSearch (TransactionSearch, rowid, description, notes, location)
+    VALUES ('delete', OLD.id, OLD.description, OLD.notes, OLD.location);
+    INSERT INTO TransactionSearch (rowid, description, notes, location)
+    VALUES (NEW.id, NEW.description, NEW.notes, NEW.location);
+END;
+"""
+
+
+class SQLiteBackend:
+    """SQLite backend for single-user installs: WAL journal, MySQL-dialect queries translated and cached"""
+
+    name = "sqlite"
+    fulltext = True   # cleared when this SQLite build has no FTS5
+    # Checked at COMMIT instead of per statement; reset automatically when the transaction ends
+    defer_constraints_sql = ("PRAGMA defer_foreign_keys = ON",)
+    restore_constraints_sql = ()
+    schema_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "schema_sqlite.sql")
+
+    def __init__(self, config: Dict[str, Any]):
+        _, self.pool_args = split_pool_config(config)
+        self.options = dict(SQLITE_DEFAULTS, **config.get("sqlite", {}))
+        self.path = self.options["path"]
+        if self.path == ":memory:":
+            # Every connection to :memory: is a separate database, so keep exactly one
+            self.pool_args["size"] = 1
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+
+    def connect(self):
+        raw = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False,
+                              detect_types=sqlite3.PARSE_DECLTYPES,
+                              cached_statements=self.options["statement_cache"])
+        if self.path != ":memory:":
+            raw.execute("PRAGMA journal_mode = WAL")
+        raw.execute(f"PRAGMA synchronous = {self.options['synchronous']}")
+        raw.execute(f"PRAGMA cache_size = -{int(self.options['cache_size_kb'])}")
+        raw.execute(f"PRAGMA busy_timeout = {int(self.options['busy_timeout_ms'])}")
+        raw.execute("PRAGMA foreign_keys = ON")
+        raw.execute("PRAGMA temp_store = MEMORY")
+        self._ensure_schema(raw)
+        return SQLiteConnection(raw)
+
+    def _ensure_schema(self, raw):
+        with self._schema_lock:
+            if self._schema_ready:
+                return
+            for table, column, definition, fixup in SQLITE_ADDED_COLUMNS:
+                existing = [row[1] for row in raw.execute(f"PRAGMA table_info({table})")]
+                if existing and column not in existing:
+                    raw.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+                    if fixup:
+                        raw.execute(fixup)
+            with open(self.schema_path, "r", encoding="utf-8") as schema_file:
+                raw.executescript(schema_file.read())
+            self._ensure_fulltext(raw)
+            self._schema_ready = True
+
+    def _ensure_fulltext(self, raw):
+        exists = raw.execute("SELECT 1 FROM sqlite_master WHERE name = 'TransactionSearch'").fetchone()
+        try:
+            raw.executescript(SQLITE_FULLTEXT_SCHEMA)
+        except sqlite3.OperationalError as e:
+            print(f"Full-text search unavailable, using LIKE scans: {e}")
+            self.fulltext = False
+            return
+        if not exists:
+            # Index the rows written before the search table existed
+            raw.execute("INSERT INTO TransactionSearch (TransactionSearch) VALUES ('rebuild')")
+
+    @staticmethod
+    def is_alive(conn) -> bool:
+        try:
+            conn.raw.execute("SELECT 1")
+            return True
+        except sqlite3.Error:
+            return False
+
+    def describe(self) -> str:
+        return f"SQLite database {self.path}"
+
+
+class SQLiteConnection:
+    """Wraps sqlite3.Connection with the subset of the mysql-connector API DBManager uses"""
+
+    def __init__(self, raw):
+        self.raw = raw
+
+    def cursor(self):
+        return SQLiteCursor(self.raw.cursor())
+
+    def start_transaction(self, consistent_snapshot=False, readonly=False):
+        # Writers take the write lock up front; a deferred read transaction sees
+        # one WAL snapshot from its first SELECT and never blocks writers
+        self.raw.execute("BEGIN" if readonly else "BEGIN IMMEDIATE")
+
+    def commit(self):
+        if self.raw.in_transaction:
+            self.raw.commit()
+
+    def rollback(self):
+        if self.raw.in_transaction:
+            self.raw.rollback()
+
+    def close(self):
+        self.raw.close()
+
+
+class SQLiteCursor:
+    """Cursor that accepts MySQL-dialect SQL with %s placeholders"""
+
+    def __init__(self, raw):
+        self.raw = raw
+
+    def execute(self, query: str, params=()):
+        self.raw.execute(translate_to_sqlite(query), tuple(params))
+        return self
+
+    def executemany(self, query: str, seq_of_params):
+        self.raw.executemany(translate_to_sqlite(query), seq_of_params)
+        return self
+
+    def fetchone(self):
+        return self.raw.fetchone()
+
+    def fetchall(self):
+        return self.raw.fetchall()
+
+    def fetchmany(self, size: int):
+        return self.raw.fetchmany(size)
+
+    def __iter__(self):
+        return iter(self.raw)
+
+    @property
+    def lastrowid(self):
+        return self.raw.lastrowid
+
+    @property
+    def rowcount(self):
+        return self.raw.rowcount
+
+    @property
+    def description(self):
+        return self.raw.description
+
+    def close(self):
+        self.raw.close()
+
+
+_SQLITE_REWRITES: Tuple[Tuple[re.Pattern, str], ...] = tuple(
+    (re.compile(pattern, re.IGNORECASE), replacement) for pattern, replacement in (
+        (r"%s", "?"),
+        (r"\bINSERT\s+IGNORE\b", "INSERT OR IGNORE"),
+        (r"\bON\s+DUPLICATE\s+KEY\s+UPDATE\b", "ON CONFLICT DO UPDATE SET"),
+        (r"\bVALUES\((\w+)\)", r"excluded.\1"),
+        (r"\bDATEDIFF\(([\w.]+),\s*([\w.]+(?:\(\))?)\)", r"CAST(julianday(\1) - julianday(\2) AS INTEGER)"),
+        (r"\bCURDATE\(\)", "date('now', 'localtime')"),
+        (r"\bNOW\(\)", "datetime('now', 'localtime')"),
+        (r"\bYEAR\(([\w.]+)\)", r"CAST(strftime('%Y', \1) AS INTEGER)"),
+        (r"\bMONTH\(([\w.]+)\)", r"CAST(strftime('%m', \1) AS INTEGER)"),
+    )
+)
+
+
+@lru_cache(maxsize=1024)
+def translate_to_sqlite(query: str) -> str:
+    """Rewrite the MySQL constructs DBManager uses into SQLite syntax"""
+    for pattern, replacement in _SQLITE_REWRITES:
+        query = pattern.sub(replacement, query)
+    return query
+
+
+def _register_sqlite_types():
+    # Explicit adapters/converters; the implicit sqlite3 defaults are deprecated
+    sqlite3.register_adapter(date, lambda value: value.isoformat())
+    sqlite3.register_adapter(datetime, lambda value: value.isoformat(" "))
+    sqlite3.register_adapter(Decimal, float)
+    sqlite3.register_converter("DATE", lambda value: date.fromisoformat(value.decode()[:10]))
+    sqlite3.register_converter("TIMESTAMP", lambda value: datetime.fromisoformat(value.decode()))
+
+
+_register_sqlite_types()
+
+BACKENDS = {
+    "mysql": MySQLBackend,
+    "sqlite": SQLiteBackend,
+}
+
+
+def get_backend(config: Dict[str, Any]):
+    """Instantiate the backend named by config['backend'] (default: mysql)"""
+    name = config.get("backend", "mysql")
+    try:
+        return BACKENDS[name](config)
+    except KeyError:
+        raise BackendError(f"Unknown database backend: {name}") from None
@@ -0,0 +1,175 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Tuple
+
+# Pool settings that may appear in DB_CONFIG; they are never passed to the driver
+POOL_DEFAULTS = {
+    "pool_size": 5,
+    "pool_checkout_timeout": 10.0,  # seconds to wait for a free connection
+    "pool_return_timeout": 300.0,   # connections held longer than this are discarded on return
+    "pool_idle_check": 30.0,        # only ping connections that sat idle longer than this
+}
+
+
+def split_pool_config(config: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Split a DB config dict into driver arguments and ConnectionPool keyword arguments"""
+    driver_args = {k: v for k, v in config.items() if k not in POOL_DEFAULTS}
+    pool_args = {k[len("pool_"):]: config.get(k, default) for k, default in POOL_DEFAULTS.items()}
+    return driver_args, pool_args
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection becomes free within the checkout timeout"""
+
+
+class ConnectionPool:
+    """Fixed-size, thread-safe pool of database connections, reused most recent first"""
+
+    def __init__(self, connect: Callable[[], Any], is_alive: Callable[[Any], bool],
+                 size: int = 5, checkout_timeout: float = 10.0,
+                 return_timeout: float = 300.0, idle_check: float = 30.0):
+        if size < 1:
+            raise ValueError("pool size must be at least 1")
+        self._connect = connect
+        self._is_alive = is_alive
+        self.size = size
+        self.checkout_timeout = checkout_timeout
+        self.return_timeout = return_timeout
+        self.idle_check = idle_check
+
+        self._cond = threading.Condition()
+        self._idle = deque()       # (connection, returned_at)
+        self._checked_out = {}     # id(connection) -> checked_out_at
+        self._created = 0
+        self._closed = False
+        self._stats = {
+            'checkouts': 0,
+            'waits': 0,
+            'wait_time': 0.0,
+            'timeouts': 0,
+            'health_checks': 0,
+            'reconnects': 0,
+            'overdue_returns': 0,
+            'discarded': 0,
+        }
+
+    def acquire(self):
+        """Check out a connection, waiting up to checkout_timeout for one to free up"""
+        deadline = time.monotonic() + self.checkout_timeout
+        wait_started = None
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise PoolTimeout("Connection pool is closed")
+                if self._idle:
+                    conn, returned_at = self._idle.pop()
+                    break
+                if self._created < self.size:
+                    self._created += 1
+                    conn, returned_at = None, None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats['timeouts'] += 1
+                    raise PoolTimeout(f"No free connection after {self.checkout_timeout}s "
+                                      f"(pool size {self.size})")
+                if wait_started is None:
+                    wait_started = time.monotonic()
+                    self._stats['waits'] += 1
+                self._cond.wait(remaining)
+            if wait_started is not None:
+                self._stats['wait_time'] += time.monotonic() - wait_started
+
+        # Connecting and pinging happen outside the lock so a slow server
+        # does not block workers that could be served from the idle list
+        try:
+            if conn is None:
+                conn = self._connect()
+            elif time.monotonic() - returned_at > self.idle_check:
+                self._bump('health_checks')
+                if not self._is_alive(conn):
+                    self._close_quietly(conn)
+                    conn = self._connect()
+                    self._bump('reconnects')
+        except BaseException:
+            with self._cond:
+                self._created -= 1
+                self._cond.notify()
+            raise
+
+        with self._cond:
+            self._checked_out[id(conn)] = time.monotonic()
+            self._stats['checkouts'] += 1
+        return conn
+
+    def release(self, conn, discard: bool = False):
+        """Return a connection to the pool, or close it when discard is set"""
+        with self._cond:
+            checked_out_at = self._checked_out.pop(id(conn), None)
+            if checked_out_at is not None and time.monotonic() - checked_out_at > self.return_timeout:
+                # Held for too long; it may carry session state we cannot trust
+                self._stats['overdue_returns'] += 1
+                discard = True
+            if discard or self._closed:
+                self._created -= 1
+                if discard:
+                    self._stats['discarded'] += 1
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+        if discard or self._closed:
+            self._close_quietly(conn)
+
+    @contextmanager
+    def connection(self):
+        """Context manager that checks a connection out and always returns it"""
+        conn = self.acquire()
+        try:
+            yield conn
+        except BaseException:
+            self.release(conn, discard=not self._check_alive(conn))
+            raise
+        else:
+            self.release(conn)
+
+    def close(self):
+        """Close all idle connections; checked-out ones are closed when returned"""
+        with self._cond:
+            self._closed = True
+            idle = [conn for conn, _ in self._idle]
+            self._idle.clear()
+            self._created -= len(idle)
+            self._cond.notify_all()
+        for conn in idle:
+            self._close_quietly(conn)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Snapshot of pool counters"""
+        with self._cond:
+            stats = dict(self._stats)
+            stats.update({
+                'size': self.size,
+                'open': self._created,
+                'idle': len(self._idle),
+                'in_use': len(self._checked_out),
+            })
+        return stats
+
+    def _bump(self, counter: str):
+        with self._cond:
+            self._stats[counter] += 1
+
+    def _check_alive(self, conn) -> bool:
+        try:
+            return bool(self._is_alive(conn))
+        except Exception:
+            return False
+
+    @staticmethod
+    def _close_quietly(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
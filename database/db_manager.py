@@ -1,18 +1,85 @@
 
-import mysql.connector
-from mysql.connector import Error
 import hashlib
 import bcrypt
 import json
 import re
+import threading
 from datetime import datetime, date, timedelta
 from typing import List, Tuple, Optional, Dict, Any
 from collections import defaultdict
+from itertools import groupby
+from contextlib import contextmanager
+from database.backends import DB_ERRORS, BackendError, get_backend
+from database.connection_pool import ConnectionPool, PoolTimeout
+from utils.categorizer import KeywordMatcher, build_category_matcher
+from utils.dedup import DedupIndex, is_near_duplicate, normalize_description, transaction_fingerprint
+from utils.anomaly import AnomalyDetector, series_zscore
+from utils.forecasting import ForecastCache, projected_month_end, trim_leading_zeros
+from models.recurring import advance
+from utils.recurring_detector import detect_recurring
+from utils.tags import TagIndex, normalize_tags
+from utils.usage_stats import UsageStats, merge_usage_stats
+from utils.heatmap import HeatmapEngine
+from utils.search import (COLUMN_WEIGHTS, LIKE_ESCAPE, fts5_expression, like_pattern, mysql_boolean_expression,
+                          parse_query)
+
+# How long a generated insight stays visible before prune_expired_insights removes it
+INSIGHT_TTL_DAYS = {'anomaly': 35, 'trend': 31, 'suggestion': 7, 'achievement': 365}
+
+def _placeholders(values) -> str:
+    """'%s, %s, ...' for an IN (...) list"""
+    return ", ".join(["%s"] * len(values))
+
+def _to_date(value) -> date:
+    """Coerce a DATE column value or 'YYYY-MM-DD' string to a date"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value)[:10], "%Y-%m-%d").date()
+
+
+def _parse_tags(value) -> Tuple[str, ...]:
+    """Normalized tag names from a Transactions.tags JSON value (fits Tags.name)"""
+    if isinstance(value, (bytes, bytearray)):
+        value = value.decode("utf-8")
+    try:
+        tags = json.loads(value) if isinstance(value, str) else value
+    except ValueError:
+        return ()
+    if not isinstance(tags, list):
+        return ()
+    return tuple(dict.fromkeys(name[:100] for name in normalize_tags(tag for tag in tags if isinstance(tag, str))))
+
+
+def _month_range(month: int, year: int) -> Tuple[date, date]:
+    """First day of the month and first day of the following month"""
+    start = date(year, month, 1)
+    next_start = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    return start, next_start
+
 
 class DBManager:
-    def __init__(self):
-        self.connection = None
+    def __init__(self, config: Dict[str, Any] = None):
+        # config defaults to config.DB_CONFIG, loaded on connect()
+        self.config = config
+        self.backend = None
+        self.pool = None
         self.current_user_id = None
+        # Fitted monthly spend models per (user_id, category_id)
+        self.forecasts = ForecastCache()
+        # Running amount statistics per (user_id, category_id), mirrored in AnomalyState
+        self.anomaly_detector = AnomalyDetector()
+        self._anomaly_users = set()
+        self._anomaly_lock = threading.Lock()
+        # Per-user TagIndex over TransactionTags, see get_tag_index
+        self._tag_indexes = {}
+        self._tag_lock = threading.Lock()
+        # (user_id, update) pairs of the transaction() open on each thread, see _update_cached
+        self._pending = threading.local()
+        # Per-user HeatmapEngine of daily expense totals, see get_heatmap
+        self._heatmaps = {}
+        self._heatmap_lock = threading.Lock()
         # ML-like patterns for auto-categorization
         self.category_patterns = {
             'Food & Dining': ['swiggy', 'zomato', 'mcdonalds', 'kfc', 'dominos', 'pizza', 'restaurant', 'cafe', 'food', 'lunch', 'dinner'],
@@ -22,25 +89,56 @@ class DBManager:
             'Bills & Utilities': ['electricity', 'water', 'gas', 'internet', 'mobile', 'phone', 'broadband'],
             'Healthcare': ['hospital', 'doctor', 'pharmacy', 'medicine', 'clinic']
         }
+        # Per-user caches for auto-categorization, see invalidate_category_cache
+        self._category_ids = {}
+        self._categorizers = {}
 
     # ...existing methods...
 
-    def auto_categorize_transaction(self, description: str, amount: float) -> Optional[int]:
+    def auto_categorize_transaction(self, description: str, amount: float,
+                                    user_id: int = None) -> Optional[int]:
         """Use ML-like pattern matching to suggest category"""
-        description_lower = description.lower()
-        
-        for category_name, patterns in self.category_patterns.items():
-            for pattern in patterns:
-                if pattern in description_lower:
-                    # Get category ID
-                    category_result = self.execute_query(
-                        "SELECT id FROM Categories WHERE user_id = %s AND name = %s",
-                        (self.current_user_id, category_name),
-                        fetch_results=True
-                    )
-                    if category_result:
-                        return category_result[0][0]
-        return None
+        matcher = self._get_categorizer(user_id or self.current_user_id)
+        return matcher.match(description) if matcher else None
+
+    def _get_category_ids(self, user_id: int) -> Dict[str, int]:
+        """Cached category name -> id map for a user"""
+        category_ids = self._category_ids.get(user_id)
+        if category_ids is None:
+            category_ids = {}
+            for category_id, name, _ in self.get_categories(user_id):
+                category_ids.setdefault(name, category_id)
+            self._category_ids[user_id] = category_ids
+        return category_ids
+
+    def _get_categorizer(self, user_id: int) -> Optional[KeywordMatcher]:
+        """Cached keyword matcher built from user rules plus category_patterns"""
+        if user_id is None:
+            return None
+        matcher = self._categorizers.get(user_id)
+        if matcher is None:
+            matcher = build_category_matcher(self.category_patterns, self._get_category_ids(user_id),
+                                             self.get_category_rules(user_id))
+            self._categorizers[user_id] = matcher
+        return matcher
+
+    def invalidate_category_cache(self, user_id: int):
+        """Drop cached category lookups after categories or rules change"""
+        self._category_ids.pop(user_id, None)
+        self._categorizers.pop(user_id, None)
+
+    def add_category_rule(self, user_id: int, keyword: str, category_id: int) -> bool:
+        """Add a user-defined keyword rule for auto-categorization"""
+        query = "INSERT INTO CategoryRules (user_id, keyword, category_id) VALUES (%s, %s, %s)"
+        success = self.execute_query(query, (user_id, keyword.strip().lower(), category_id)) is not None
+        self.invalidate_category_cache(user_id)
+        return success
+
+    def get_category_rules(self, user_id: int) -> List[Tuple[str, int]]:
+        """Get user-defined (keyword, category_id) rules, oldest first"""
+        query = "SELECT keyword, category_id FROM CategoryRules WHERE user_id = %s ORDER BY id"
+        return [(keyword, category_id) for keyword, category_id
+                in self.execute_query(query, (user_id,), fetch_results=True) or []]
 
     def add_transaction_with_smart_features(self, user_id: int, transaction_type: str, amount: float,
                                           category_id: int, description: str, transaction_date: date,
@@ -54,22 +152,21 @@ class DBManager:
         
         # Auto-suggest category if not provided
         if not category_id:
-            suggested_category = self.auto_categorize_transaction(description, amount)
+            suggested_category = self.auto_categorize_transaction(description, amount, user_id)
             if suggested_category:
                 category_id = suggested_category
         
         # Convert tags to JSON
         tags_json = json.dumps(tags) if tags else None
         
-        query = """
-        INSERT INTO Transactions (user_id, type, amount, category_id, description, 
-                                transaction_date, notes, tags, location) 
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """
-        params = (user_id, transaction_type, amount, category_id, description, 
-                 transaction_date, notes, tags_json, location)
-        
-        result = self.execute_query(query, params, fetch_id=True)
+        row = (transaction_type, amount, category_id, description, transaction_date,
+               notes, tags_json, location, None)
+        try:
+            with self.transaction() as cursor:
+                result = self._insert_transactions(cursor, user_id, [row])
+        except DB_ERRORS + (PoolTimeout,) as e:
+            print(f"Database error: {e}")
+            result = None
         
         if result:
             # Generate insights after adding transaction
@@ -78,109 +175,291 @@ class DBManager:
         
         return {'success': False, 'message': 'Failed to add transaction'}
 
+    def add_transactions_bulk(self, user_id: int, rows: List[Dict], chunk_size: int = 500,
+                              skip_duplicates: bool = True, generate_insights: bool = True) -> Dict[str, Any]:
+        """Insert many transaction dicts (category name or ID) in one transaction; returns counts and per-row results"""
+        results = []
+        pending = []
+        category_ids = self._get_category_ids(user_id)
+
+        for index, row in enumerate(rows):
+            prepared, error = self._prepare_bulk_row(row)
+            if error:
+                results.append({'index': index, 'status': 'invalid', 'message': error})
+                continue
+            if not prepared[2]:
+                prepared[2] = (category_ids.get(row.get('category'))
+                               or self.auto_categorize_transaction(prepared[3], prepared[1], user_id))
+                if not prepared[2]:
+                    results.append({'index': index, 'status': 'invalid', 'message': 'No category'})
+                    continue
+            results.append({'index': index, 'status': 'pending'})
+            pending.append((index, prepared))
+
+        if skip_duplicates and pending:
+            pending = self._drop_bulk_duplicates(user_id, pending, results)
+
+        summary = {'success': True, 'inserted': 0, 'duplicates': 0, 'invalid': 0, 'results': results}
+        if pending:
+            try:
+                with self.transaction() as cursor:
+                    self._insert_transactions(cursor, user_id, [(*values, None) for _, values in pending],
+                                              chunk_size)
+            except DB_ERRORS + (PoolTimeout,) as e:
+                print(f"Database error: {e}")
+                for index, _ in pending:
+                    results[index] = {'index': index, 'status': 'failed', 'message': str(e)}
+                summary['success'] = False
+            else:
+                for index, _ in pending:
+                    results[index]['status'] = 'inserted'
+
+        for result in results:
+            status = result['status']
+            if status == 'inserted':
+                summary['inserted'] += 1
+            elif status == 'duplicate':
+                summary['duplicates'] += 1
+            elif status == 'invalid':
+                summary['invalid'] += 1
+
+        if generate_insights and summary['inserted']:
+            self.generate_spending_insights(user_id)
+        return summary
+
+    def _prepare_bulk_row(self, row: Dict) -> Tuple[Optional[list], Optional[str]]:
+        """Validate one bulk row and turn it into INSERT values (minus user_id)"""
+        transaction_type = str(row.get('type') or 'expense').lower()
+        if transaction_type not in ('income', 'expense', 'transfer'):
+            return None, f"Invalid type: {row.get('type')}"
+
+        try:
+            amount = round(float(row.get('amount')), 2)
+        except (TypeError, ValueError):
+            return None, f"Invalid amount: {row.get('amount')}"
+        if amount <= 0:
+            return None, "Amount must be positive"
+
+        transaction_date = row.get('transaction_date') or row.get('date')
+        if isinstance(transaction_date, datetime):
+            transaction_date = transaction_date.date()
+        elif isinstance(transaction_date, str):
+            try:
+                transaction_date = datetime.strptime(transaction_date.strip(), "%Y-%m-%d").date()
+            except ValueError:
+                return None, f"Invalid date: {transaction_date}"
+        elif not isinstance(transaction_date, date):
+            return None, "Missing transaction date"
+
+        description = (row.get('description') or '').strip()[:255]
+        tags = row.get('tags')
+        tags_json = json.dumps(tags) if tags else None
+        return [transaction_type, amount, row.get('category_id'), description, transaction_date,
+                row.get('notes'), tags_json, row.get('location')], None
+
+    def _drop_bulk_duplicates(self, user_id: int, pending: List[Tuple[int, list]],
+                              results: List[Dict]) -> List[Tuple[int, list]]:
+        """Mark rows that duplicate each other or existing transactions, keep the rest"""
+        dates = [values[4] for _, values in pending]
+        existing = self.execute_query(
+            """
+            SELECT amount, transaction_date, description, fingerprint FROM Transactions
+            WHERE user_id = %s AND transaction_date BETWEEN %s AND %s
+            """,
+            (user_id, min(dates), max(dates)), fetch_results=True
+        ) or []
+
+        index = DedupIndex()
+        for amount, transaction_date, description, fingerprint in existing:
+            index.add(amount, transaction_date, description, fingerprint)
+
+        kept = []
+        for position, values in pending:
+            if index.check_and_add(values[1], values[4], values[3]):
+                results[position] = {'index': position, 'status': 'duplicate',
+                                     'message': 'Potential duplicate detected'}
+                continue
+            kept.append((position, values))
+        return kept
+
     def check_duplicate_transaction(self, user_id: int, amount: float, description: str, 
-                                  transaction_date: date, threshold_hours: int = 2) -> bool:
-        """Check for potential duplicate transactions"""
-        start_time = transaction_date - timedelta(hours=threshold_hours)
-        end_time = transaction_date + timedelta(hours=threshold_hours)
-        
-        query = """
-        SELECT COUNT(*) FROM Transactions 
-        WHERE user_id = %s AND ABS(amount - %s) < 0.01 
-        AND transaction_date BETWEEN %s AND %s
-        AND LOWER(description) LIKE %s
-        """
-        
-        description_pattern = f"%{description.lower()[:20]}%"
-        result = self.execute_query(query, (user_id, amount, start_time, end_time, description_pattern), fetch_results=True)
-        
-        return result and result[0][0] > 0
+                                  transaction_date: date, threshold_hours: int = 2,
+                                  max_candidates: int = 50) -> bool:
+        """Check for potential duplicate transactions by fingerprint, then near-duplicates with the same amount"""
+        transaction_date = _to_date(transaction_date)
+        fingerprint = transaction_fingerprint(amount, transaction_date, description)
+        result = self.execute_query(
+            "SELECT 1 FROM Transactions WHERE user_id = %s AND fingerprint = %s LIMIT 1",
+            (user_id, fingerprint), fetch_results=True
+        )
+        if result:
+            return True
+
+        window = timedelta(days=threshold_hours // 24)
+        candidates = self.execute_query(
+            """
+            SELECT description FROM Transactions
+            WHERE user_id = %s AND transaction_date BETWEEN %s AND %s AND ABS(amount - %s) < 0.005
+            LIMIT %s
+            """,
+            (user_id, transaction_date - window, transaction_date + window, round(float(amount), 2),
+             max_candidates),
+            fetch_results=True
+        ) or []
+        normalized = normalize_description(description)
+        return any(is_near_duplicate(normalized, normalize_description(other)) for (other,) in candidates)
+
+    def backfill_fingerprints(self, user_id: int = None, batch_size: int = 1000) -> int:
+        """Fill Transactions.fingerprint for rows written before the column existed"""
+        where = "AND user_id = %s" if user_id else ""
+        params = (user_id,) if user_id else ()
+        updated = 0
+        while True:
+            rows = self.execute_query(
+                f"""
+                SELECT id, amount, transaction_date, description FROM Transactions
+                WHERE fingerprint IS NULL {where} LIMIT %s
+                """,
+                params + (batch_size,), fetch_results=True
+            )
+            if not rows:
+                return updated
+            try:
+                with self.transaction() as cursor:
+                    cursor.executemany(
+                        "UPDATE Transactions SET fingerprint = %s WHERE id = %s",
+                        [(transaction_fingerprint(amount, transaction_date, description), transaction_id)
+                         for transaction_id, amount, transaction_date, description in rows]
+                    )
+            except DB_ERRORS + (PoolTimeout,) as e:
+                print(f"Database error: {e}")
+                return updated
+            updated += len(rows)
 
     def generate_spending_insights(self, user_id: int):
         """Generate AI-like spending insights"""
-        insights = []
-        
-        # Anomaly detection
-        anomalies = self.detect_spending_anomalies(user_id)
-        insights.extend(anomalies)
-        
-        # Budget warnings
-        budget_warnings = self.check_budget_warnings(user_id)
-        insights.extend(budget_warnings)
-        
-        # Seasonal trends
-        trends = self.analyze_seasonal_trends(user_id)
-        insights.extend(trends)
-        
-        # Save insights to database
-        for insight in insights:
-            self.save_insight(user_id, insight)
+        self.generate_insights_for_users([user_id])
+
+    def generate_insights_for_users(self, user_ids: List[int] = None, chunk_size: int = 500) -> int:
+        """Generate and save insights for a chunk of users per query (every user when None); returns rows written"""
+        if user_ids is None:
+            user_ids = [row[0] for row in self.execute_query("SELECT id FROM Users", fetch_results=True) or []]
+        trends = self.analyze_seasonal_trends(None)
+        written = 0
+        for start in range(0, len(user_ids), chunk_size):
+            chunk = user_ids[start:start + chunk_size]
+            anomalies = self._spending_anomalies_for(chunk)
+            warnings = self._budget_warnings_for(chunk)
+            rows = []
+            for user_id in chunk:
+                for insight in anomalies.get(user_id, []) + warnings.get(user_id, []) + trends:
+                    rows.append((user_id, insight))
+            written += self.save_insights(rows)
+        return written
 
     def detect_spending_anomalies(self, user_id: int) -> List[Dict]:
         """Detect unusual spending patterns"""
-        insights = []
-        current_month = datetime.now().month
-        current_year = datetime.now().year
+        return self._spending_anomalies_for([user_id]).get(user_id, [])
+
+    def _spending_anomalies_for(self, user_ids: List[int]) -> Dict[int, List[Dict]]:
+        """Categories whose month-to-date spend is far above their usual month, for a set of users"""
+        insights = defaultdict(list)
+        today = date.today()
         
-        # Get category-wise spending for current and previous month
-        query = """
-        SELECT c.name, 
-               SUM(CASE WHEN MONTH(t.transaction_date) = %s AND YEAR(t.transaction_date) = %s 
-                   THEN t.amount ELSE 0 END) as current_month,
-               SUM(CASE WHEN MONTH(t.transaction_date) = %s AND YEAR(t.transaction_date) = %s 
-                   THEN t.amount ELSE 0 END) as previous_month
-        FROM Categories c
-        LEFT JOIN Transactions t ON c.id = t.category_id AND t.user_id = %s AND t.type = 'expense'
-        WHERE c.user_id = %s AND c.type = 'expense'
-        GROUP BY c.id, c.name
-        HAVING current_month > 0 OR previous_month > 0
+        query = f"""
+        SELECT a.user_id, a.category_id, c.name, a.total_amount
+        FROM MonthlyAggregates a
+        JOIN Categories c ON c.id = a.category_id
+        WHERE a.user_id IN ({_placeholders(user_ids)}) AND a.type = 'expense' AND c.type = 'expense'
+              AND a.year = %s AND a.month = %s
         """
+        results = self.execute_query(query, (*user_ids, today.year, today.month), fetch_results=True) or []
+        history = self.get_monthly_expense_series(sorted({row[0] for row in results}))
         
-        prev_month = current_month - 1 if current_month > 1 else 12
-        prev_year = current_year if current_month > 1 else current_year - 1
-        
-        results = self.execute_query(query, (current_month, current_year, prev_month, prev_year, user_id, user_id), fetch_results=True)
-        
-        for result in results or []:
-            category, current, previous = result
-            if previous > 0 and current > previous * 1.5:  # 50% increase
-                percentage = ((current - previous) / previous) * 100
-                insights.append({
-                    'type': 'anomaly',
-                    'title': f'High {category} Spending',
-                    'description': f'Your {category} spending is {percentage:.0f}% higher than last month (₹{current:.0f} vs ₹{previous:.0f})',
-                    'priority': 'high' if percentage > 100 else 'medium'
-                })
+        for user_id, category_id, category, current in results:
+            current = float(current)
+            past = trim_leading_zeros(history.get((user_id, category_id), []))
+            z = series_zscore(past, current)
+            if z is None or z < self.anomaly_detector.threshold or current <= past[-1]:
+                continue
+            typical = sum(past[-12:]) / len(past[-12:])
+            percentage = ((current - typical) / typical) * 100 if typical else 100
+            insights[user_id].append({
+                'type': 'anomaly',
+                'title': f'High {category} Spending',
+                'description': f'Your {category} spending this month (₹{current:.0f}) is well above '
+                               f'your usual ₹{typical:.0f}',
+                'priority': 'high' if percentage > 100 else 'medium',
+                'data': {'zscore': round(z, 2), 'current': current, 'typical': round(typical, 2)}
+            })
         
         return insights
 
     def check_budget_warnings(self, user_id: int) -> List[Dict]:
         """Check for budget threshold warnings"""
-        insights = []
-        current_month = datetime.now().month
-        current_year = datetime.now().year
-        
-        budgets = self.get_budget_summary(user_id, current_month, current_year)
-        
-        for budget in budgets:
-            if budget['percentage'] > 80:
-                if budget['percentage'] > 100:
-                    insights.append({
-                        'type': 'anomaly',
-                        'title': f'Budget Exceeded: {budget["category"]}',
-                        'description': f'You\'ve exceeded your {budget["category"]} budget by ₹{budget["spent"] - budget["limit"]:.0f}',
-                        'priority': 'high'
-                    })
-                else:
-                    insights.append({
-                        'type': 'suggestion',
-                        'title': f'Budget Warning: {budget["category"]}',
-                        'description': f'You\'ve used {budget["percentage"]:.0f}% of your {budget["category"]} budget',
-                        'priority': 'medium'
-                    })
+        return self._budget_warnings_for([user_id]).get(user_id, [])
+
+    def _budget_warnings_for(self, user_ids: List[int]) -> Dict[int, List[Dict]]:
+        """Budget warnings for a set of users, based on projected month-end spend"""
+        insights = defaultdict(list)
+        today = date.today()
+        
+        query = f"""
+        SELECT b.user_id, b.category_id, c.name, b.monthly_limit, COALESCE(a.total_amount, 0)
+        FROM Budgets b
+        JOIN Categories c ON c.id = b.category_id AND c.user_id = b.user_id AND c.type = 'expense'
+        LEFT JOIN MonthlyAggregates a ON a.user_id = b.user_id AND a.year = %s AND a.month = %s
+                  AND a.category_id = b.category_id AND a.type = 'expense'
+        WHERE b.user_id IN ({_placeholders(user_ids)})
+        """
+        results = self.execute_query(query, (today.year, today.month, *user_ids), fetch_results=True) or []
+        
+        history = self.get_monthly_expense_series(sorted({row[0] for row in results}))
+        forecasts = self.forecasts.forecast_many({(row[0], row[1]): history[(row[0], row[1])]
+                                                  for row in results if (row[0], row[1]) in history})
+        
+        for user_id, category_id, category, limit, spent in results:
+            limit, spent = float(limit), float(spent)
+            projected = projected_month_end(spent, forecasts.get((user_id, category_id)), today)
+            if spent > limit:
+                insights[user_id].append({
+                    'type': 'anomaly',
+                    'title': f'Budget Exceeded: {category}',
+                    'description': f'You\'ve exceeded your {category} budget by ₹{spent - limit:.0f}',
+                    'priority': 'high'
+                })
+            elif limit > 0 and projected > limit:
+                insights[user_id].append({
+                    'type': 'suggestion',
+                    'title': f'Budget Warning: {category}',
+                    'description': f'At this pace you\'ll spend about ₹{projected:.0f} of your ₹{limit:.0f} '
+                                   f'{category} budget this month',
+                    'priority': 'medium',
+                    'data': {'spent': spent, 'projected': round(projected, 2), 'limit': limit}
+                })
         
         return insights
 
+    def get_monthly_expense_series(self, user_ids: List[int], months: int = 24) -> Dict[Tuple[int, int], List[float]]:
+        """Expense totals per (user_id, category_id) for the complete months before this one, oldest first"""
+        if not user_ids:
+            return {}
+        today = date.today()
+        last = today.year * 12 + today.month - 2   # previous month, as year * 12 + (month - 1)
+        first = last - months + 1
+        query = f"""
+        SELECT user_id, category_id, year, month, total_amount
+        FROM MonthlyAggregates
+        WHERE user_id IN ({_placeholders(user_ids)}) AND type = 'expense'
+              AND year * 12 + month - 1 BETWEEN %s AND %s
+        """
+        series = {}
+        for user_id, category_id, year, month, total in self.execute_query(
+                query, (*user_ids, first, last), fetch_results=True) or []:
+            values = series.setdefault((user_id, category_id), [0.0] * months)
+            values[year * 12 + month - 1 - first] += float(total)
+        return series
+
     def analyze_seasonal_trends(self, user_id: int) -> List[Dict]:
         """Analyze seasonal spending patterns"""
         insights = []
@@ -207,13 +486,58 @@ class DBManager:
 
     def save_insight(self, user_id: int, insight: Dict):
         """Save insight to database"""
-        query = """
-        INSERT INTO FinancialInsights (user_id, insight_type, title, description, priority, data)
-        VALUES (%s, %s, %s, %s, %s, %s)
-        """
-        data_json = json.dumps(insight.get('data', {}))
-        self.execute_query(query, (user_id, insight['type'], insight['title'], 
-                                 insight['description'], insight['priority'], data_json))
+        self.save_insights([(user_id, insight)])
+
+    def save_insights(self, rows: List[Tuple[int, Dict]], chunk_size: int = 100) -> int:
+        """Upsert (user_id, insight) pairs keyed on (user, type, title, period), this month by default"""
+        if not rows:
+            return 0
+        now = datetime.now().replace(microsecond=0)
+        values = []
+        for user_id, insight in rows:
+            expires_at = insight.get('expires_at') or now + timedelta(days=INSIGHT_TTL_DAYS.get(insight['type'], 30))
+            values.append((user_id, insight['type'], insight['title'], insight['description'],
+                           insight['priority'], json.dumps(insight.get('data', {})),
+                           insight.get('period') or now.strftime('%Y-%m'), expires_at))
+        try:
+            with self.transaction() as cursor:
+                self._upsert_insights(cursor, values, chunk_size)
+            return len(values)
+        except DB_ERRORS + (PoolTimeout,) as e:
+            print(f"Database error: {e}")
+            return 0
+
+    @staticmethod
+    def _upsert_insights(cursor, values: List[Tuple], chunk_size: int = 100):
+        """Multi-row upsert of FinancialInsights value tuples on the caller's cursor"""
+        for start in range(0, len(values), chunk_size):
+            chunk = values[start:start + chunk_size]
+            cursor.execute(
+                f"""
+                INSERT INTO FinancialInsights (user_id, insight_type, title, description, priority,
+                                               data, period, expires_at)
+                VALUES {", ".join(["(%s, %s, %s, %s, %s, %s, %s, %s)"] * len(chunk))}
+                ON DUPLICATE KEY UPDATE description = VALUES(description), priority = VALUES(priority),
+                                        data = VALUES(data), expires_at = VALUES(expires_at)
+                """,
+                [value for row in chunk for value in row]
+            )
+
+    def prune_expired_insights(self, batch_size: int = 1000) -> int:
+        """Delete expired insights in batches so no single delete holds long locks"""
+        deleted = 0
+        while True:
+            rows = self.execute_query(
+                "SELECT id FROM FinancialInsights WHERE expires_at <= NOW() LIMIT %s",
+                (batch_size,), fetch_results=True
+            )
+            if not rows:
+                return deleted
+            ids = [row[0] for row in rows]
+            if self.execute_query(f"DELETE FROM FinancialInsights WHERE id IN ({_placeholders(ids)})",
+                                  tuple(ids)) is None:
+                return deleted
+            deleted += len(ids)
 
     def get_insights(self, user_id: int, limit: int = 10) -> List[Dict]:
         """Get recent insights for user"""
@@ -306,6 +630,147 @@ class DBManager:
         
         return success
 
+    def detect_recurring_schedules(self, user_id: int, months: int = 18) -> List[Dict]:
+        """Save recurring payments found in recent history as templates plus schedules; returns the new ones"""
+        since = date.today() - timedelta(days=months * 31)
+        query = """
+        SELECT type, amount, category_id, description, transaction_date
+        FROM Transactions
+        WHERE user_id = %s AND transaction_date >= %s AND type IN ('income', 'expense')
+        """
+        results = self.execute_query(query, (user_id, since), fetch_results=True) or []
+        history = [{'type': row[0], 'amount': row[1], 'category': row[2], 'description': row[3],
+                    'date': row[4]} for row in results]
+        patterns = [pattern for pattern in detect_recurring(history)
+                    if pattern['active'] and pattern['category'] is not None]
+        if not patterns:
+            return []
+
+        created = []
+        try:
+            with self.transaction() as cursor:
+                cursor.execute(
+                    """
+                    SELECT t.name FROM TransactionTemplates t
+                    JOIN RecurringSchedules s ON s.template_id = t.id
+                    WHERE t.user_id = %s
+                    """,
+                    (user_id,)
+                )
+                scheduled = {row[0] for row in cursor.fetchall()}
+                for pattern in patterns:
+                    name = pattern['merchant'].title()
+                    if name in scheduled:
+                        continue
+                    scheduled.add(name)
+                    cursor.execute(
+                        """
+                        INSERT INTO TransactionTemplates (user_id, name, type, amount, category_id, description)
+                        VALUES (%s, %s, %s, %s, %s, %s)
+                        """,
+                        (user_id, name, pattern['type'], pattern['amount'], pattern['category'],
+                         pattern['description'])
+                    )
+                    template_id = cursor.lastrowid
+                    cursor.execute(
+                        """
+                        INSERT INTO RecurringSchedules (user_id, template_id, frequency, interval_value,
+                                                        start_date, next_occurrence)
+                        VALUES (%s, %s, %s, 1, %s, %s)
+                        """,
+                        (user_id, template_id, pattern['frequency'], pattern['first_date'],
+                         pattern['next_occurrence'])
+                    )
+                    created.append({'template_id': template_id, 'name': name, **pattern})
+        except DB_ERRORS + (PoolTimeout,) as e:
+            print(f"Database error: {e}")
+            return []
+        return created
+
+    def post_due_schedules(self, today: date = None, batch_size: int = 1000) -> Dict[str, Any]:
+        """Post every occurrence of active schedules due on or before today and advance them.
+
+        Occurrences already posted are skipped, so a repeated run is safe; a database error sets stats['error'].
+        """
+        today = today or date.today()
+        stats = {'schedules': 0, 'posted': 0, 'skipped': 0, 'deactivated': 0}
+        query = """
+        SELECT s.id, s.user_id, s.template_id, s.frequency, s.interval_value, s.start_date, s.end_date,
+               s.next_occurrence, t.type, t.amount, t.category_id, t.description, t.name, t.notes
+        FROM RecurringSchedules s
+        JOIN TransactionTemplates t ON t.id = s.template_id
+        WHERE s.is_active = TRUE AND s.next_occurrence <= %s
+        ORDER BY s.next_occurrence, s.id
+        LIMIT %s
+        """
+        started = datetime.now()
+        try:
+            while True:
+                with self.transaction() as cursor:
+                    cursor.execute(query, (today, batch_size))
+                    schedules = cursor.fetchall()
+                    if not schedules:
+                        break
+                    stats['schedules'] += len(schedules)
+
+                    pending = []   # (user_id, row, (schedule_id, template_id))
+                    updates = []
+                    for (schedule_id, user_id, template_id, frequency, interval, start_date, end_date,
+                         next_occurrence, transaction_type, amount, category_id, description, name,
+                         notes) in schedules:
+                        end_date = _to_date(end_date) if end_date else None
+                        anchor_day = _to_date(start_date).day
+                        occurrence = _to_date(next_occurrence)
+                        while occurrence <= today and (end_date is None or occurrence <= end_date):
+                            pending.append((user_id, (transaction_type, amount, category_id, description or name,
+                                                      occurrence, notes, None, None, None),
+                                            (schedule_id, template_id)))
+                            occurrence = advance(occurrence, frequency, interval or 1, anchor_day)
+                        active = end_date is None or occurrence <= end_date
+                        stats['deactivated'] += not active
+                        updates.append((occurrence, active, schedule_id))
+
+                    posted = self._already_posted(cursor, [update[2] for update in updates],
+                                                  min(_to_date(row[7]) for row in schedules))
+                    entries = [entry for entry in pending if (entry[2][0], entry[1][4]) not in posted]
+                    stats['skipped'] += len(pending) - len(entries)
+                    usage = defaultdict(int)
+                    if entries:
+                        self._insert_transactions_for(cursor, [user_id for user_id, _, _ in entries],
+                                                      [row for _, row, _ in entries],
+                                                      schedules=[schedule for _, _, schedule in entries])
+                        for _, _, (_, template_id) in entries:
+                            usage[template_id] += 1
+                        stats['posted'] += len(entries)
+
+                    cursor.executemany("UPDATE RecurringSchedules SET next_occurrence = %s, is_active = %s "
+                                       "WHERE id = %s", updates)
+                    if usage:
+                        cursor.executemany("UPDATE TransactionTemplates SET usage_count = usage_count + %s "
+                                           "WHERE id = %s", [(count, template_id)
+                                                             for template_id, count in usage.items()])
+        except DB_ERRORS + (PoolTimeout,) as e:
+            print(f"Database error: {e}")
+            stats['error'] = str(e)
+        stats['seconds'] = (datetime.now() - started).total_seconds()
+        return stats
+
+    @staticmethod
+    def _already_posted(cursor, schedule_ids: List[int], since: date) -> set:
+        """{(recurring_schedule_id, transaction_date)} already posted for these schedules since a date"""
+        posted = set()
+        for start in range(0, len(schedule_ids), 500):
+            chunk = schedule_ids[start:start + 500]
+            cursor.execute(
+                f"""
+                SELECT recurring_schedule_id, transaction_date FROM Transactions
+                WHERE recurring_schedule_id IN ({_placeholders(chunk)}) AND transaction_date >= %s
+                """,
+                (*chunk, since)
+            )
+            posted.update((schedule_id, _to_date(day)) for schedule_id, day in cursor.fetchall())
+        return posted
+
     def create_savings_goal(self, user_id: int, name: str, target_amount: float, 
                           target_date: date = None, priority: str = 'medium') -> bool:
         """Create a savings goal"""
@@ -347,41 +812,38 @@ class DBManager:
         query = "UPDATE SavingsGoals SET current_amount = current_amount + %s WHERE id = %s"
         return self.execute_query(query, (amount, goal_id)) is not None
 
-    # ...existing methods continue...
-
-
-import mysql.connector
-from mysql.connector import Error
-import hashlib
-import bcrypt
-from datetime import datetime, date
-from typing import List, Tuple, Optional, Dict, Any
-
-class DBManager:
-    def __init__(self):
-        self.connection = None
-        self.current_user_id = None
-
     def connect(self):
-        """Establish a connection to the MySQL database"""
+        """Create the connection pool for the configured database backend"""
         try:
-            from config import DB_CONFIG
-            self.connection = mysql.connector.connect(**DB_CONFIG)
-            if self.connection.is_connected():
-                print("Successfully connected to MySQL database")
-                return True
-        except Error as e:
-            print(f"Error connecting to MySQL: {e}")
+            if self.config is None:
+                from config import DB_CONFIG
+                self.config = DB_CONFIG
+            backend = get_backend(self.config)
+            pool = ConnectionPool(backend.connect, backend.is_alive, **backend.pool_args)
+            # Open the first connection eagerly so bad credentials surface here
+            with pool.connection():
+                pass
+            self.backend = backend
+            self.pool = pool
+            print(f"Successfully connected to {backend.describe()} (pool size {pool.size})")
+            return True
+        except DB_ERRORS as e:
+            print(f"Error connecting to database: {e}")
             return False
         except ImportError:
             print("Error: config.py not found. Please create it with your database configuration.")
             return False
 
     def disconnect(self):
-        """Close the database connection"""
-        if self.connection and self.connection.is_connected():
-            self.connection.close()
-            print("MySQL connection closed")
+        """Close all pooled database connections"""
+        if self.pool:
+            self.pool.close()
+            self.pool = None
+            print("Database connection pool closed")
+
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """Get connection pool counters (checkouts, waits, reconnects, ...)"""
+        return self.pool.get_stats() if self.pool else {}
 
     def hash_password(self, password: str) -> str:
         """Hash password using bcrypt"""
@@ -394,9 +856,8 @@ class DBManager:
     def create_user(self, username: str, password: str, currency_id: int = 1) -> bool:
         """Create a new user and default categories"""
         try:
-            if not self.connection or not self.connection.is_connected():
-                if not self.connect():
-                    return False
+            if not self.pool and not self.connect():
+                return False
                     
             hashed_password = self.hash_password(password)
             query = "INSERT INTO Users (username, hashed_password, currency_id) VALUES (%s, %s, %s)"
@@ -428,12 +889,12 @@ class DBManager:
         query = "INSERT INTO Categories (user_id, name, type) VALUES (%s, %s, %s)"
         for name, cat_type in default_categories:
             self.execute_query(query, (user_id, name, cat_type))
+        self.invalidate_category_cache(user_id)
 
     def authenticate_user(self, username: str, password: str) -> Optional[int]:
         """Authenticate user and return user_id if successful"""
-        if not self.connection or not self.connection.is_connected():
-            if not self.connect():
-                return None
+        if not self.pool and not self.connect():
+            return None
                 
         query = "SELECT id, hashed_password FROM Users WHERE username = %s"
         result = self.execute_query(query, (username,), fetch_results=True)
@@ -484,18 +945,425 @@ class DBManager:
                        category_id: int, description: str, transaction_date: date, 
                        notes: str = None, attachment_path: str = None) -> bool:
         """Add a new transaction"""
+        row = (transaction_type, amount, category_id, description, transaction_date,
+               notes, None, None, attachment_path)
+        try:
+            with self.transaction() as cursor:
+                self._insert_transactions(cursor, user_id, [row])
+            return True
+        except DB_ERRORS + (PoolTimeout,) as e:
+            print(f"Database error: {e}")
+            return False
+
+    def _insert_transactions(self, cursor, user_id: int, rows: List[Tuple], chunk_size: int = 500,
+                             schedules: List[Tuple[int, int]] = None) -> int:
+        """Insert transaction tuples and roll them into MonthlyAggregates; the caller owns the transaction"""
+        return self._insert_transactions_for(cursor, [user_id] * len(rows), rows, chunk_size, schedules)
+
+    def _insert_transactions_for(self, cursor, user_ids: List[int], rows: List[Tuple], chunk_size: int = 500,
+                                 schedules: List[Tuple[int, int]] = None) -> int:
+        """_insert_transactions for rows of several users at once; user_ids[i] owns rows[i]"""
+        values = [(user_id, *row, transaction_fingerprint(row[1], row[4], row[3]))
+                  for user_id, row in zip(user_ids, rows)]
+        if schedules is None:
+            query = """
+            INSERT INTO Transactions (user_id, type, amount, category_id, description, 
+                                    transaction_date, notes, tags, location, attachment_path, fingerprint) 
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            """
+        else:
+            query = """
+            INSERT INTO Transactions (user_id, type, amount, category_id, description, transaction_date, notes,
+                                    tags, location, attachment_path, fingerprint, is_recurring,
+                                    recurring_schedule_id, template_id)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, TRUE, %s, %s)
+            """
+            values = [(*value, *schedule) for value, schedule in zip(values, schedules)]
+
+        def insert(run):
+            if len(run) == 1:
+                cursor.execute(query, run[0])
+            else:
+                for start in range(0, len(run), chunk_size):
+                    cursor.executemany(query, run[start:start + chunk_size])
+
+        # Tagged rows are inserted one at a time, since their ids are needed for TransactionTags
+        tagged, run = [], []
+        for user_id, value, row in zip(user_ids, values, rows):
+            if row[6]:
+                insert(run)
+                run = []
+                cursor.execute(query, value)
+                tagged.append((user_id, cursor.lastrowid, _parse_tags(row[6])))
+            else:
+                run.append(value)
+        insert(run)
+        last_id = cursor.lastrowid
+        if tagged:
+            self._attach_tags(cursor, tagged)
+
+        deltas = defaultdict(lambda: [0.0, 0])
+        for user_id, (transaction_type, amount, category_id, _, transaction_date, *_) in zip(user_ids, rows):
+            transaction_date = _to_date(transaction_date)
+            delta = deltas[(user_id, transaction_date.year, transaction_date.month, category_id, transaction_type)]
+            delta[0] += float(amount)
+            delta[1] += 1
+        self._apply_aggregate_deltas(cursor, deltas)
+        self._score_new_transactions(cursor, user_ids, rows)
+        expenses = defaultdict(list)
+        for user_id, (transaction_type, amount, _, _, transaction_date, *_) in zip(user_ids, rows):
+            if transaction_type == 'expense':
+                expenses[user_id].append((_to_date(transaction_date), float(amount)))
+        for user_id, days in expenses.items():
+            def add(heatmap, days=days):
+                for day, amount in days:
+                    heatmap.add(day, amount)
+            self._update_cached(self._heatmaps, self._heatmap_lock, user_id, add)
+        return last_id
+
+    def _score_new_transactions(self, cursor, user_ids: List[int], rows: List[Tuple]):
+        """Score new expenses against their category's statistics; insights and AnomalyState go on the cursor"""
+        detector = self.anomaly_detector
+        with self._anomaly_lock:
+            missing = list(set(user_ids) - self._anomaly_users)
+            for start in range(0, len(missing), 500):
+                chunk = missing[start:start + 500]
+                cursor.execute(f"SELECT user_id, category_id, mean, variance, observations FROM AnomalyState "
+                               f"WHERE user_id IN ({_placeholders(chunk)})", chunk)
+                for user_id, category_id, mean, variance, observations in cursor.fetchall():
+                    detector.load((user_id, category_id), mean, variance, observations)
+            self._anomaly_users.update(missing)
+
+            now = datetime.now().replace(microsecond=0)
+            insights = []
+            for user_id, (transaction_type, amount, category_id, description, transaction_date, *_) \
+                    in zip(user_ids, rows):
+                if transaction_type != 'expense' or category_id is None:
+                    continue
+                key = (user_id, category_id)
+                typical = detector.typical(key)
+                z, is_anomaly = detector.observe(key, float(amount))
+                if is_anomaly:
+                    transaction_date = _to_date(transaction_date)
+                    label = description or 'Expense'
+                    insights.append((user_id, 'anomaly', f'Unusual expense: {label[:80]}',
+                                     f'₹{float(amount):.0f} on {transaction_date:%d %b} is far above your usual '
+                                     f'₹{typical:.0f} in this category',
+                                     'high' if z >= 2 * detector.threshold else 'medium',
+                                     json.dumps({'zscore': round(z, 2), 'amount': float(amount)}),
+                                     transaction_date.isoformat(),
+                                     now + timedelta(days=INSIGHT_TTL_DAYS['anomaly'])))
+            changed = [(uid, category_id, state.mean, state.variance, state.count)
+                       for (uid, category_id), state in detector.take_dirty()]
+
+        if changed:
+            cursor.executemany(
+                """
+                INSERT INTO AnomalyState (user_id, category_id, mean, variance, observations)
+                VALUES (%s, %s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE mean = VALUES(mean), variance = VALUES(variance),
+                                        observations = VALUES(observations), updated_at = CURRENT_TIMESTAMP
+                """,
+                changed
+            )
+        if insights:
+            self._upsert_insights(cursor, insights)
+
+    def rebuild_anomaly_state(self, user_id: int = None) -> bool:
+        """Recompute AnomalyState by replaying expenses in date order (one pass per user)"""
+        where = "AND user_id = %s" if user_id else ""
+        params = (user_id,) if user_id else ()
+        detector = AnomalyDetector(self.anomaly_detector.alpha, self.anomaly_detector.threshold,
+                                   self.anomaly_detector.warmup)
+        try:
+            with self.transaction() as cursor:
+                cursor.execute(f"DELETE FROM AnomalyState WHERE 1 = 1 {where}", params)
+                cursor.execute(
+                    f"""
+                    SELECT user_id, category_id, amount FROM Transactions
+                    WHERE type = 'expense' {where}
+                    ORDER BY user_id, transaction_date, id
+                    """,
+                    params
+                )
+                for row_user_id, category_id, amount in cursor:
+                    detector.observe((row_user_id, category_id), float(amount))
+                cursor.executemany(
+                    "INSERT INTO AnomalyState (user_id, category_id, mean, variance, observations) "
+                    "VALUES (%s, %s, %s, %s, %s)",
+                    [(uid, category_id, state.mean, state.variance, state.count)
+                     for (uid, category_id), state in detector.states.items()]
+                )
+        except DB_ERRORS + (PoolTimeout,) as e:
+            print(f"Database error: {e}")
+            return False
+        finally:
+            self._forget_anomaly_state()
+        return True
+
+    def _forget_anomaly_state(self):
+        """Drop in-memory detector state; it is reloaded from AnomalyState on next use"""
+        with self._anomaly_lock:
+            self.anomaly_detector.forget()
+            self._anomaly_users.clear()
+
+    def _attach_tags(self, cursor, tagged: List[Tuple[int, int, Tuple[str, ...]]]):
+        """Link (user_id, transaction_id, tag names) to Tags rows on the caller's cursor"""
+        names = defaultdict(set)
+        for user_id, _, tags in tagged:
+            names[user_id].update(tags)
+        cursor.executemany("INSERT IGNORE INTO Tags (user_id, name) VALUES (%s, %s)",
+                           [(user_id, name) for user_id, user_names in names.items() for name in sorted(user_names)])
+        tag_ids = {}
+        for user_id, user_names in names.items():
+            user_names = sorted(user_names)
+            for start in range(0, len(user_names), 500):
+                chunk = user_names[start:start + 500]
+                cursor.execute(f"SELECT id, name FROM Tags WHERE user_id = %s AND name IN ({_placeholders(chunk)})",
+                               (user_id, *chunk))
+                for tag_id, name in cursor.fetchall():
+                    tag_ids[(user_id, name)] = tag_id
+        cursor.executemany("INSERT IGNORE INTO TransactionTags (transaction_id, tag_id) VALUES (%s, %s)",
+                           [(transaction_id, tag_ids[(user_id, name)])
+                            for user_id, transaction_id, tags in tagged for name in tags])
+        by_user = defaultdict(list)
+        for user_id, transaction_id, tags in tagged:
+            by_user[user_id].append((transaction_id, tags))
+        for user_id, added in by_user.items():
+            def add(index, added=added):
+                for transaction_id, tags in added:
+                    index.add(transaction_id, tags)
+            self._update_cached(self._tag_indexes, self._tag_lock, user_id, add)
+
+    def _update_cached(self, caches: Dict[int, Any], lock, user_id: int, update):
+        """Call update(cached) on a user's cache entry once the open transaction() commits"""
+        # A cache loaded while the transaction was open may or may not hold its
+        # rows, so it is dropped (and reloaded on next use) instead of updated
+        with lock:
+            cached = caches.get(user_id)
+
+        def apply():
+            with lock:
+                if caches.get(user_id) is not cached:
+                    caches.pop(user_id, None)
+                elif cached is not None:
+                    update(cached)
+
+        updates = getattr(self._pending, 'updates', None)
+        if updates is None:
+            apply()
+        else:
+            updates.append((user_id, apply))
+
+    def _forget_tag_indexes(self, user_id: int = None):
+        """Drop cached tag indexes (one user's or all); they are reloaded on next use"""
+        with self._tag_lock:
+            if user_id is None:
+                self._tag_indexes.clear()
+            else:
+                self._tag_indexes.pop(user_id, None)
+
+    def _forget_heatmaps(self, user_id: int = None):
+        """Drop cached heatmaps (one user's or all); they are reloaded on next use"""
+        with self._heatmap_lock:
+            if user_id is None:
+                self._heatmaps.clear()
+            else:
+                self._heatmaps.pop(user_id, None)
+
+    def get_heatmap(self, user_id: int) -> HeatmapEngine:
+        """Cached HeatmapEngine of a user's daily expenses, kept current by inserts and deletes"""
+        with self._heatmap_lock:
+            heatmap = self._heatmaps.get(user_id)
+        if heatmap is not None:
+            return heatmap
+        heatmap = HeatmapEngine()
+        try:
+            with self.read_snapshot() as cursor:
+                cursor.execute(
+                    "SELECT transaction_date, amount FROM Transactions WHERE user_id = %s AND type = 'expense'",
+                    (user_id,)
+                )
+                heatmap.extend({"date": transaction_date, "type": "expense", "amount": float(amount)}
+                               for transaction_date, amount in cursor)
+        except DB_ERRORS + (PoolTimeout,) as e:
+            print(f"Database error: {e}")
+            return HeatmapEngine()
+        with self._heatmap_lock:
+            return self._heatmaps.setdefault(user_id, heatmap)
+
+    def get_tag_index(self, user_id: int) -> TagIndex:
+        """Cached TagIndex of a user's tagged transactions, loaded from TransactionTags on first use"""
+        with self._tag_lock:
+            index = self._tag_indexes.get(user_id)
+        if index is not None:
+            return index
+        rows = self.execute_query(
+            """
+            SELECT tt.transaction_id, t.name FROM Tags t
+            JOIN TransactionTags tt ON tt.tag_id = t.id
+            WHERE t.user_id = %s
+            ORDER BY tt.transaction_id
+            """,
+            (user_id,), fetch_results=True
+        ) or []
+        index = TagIndex()
+        index.extend((transaction_id, [name for _, name in group], None)
+                     for transaction_id, group in groupby(rows, key=lambda row: row[0]))
+        with self._tag_lock:
+            return self._tag_indexes.setdefault(user_id, index)
+
+    def suggest_tags(self, user_id: int, prefix: str, limit: int = 10) -> List[str]:
+        """A user's most used tags starting with prefix, for autocomplete"""
+        index = self.get_tag_index(user_id)
+        with self._tag_lock:
+            return index.suggest(prefix, limit)
+
+    def get_transactions_by_tags(self, user_id: int, all_of: List[str] = (), any_of: List[str] = (),
+                                 none_of: List[str] = (), limit: int = None) -> List[Tuple]:
+        """Transactions matching a tag combination via the user's TagIndex, newest first"""
+        index = self.get_tag_index(user_id)
+        with self._tag_lock:
+            ids = index.ids(all_of, any_of, none_of)
+        rows = []
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            rows += self.execute_query(
+                f"""
+                SELECT t.id, t.type, t.amount, c.name, t.description, t.transaction_date,
+                       t.notes, t.attachment_path
+                FROM Transactions t
+                JOIN Categories c ON t.category_id = c.id
+                WHERE t.id IN ({_placeholders(chunk)}) AND t.user_id = %s
+                """,
+                (*chunk, user_id), fetch_results=True
+            ) or []
+        rows.sort(key=lambda row: (_to_date(row[5]), row[0]), reverse=True)
+        return rows[:limit] if limit else rows
+
+    def rebuild_tags(self, user_id: int = None, batch_size: int = 1000) -> int:
+        """Recreate Tags and TransactionTags from Transactions.tags; returns the tagged count or -1"""
+        where = "AND user_id = %s" if user_id else ""
+        params = (user_id,) if user_id else ()
+        tagged_count = 0
+        last_id = 0
+        try:
+            with self.transaction() as cursor:
+                if user_id:
+                    cursor.execute("DELETE FROM TransactionTags WHERE tag_id IN "
+                                   "(SELECT id FROM Tags WHERE user_id = %s)", params)
+                    cursor.execute("DELETE FROM Tags WHERE user_id = %s", params)
+                else:
+                    cursor.execute("DELETE FROM TransactionTags")
+                    cursor.execute("DELETE FROM Tags")
+            while True:
+                with self.transaction() as cursor:
+                    cursor.execute(
+                        f"""
+                        SELECT id, user_id, tags FROM Transactions
+                        WHERE id > %s AND tags IS NOT NULL {where}
+                        ORDER BY id LIMIT %s
+                        """,
+                        (last_id, *params, batch_size)
+                    )
+                    rows = cursor.fetchall()
+                    if not rows:
+                        break
+                    last_id = rows[-1][0]
+                    tagged = [(row_user_id, transaction_id, tags) for transaction_id, row_user_id, value in rows
+                              for tags in [_parse_tags(value)] if tags]
+                    if tagged:
+                        self._attach_tags(cursor, tagged)
+                    tagged_count += len(tagged)
+        except DB_ERRORS + (PoolTimeout,) as e:
+            print(f"Database error: {e}")
+            return -1
+        finally:
+            self._forget_tag_indexes(user_id)
+        return tagged_count
+
+    def _apply_aggregate_deltas(self, cursor, deltas: Dict[Tuple, List]):
+        """Add {(user_id, year, month, category_id, type): [amount, count]} deltas to MonthlyAggregates"""
+        if not deltas:
+            return
+        # Edits can keep a month's count and total, so its stored usage sketch is dropped instead
+        months = {key[:3] for key in deltas if key[4] == 'expense'}
+        if months:
+            cursor.executemany("DELETE FROM UsageSketches WHERE user_id = %s AND year = %s AND month = %s",
+                               sorted(months))
         query = """
-        INSERT INTO Transactions (user_id, type, amount, category_id, description, 
-                                transaction_date, notes, attachment_path) 
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        INSERT INTO MonthlyAggregates (user_id, year, month, category_id, type, 
+                                       total_amount, transaction_count)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE total_amount = total_amount + VALUES(total_amount),
+                                transaction_count = transaction_count + VALUES(transaction_count)
         """
-        params = (user_id, transaction_type, amount, category_id, description, 
-                 transaction_date, notes, attachment_path)
-        return self.execute_query(query, params) is not None
+        cursor.executemany(query, [(*key, round(amount, 2), count) for key, (amount, count) in deltas.items()])
+
+    def delete_transaction(self, user_id: int, transaction_id: int) -> bool:
+        """Delete a transaction and subtract it from MonthlyAggregates"""
+        try:
+            with self.transaction() as cursor:
+                cursor.execute(
+                    """
+                    SELECT type, amount, category_id, transaction_date FROM Transactions
+                    WHERE id = %s AND user_id = %s
+                    """,
+                    (transaction_id, user_id)
+                )
+                row = cursor.fetchone()
+                if not row:
+                    return False
+                transaction_type, amount, category_id, transaction_date = row
+                cursor.execute("DELETE FROM TransactionTags WHERE transaction_id = %s", (transaction_id,))
+                cursor.execute("DELETE FROM Transactions WHERE id = %s AND user_id = %s",
+                               (transaction_id, user_id))
+                self._update_cached(self._tag_indexes, self._tag_lock, user_id,
+                                    lambda index: index.remove(transaction_id))
+                transaction_date = _to_date(transaction_date)
+                if transaction_type == 'expense':
+                    self._update_cached(self._heatmaps, self._heatmap_lock, user_id,
+                                        lambda heatmap: heatmap.remove(transaction_date, float(amount)))
+                self._apply_aggregate_deltas(cursor, {
+                    (user_id, transaction_date.year, transaction_date.month, category_id, transaction_type):
+                        [-float(amount), -1]
+                })
+            return True
+        except DB_ERRORS + (PoolTimeout,) as e:
+            print(f"Database error: {e}")
+            return False
+
+    def rebuild_monthly_aggregates(self, user_id: int = None) -> bool:
+        """Recompute MonthlyAggregates from Transactions for one user or everyone"""
+        # Summed here from an index scan; GROUP BY YEAR()/MONTH() would sort every row first
+        where = "WHERE user_id = %s" if user_id else ""
+        params = (user_id,) if user_id else ()
+        totals = defaultdict(lambda: [0.0, 0])
+        try:
+            with self.transaction() as cursor:
+                cursor.execute(f"DELETE FROM MonthlyAggregates {where}", params)
+                cursor.execute(
+                    f"SELECT user_id, transaction_date, type, category_id, amount FROM Transactions {where}",
+                    params
+                )
+                for row_user_id, transaction_date, transaction_type, category_id, amount in cursor:
+                    transaction_date = _to_date(transaction_date)
+                    total = totals[(row_user_id, transaction_date.year, transaction_date.month,
+                                    category_id, transaction_type)]
+                    total[0] += float(amount)
+                    total[1] += 1
+                self._apply_aggregate_deltas(cursor, totals)
+            return True
+        except DB_ERRORS + (PoolTimeout,) as e:
+            print(f"Database error: {e}")
+            return False
+        finally:
+            # Restores call this after bulk loads that bypass the incremental heatmap updates
+            self._forget_heatmaps(user_id)
 
     def get_transactions(self, user_id: int, month: int = None, year: int = None, 
-                        limit: int = None) -> List[Tuple]:
-        """Get transactions with optional filters"""
+                        limit: int = None, after: Tuple[date, int] = None) -> List[Tuple]:
+        """Get transactions with optional filters, newest first; after is the previous page's last (date, id)"""
         query = """
         SELECT t.id, t.type, t.amount, c.name, t.description, t.transaction_date, 
                t.notes, t.attachment_path
@@ -506,10 +1374,15 @@ class DBManager:
         params = [user_id]
         
         if month and year:
-            query += " AND MONTH(t.transaction_date) = %s AND YEAR(t.transaction_date) = %s"
-            params.extend([month, year])
+            # Half-open range instead of MONTH()/YEAR() so idx_user_date can be used
+            query += " AND t.transaction_date >= %s AND t.transaction_date < %s"
+            params.extend(_month_range(month, year))
+
+        if after:
+            query += " AND (t.transaction_date < %s OR (t.transaction_date = %s AND t.id < %s))"
+            params.extend([after[0], after[0], after[1]])
             
-        query += " ORDER BY t.transaction_date DESC"
+        query += " ORDER BY t.transaction_date DESC, t.id DESC"
         
         if limit:
             query += " LIMIT %s"
@@ -517,6 +1390,66 @@ class DBManager:
             
         return self.execute_query(query, params, fetch_results=True) or []
 
+    def search_transactions(self, user_id: int, text: str, date_from: date = None, date_to: date = None,
+                            min_amount: float = None, max_amount: float = None, category_id: int = None,
+                            transaction_type: str = None, page: int = 1, page_size: int = 25) -> Dict[str, Any]:
+        """Ranked, filtered and paged text search over description, notes and location"""
+        required, excluded = parse_query(text)
+        page = max(1, page)
+        columns = """t.id, t.type, t.amount, c.name, t.description, t.transaction_date,
+                     t.notes, t.attachment_path"""
+        conditions, params = ["t.user_id = %s"], [user_id]
+        for condition, value in (("t.transaction_date >= %s", date_from), ("t.transaction_date <= %s", date_to),
+                                 ("t.amount >= %s", min_amount), ("t.amount <= %s", max_amount),
+                                 ("t.category_id = %s", category_id), ("t.type = %s", transaction_type)):
+            if value is not None:
+                conditions.append(condition)
+                params.append(value)
+
+        if required and self.backend.fulltext and self.backend.name == 'sqlite':
+            weights = ", ".join(str(weight) for weight in COLUMN_WEIGHTS)
+            # All of the user's matches are ranked before paging. CROSS JOIN keeps the FTS scan
+            # as the outer loop: driven from Transactions, SQLite re-runs the MATCH for every row
+            query = f"""
+            SELECT {columns}, -bm25(TransactionSearch, {weights}) AS score
+            FROM TransactionSearch
+            CROSS JOIN Transactions t ON t.id = TransactionSearch.rowid
+            JOIN Categories c ON t.category_id = c.id
+            WHERE TransactionSearch MATCH %s AND {' AND '.join(conditions)}
+            ORDER BY score DESC, t.transaction_date DESC, t.id DESC
+            """
+            params = [fts5_expression(required, excluded)] + params
+        elif required and self.backend.fulltext:
+            expression = mysql_boolean_expression(required, excluded)
+            query = f"""
+            SELECT {columns}, MATCH(t.description, t.notes, t.location) AGAINST (%s IN BOOLEAN MODE) AS score
+            FROM Transactions t
+            JOIN Categories c ON t.category_id = c.id
+            WHERE MATCH(t.description, t.notes, t.location) AGAINST (%s IN BOOLEAN MODE)
+              AND {' AND '.join(conditions)}
+            ORDER BY score DESC, t.transaction_date DESC, t.id DESC
+            """
+            params[:0] = [expression, expression]
+        else:
+            any_column = " OR ".join(f"LOWER(COALESCE(t.{column}, '')) LIKE %s ESCAPE '{LIKE_ESCAPE}'"
+                                     for column in ("description", "notes", "location"))
+            for words, prefix in [(words, "") for words in required] + [(words, "NOT ") for words in excluded]:
+                conditions.append(f"{prefix}({any_column})")
+                params += [like_pattern(words)] * 3
+            query = f"""
+            SELECT {columns}, 0 AS score
+            FROM Transactions t
+            JOIN Categories c ON t.category_id = c.id
+            WHERE {' AND '.join(conditions)}
+            ORDER BY t.transaction_date DESC, t.id DESC
+            """
+        # One extra row tells whether another page follows, without a COUNT(*)
+        query += " LIMIT %s OFFSET %s"
+        params += [page_size + 1, (page - 1) * page_size]
+        rows = self.execute_query(query, params, fetch_results=True) or []
+        return {'results': rows[:page_size], 'page': page, 'page_size': page_size,
+                'has_more': len(rows) > page_size}
+
     def get_categories(self, user_id: int, category_type: str = None) -> List[Tuple]:
         """Get user categories"""
         query = "SELECT id, name, type FROM Categories WHERE user_id = %s"
@@ -532,24 +1465,23 @@ class DBManager:
     def add_category(self, user_id: int, name: str, category_type: str, 
                     icon_path: str = None) -> bool:
         """Add a new category"""
-        query = "INSERT INTO Categories (user_id, name, type, icon_path) VALUES (%s, %s, %s, %s)"
-        return self.execute_query(query, (user_id, name, category_type, icon_path)) is not None
+        query = "INSERT INTO Categories (user_id, name, type, icon_name) VALUES (%s, %s, %s, %s)"
+        success = self.execute_query(query, (user_id, name, category_type, icon_path)) is not None
+        self.invalidate_category_cache(user_id)
+        return success
 
     def get_budget_summary(self, user_id: int, month: int, year: int) -> List[Dict]:
         """Get budget summary for a specific month"""
         query = """
         SELECT c.name, b.monthly_limit, 
-               COALESCE(SUM(t.amount), 0) as spent
+               COALESCE(a.total_amount, 0) as spent
         FROM Categories c
-        LEFT JOIN Budgets b ON c.id = b.category_id AND b.user_id = %s
-        LEFT JOIN Transactions t ON c.id = t.category_id AND t.user_id = %s 
-                  AND MONTH(t.transaction_date) = %s AND YEAR(t.transaction_date) = %s
-                  AND t.type = 'expense'
+        JOIN Budgets b ON c.id = b.category_id AND b.user_id = %s
+        LEFT JOIN MonthlyAggregates a ON a.user_id = %s AND a.year = %s AND a.month = %s
+                  AND a.category_id = c.id AND a.type = 'expense'
         WHERE c.user_id = %s AND c.type = 'expense'
-        GROUP BY c.id, c.name, b.monthly_limit
-        HAVING b.monthly_limit IS NOT NULL
         """
-        results = self.execute_query(query, (user_id, user_id, month, year, user_id), fetch_results=True)
+        results = self.execute_query(query, (user_id, user_id, year, month, user_id), fetch_results=True)
         
         budgets = []
         for result in results or []:
@@ -590,31 +1522,31 @@ class DBManager:
         """Get comprehensive dashboard data"""
         # Total income and expenses
         query = """
-        SELECT type, SUM(amount) 
-        FROM Transactions 
-        WHERE user_id = %s AND MONTH(transaction_date) = %s AND YEAR(transaction_date) = %s
+        SELECT type, SUM(total_amount) 
+        FROM MonthlyAggregates 
+        WHERE user_id = %s AND year = %s AND month = %s
         GROUP BY type
         """
-        totals_result = self.execute_query(query, (user_id, month, year), fetch_results=True)
+        totals_result = self.execute_query(query, (user_id, year, month), fetch_results=True)
         
         income = expense = 0
         for result in totals_result or []:
             if result[0] == 'income':
                 income = float(result[1])
-            else:
+            elif result[0] == 'expense':
                 expense = float(result[1])
         
         # Category-wise expenses
         query = """
-        SELECT c.name, SUM(t.amount) 
-        FROM Transactions t 
-        JOIN Categories c ON t.category_id = c.id 
-        WHERE t.user_id = %s AND t.type = 'expense' 
-              AND MONTH(t.transaction_date) = %s AND YEAR(t.transaction_date) = %s
+        SELECT c.name, SUM(a.total_amount) 
+        FROM MonthlyAggregates a 
+        JOIN Categories c ON a.category_id = c.id 
+        WHERE a.user_id = %s AND a.year = %s AND a.month = %s 
+              AND a.type = 'expense' AND a.transaction_count > 0
         GROUP BY c.name
-        ORDER BY SUM(t.amount) DESC
+        ORDER BY SUM(a.total_amount) DESC
         """
-        category_expenses = self.execute_query(query, (user_id, month, year), fetch_results=True)
+        category_expenses = self.execute_query(query, (user_id, year, month), fetch_results=True)
         
         return {
             'income': income,
@@ -624,32 +1556,210 @@ class DBManager:
             'recent_transactions': self.get_transactions(user_id, limit=5)
         }
 
+    def query_spending(self, user_id: int, metric: str = 'sum', transaction_type: str = 'expense',
+                       date_from: date = None, date_to: date = None, category_ids: List[int] = None,
+                       group_by: str = None, order: str = None, limit: int = None,
+                       source: str = 'transactions') -> List[Tuple]:
+        """sum/count/average/max/min of a user's amounts, optionally by category or month; dates inclusive"""
+        # source='aggregates' reads MonthlyAggregates, so the range must be whole months
+        if source == 'aggregates':
+            value = {'sum': "SUM(a.total_amount)", 'count': "SUM(a.transaction_count)",
+                     'average': "SUM(a.total_amount) / NULLIF(SUM(a.transaction_count), 0)"}[metric]
+            table, alias, month_key = "MonthlyAggregates", "a", ("a.year", "a.month")
+            conditions, params = ["a.user_id = %s", "a.type = %s", "a.transaction_count > 0"], [user_id, transaction_type]
+            if date_from:
+                conditions.append("a.year * 12 + a.month >= %s")
+                params.append(date_from.year * 12 + date_from.month)
+            if date_to:
+                conditions.append("a.year * 12 + a.month <= %s")
+                params.append(date_to.year * 12 + date_to.month)
+        else:
+            value = {'sum': "SUM(t.amount)", 'count': "COUNT(*)", 'average': "AVG(t.amount)",
+                     'max': "MAX(t.amount)", 'min': "MIN(t.amount)"}[metric]
+            table, alias = "Transactions", "t"
+            month_key = ("YEAR(t.transaction_date)", "MONTH(t.transaction_date)")
+            conditions, params = ["t.user_id = %s", "t.type = %s"], [user_id, transaction_type]
+            if date_from:
+                conditions.append("t.transaction_date >= %s")
+                params.append(date_from)
+            if date_to:
+                conditions.append("t.transaction_date <= %s")
+                params.append(date_to)
+        if category_ids:
+            conditions.append(f"{alias}.category_id IN ({_placeholders(category_ids)})")
+            params.extend(category_ids)
+        where = " AND ".join(conditions)
+
+        if group_by == 'category':
+            query = f"""
+            SELECT c.name, {value} FROM {table} {alias}
+            JOIN Categories c ON c.id = {alias}.category_id
+            WHERE {where}
+            GROUP BY c.name
+            ORDER BY 2 {'ASC' if order == 'asc' else 'DESC'}
+            """
+        elif group_by == 'month':
+            ordering = f"3 {order.upper()}" if order else f"{month_key[0]}, {month_key[1]}"
+            query = f"""
+            SELECT {month_key[0]}, {month_key[1]}, {value} FROM {table} {alias}
+            WHERE {where}
+            GROUP BY {month_key[0]}, {month_key[1]}
+            ORDER BY {ordering}
+            """
+        else:
+            query = f"SELECT {value} FROM {table} {alias} WHERE {where}"
+        if limit:
+            query += " LIMIT %s"
+            params.append(limit)
+
+        rows = self.execute_query(query, params, fetch_results=True) or []
+        return [tuple(row[:-1]) + (float(row[-1]) if row[-1] is not None else None,) for row in rows]
+
+    def get_usage_stats(self, user_id: int, year: int, month: int = None) -> Optional[UsageStats]:
+        """Merchant and location statistics of a month's (or a year's) expenses, None on a database error"""
+        # Months are stored in UsageSketches and only rescanned when their count/total changed
+        fingerprints = {}
+        for row_month, count, total in self.execute_query(
+                """
+                SELECT month, SUM(transaction_count), SUM(total_amount) FROM MonthlyAggregates
+                WHERE user_id = %s AND year = %s AND type = 'expense'
+                GROUP BY month
+                """, (user_id, year), fetch_results=True) or []:
+            if count and (month is None or row_month == month):
+                fingerprints[row_month] = f"{int(count)}:{float(total):.2f}"
+        stored = {row_month: (fingerprint, data) for row_month, fingerprint, data in self.execute_query(
+            "SELECT month, fingerprint, data FROM UsageSketches WHERE user_id = %s AND year = %s",
+            (user_id, year), fetch_results=True) or []}
+
+        parts, stale = [], []
+        for row_month, fingerprint in sorted(fingerprints.items()):
+            if stored.get(row_month, (None,))[0] == fingerprint:
+                parts.append(UsageStats.from_dict(json.loads(stored[row_month][1])))
+            else:
+                stale.append(row_month)
+        if stale:
+            built = self._build_usage_sketches(user_id, year, stale, fingerprints)
+            if built is None:
+                return None
+            parts.extend(built)
+        return merge_usage_stats(parts)
+
+    def _build_usage_sketches(self, user_id: int, year: int, months: List[int],
+                              fingerprints: Dict[int, str]) -> Optional[List[UsageStats]]:
+        """Scan the given months' expenses once into one UsageStats each and store them"""
+        sketches = {row_month: UsageStats() for row_month in months}
+        try:
+            with self.transaction() as cursor:
+                cursor.execute(
+                    """
+                    SELECT transaction_date, amount, description, location FROM Transactions
+                    WHERE user_id = %s AND transaction_date >= %s AND transaction_date < %s AND type = 'expense'
+                    """,
+                    (user_id, _month_range(min(months), year)[0], _month_range(max(months), year)[1])
+                )
+                for transaction_date, amount, description, location in cursor:
+                    sketch = sketches.get(_to_date(transaction_date).month)
+                    if sketch is not None:
+                        sketch.add(amount, None, description, location)
+                cursor.executemany(
+                    """
+                    INSERT INTO UsageSketches (user_id, year, month, fingerprint, data)
+                    VALUES (%s, %s, %s, %s, %s)
+                    ON DUPLICATE KEY UPDATE fingerprint = VALUES(fingerprint), data = VALUES(data),
+                                            updated_at = CURRENT_TIMESTAMP
+                    """,
+                    [(user_id, year, row_month, fingerprints[row_month], json.dumps(sketch.to_dict()))
+                     for row_month, sketch in sketches.items()]
+                )
+            return list(sketches.values())
+        except DB_ERRORS + (PoolTimeout,) as e:
+            print(f"Database error: {e}")
+            return None
+
     def execute_query(self, query: str, params: tuple = None, fetch_results: bool = False, 
                      fetch_id: bool = False):
-        """Enhanced execute_query method"""
-        if not self.connection or not self.connection.is_connected():
-            if not self.connect():
-                return None
+        """Run a query on a pooled connection"""
+        if not self.pool and not self.connect():
+            return None
 
         try:
-            cursor = self.connection.cursor()
-            cursor.execute(query, params or ())
-            
-            if fetch_id:
-                self.connection.commit()
-                return cursor.lastrowid
-            elif fetch_results:
-                result = cursor.fetchall()
-                return result
-            else:
-                self.connection.commit()
-                return cursor.rowcount
-                
-        except Error as e:
+            with self.pool.connection() as conn:
+                cursor = conn.cursor()
+                try:
+                    cursor.execute(query, params or ())
+
+                    if fetch_id:
+                        conn.commit()
+                        return cursor.lastrowid
+                    elif fetch_results:
+                        return cursor.fetchall()
+                    else:
+                        conn.commit()
+                        return cursor.rowcount
+                except DB_ERRORS:
+                    self._rollback_quietly(conn)
+                    raise
+                finally:
+                    cursor.close()
+
+        except DB_ERRORS + (PoolTimeout,) as e:
             print(f"Database error: {e}")
-            if self.connection:
-                self.connection.rollback()
             return None
-        finally:
-            if 'cursor' in locals():
-                cursor.close()
\ No newline at end of file
+
+    @contextmanager
+    def transaction(self, defer_constraints: bool = False):
+        """Yield a cursor whose statements commit together or not at all"""
+        # defer_constraints lets bulk loads insert rows before the rows they reference
+        if not self.pool and not self.connect():
+            raise BackendError("Could not connect to the database")
+
+        with self.pool.connection() as conn:
+            conn.start_transaction()
+            cursor = conn.cursor()
+            outer = getattr(self._pending, 'updates', None)
+            self._pending.updates = updates = []
+            try:
+                if defer_constraints:
+                    for statement in self.backend.defer_constraints_sql:
+                        cursor.execute(statement)
+                yield cursor
+                conn.commit()
+            except BaseException:
+                self._rollback_quietly(conn)
+                # Detector state may hold updates from the rolled-back statements
+                self._forget_anomaly_state()
+                for user_id in {user_id for user_id, _ in updates}:
+                    self._forget_tag_indexes(user_id)
+                    self._forget_heatmaps(user_id)
+                raise
+            else:
+                for _, update in updates:
+                    update()
+            finally:
+                self._pending.updates = outer
+                if defer_constraints:
+                    for statement in self.backend.restore_constraints_sql:
+                        cursor.execute(statement)
+                cursor.close()
+
+    @contextmanager
+    def read_snapshot(self):
+        """Yield a cursor whose reads all see one point in time, without blocking writers"""
+        if not self.pool and not self.connect():
+            raise BackendError("Could not connect to the database")
+
+        with self.pool.connection() as conn:
+            conn.start_transaction(consistent_snapshot=True, readonly=True)
+            cursor = conn.cursor()
+            try:
+                yield cursor
+            finally:
+                cursor.close()
+                self._rollback_quietly(conn)
+
+    @staticmethod
+    def _rollback_quietly(conn):
+        try:
+            conn.rollback()
+        except DB_ERRORS:
+            pass
@@ -38,6 +38,18 @@ CREATE TABLE IF NOT EXISTS Categories (
     FOREIGN KEY (parent_category_id) REFERENCES Categories(id)
 );
 
+-- New: User-defined auto-categorization rules (keyword -> category)
+CREATE TABLE IF NOT EXISTS CategoryRules (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    user_id INT NOT NULL,
+    keyword VARCHAR(100) NOT NULL,
+    category_id INT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES Users(id) ON DELETE CASCADE,
+    FOREIGN KEY (category_id) REFERENCES Categories(id) ON DELETE CASCADE,
+    INDEX idx_user_rules (user_id)
+);
+
 -- Transactions table (enhanced)
 CREATE TABLE IF NOT EXISTS Transactions (
     id INT AUTO_INCREMENT PRIMARY KEY,
@@ -58,13 +70,80 @@ CREATE TABLE IF NOT EXISTS Transactions (
     recurring_schedule_id INT,
     template_id INT,
     confidence_score DECIMAL(3, 2) DEFAULT 1.00,
+    -- Hash of amount in paise, day and normalized description (utils/dedup.py)
+    fingerprint CHAR(16),
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     FOREIGN KEY (user_id) REFERENCES Users(id) ON DELETE CASCADE,
     FOREIGN KEY (category_id) REFERENCES Categories(id),
     INDEX idx_user_date (user_id, transaction_date),
+    INDEX idx_user_fingerprint (user_id, fingerprint),
     INDEX idx_category (category_id),
-    INDEX idx_tags (tags)
+    INDEX idx_tags (tags),
+    -- Ranked text search (DBManager.search_transactions)
+    FULLTEXT INDEX ft_transactions_text (description, notes, location),
+    -- One posting per schedule and date; makes the recurring materializer idempotent
+    UNIQUE KEY uq_schedule_occurrence (recurring_schedule_id, transaction_date)
+);
+
+-- New: Monthly rollup of Transactions, kept in sync by DBManager on every
+-- insert/delete (rebuild with: python setup_database.py --rebuild-aggregates)
+CREATE TABLE IF NOT EXISTS MonthlyAggregates (
+    user_id INT NOT NULL,
+    year SMALLINT NOT NULL,
+    month TINYINT NOT NULL,
+    category_id INT NOT NULL,
+    type ENUM('income', 'expense', 'transfer') NOT NULL,
+    total_amount DECIMAL(14, 2) NOT NULL DEFAULT 0.00,
+    transaction_count INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, year, month, category_id, type),
+    FOREIGN KEY (user_id) REFERENCES Users(id) ON DELETE CASCADE,
+    FOREIGN KEY (category_id) REFERENCES Categories(id) ON DELETE CASCADE
+);
+
+-- Running statistics of log expense amounts per category, for anomaly scoring on insert
+CREATE TABLE IF NOT EXISTS AnomalyState (
+    user_id INT NOT NULL,
+    category_id INT NOT NULL,
+    mean DOUBLE NOT NULL,
+    variance DOUBLE NOT NULL,
+    observations INT NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (user_id, category_id),
+    FOREIGN KEY (user_id) REFERENCES Users(id) ON DELETE CASCADE,
+    FOREIGN KEY (category_id) REFERENCES Categories(id) ON DELETE CASCADE
+);
+
+-- Serialized UsageStats (utils/usage_stats.py) of each month's expenses; rebuilt when the month's
+-- MonthlyAggregates count/total no longer match fingerprint
+CREATE TABLE IF NOT EXISTS UsageSketches (
+    user_id INT NOT NULL,
+    year INT NOT NULL,
+    month INT NOT NULL,
+    fingerprint VARCHAR(64) NOT NULL,
+    data MEDIUMTEXT NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (user_id, year, month),
+    FOREIGN KEY (user_id) REFERENCES Users(id) ON DELETE CASCADE
+);
+
+-- Normalized tags; TagIndex (utils/tags.py) is loaded from these rather than Transactions.tags
+CREATE TABLE IF NOT EXISTS Tags (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    user_id INT NOT NULL,
+    name VARCHAR(100) NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE KEY uq_user_tag (user_id, name),
+    FOREIGN KEY (user_id) REFERENCES Users(id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS TransactionTags (
+    transaction_id INT NOT NULL,
+    tag_id INT NOT NULL,
+    PRIMARY KEY (tag_id, transaction_id),
+    INDEX idx_transaction_tags (transaction_id),
+    FOREIGN KEY (transaction_id) REFERENCES Transactions(id) ON DELETE CASCADE,
+    FOREIGN KEY (tag_id) REFERENCES Tags(id) ON DELETE CASCADE
 );
 
 -- Budgets table
@@ -134,9 +213,13 @@ CREATE TABLE IF NOT EXISTS FinancialInsights (
     data JSON,
     is_read BOOLEAN DEFAULT FALSE,
     priority ENUM('low', 'medium', 'high') DEFAULT 'medium',
+    -- Period the insight is about (e.g. '2026-10'); regenerating it updates the row in place
+    period VARCHAR(16) NOT NULL DEFAULT '',
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    expires_at TIMESTAMP,
-    FOREIGN KEY (user_id) REFERENCES Users(id) ON DELETE CASCADE
+    expires_at TIMESTAMP NULL,
+    FOREIGN KEY (user_id) REFERENCES Users(id) ON DELETE CASCADE,
+    UNIQUE KEY uq_insight_period (user_id, insight_type, title, period),
+    INDEX idx_insights_expiry (expires_at)
 );
 
 -- New: Recurring Schedules
@@ -152,7 +235,8 @@ CREATE TABLE IF NOT EXISTS RecurringSchedules (
     is_active BOOLEAN DEFAULT TRUE,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (user_id) REFERENCES Users(id) ON DELETE CASCADE,
-    FOREIGN KEY (template_id) REFERENCES TransactionTemplates(id)
+    FOREIGN KEY (template_id) REFERENCES TransactionTemplates(id),
+    INDEX idx_schedules_due (is_active, next_occurrence)
 );
 
 -- Enhanced default currencies
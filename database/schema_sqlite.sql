@@ -0,0 +1,218 @@
+-- WalletWhiz Database Schema - SQLite backend
+-- Mirrors schema.sql; applied automatically by SQLiteBackend on first connect.
+-- ENUM columns become TEXT with CHECK constraints and DECIMAL columns REAL.
+
+CREATE TABLE IF NOT EXISTS Currencies (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    code TEXT UNIQUE NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS Users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username TEXT UNIQUE NOT NULL,
+    hashed_password TEXT NOT NULL,
+    currency_id INTEGER REFERENCES Currencies(id),
+    theme TEXT DEFAULT 'light' CHECK (theme IN ('light', 'dark', 'auto')),
+    profile_picture TEXT,
+    notification_preferences JSON,
+    security_settings JSON,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    last_login TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS Categories (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL REFERENCES Users(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    type TEXT NOT NULL CHECK (type IN ('income', 'expense')),
+    icon_name TEXT DEFAULT 'default',
+    color TEXT DEFAULT '#007bff',
+    is_default BOOLEAN DEFAULT FALSE,
+    parent_category_id INTEGER REFERENCES Categories(id),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_categories_user ON Categories (user_id, type, name);
+
+CREATE TABLE IF NOT EXISTS CategoryRules (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL REFERENCES Users(id) ON DELETE CASCADE,
+    keyword TEXT NOT NULL,
+    category_id INTEGER NOT NULL REFERENCES Categories(id) ON DELETE CASCADE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_user_rules ON CategoryRules (user_id);
+
+CREATE TABLE IF NOT EXISTS Transactions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL REFERENCES Users(id) ON DELETE CASCADE,
+    type TEXT NOT NULL CHECK (type IN ('income', 'expense', 'transfer')),
+    amount REAL NOT NULL,
+    original_currency TEXT DEFAULT 'USD',
+    exchange_rate REAL DEFAULT 1.0,
+    category_id INTEGER NOT NULL REFERENCES Categories(id),
+    description TEXT,
+    transaction_date DATE NOT NULL,
+    notes TEXT,
+    tags JSON,
+    location TEXT,
+    attachment_path TEXT,
+    receipt_ocr_data JSON,
+    is_recurring BOOLEAN DEFAULT FALSE,
+    recurring_schedule_id INTEGER,
+    template_id INTEGER,
+    confidence_score REAL DEFAULT 1.00,
+    fingerprint TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+-- idx_user_date carries type/category/amount so date-range reads and sums never touch the table
+CREATE INDEX IF NOT EXISTS idx_user_date ON Transactions (user_id, transaction_date, type, category_id, amount);
+CREATE INDEX IF NOT EXISTS idx_user_fingerprint ON Transactions (user_id, fingerprint);
+CREATE INDEX IF NOT EXISTS idx_category ON Transactions (category_id);
+-- One posting per schedule and date; makes the recurring materializer idempotent
+CREATE UNIQUE INDEX IF NOT EXISTS uq_schedule_occurrence ON Transactions (recurring_schedule_id, transaction_date);
+
+CREATE TRIGGER IF NOT EXISTS trg_transactions_updated_at
+AFTER UPDATE ON Transactions
+FOR EACH ROW WHEN NEW.updated_at = OLD.updated_at
+BEGIN
+    UPDATE Transactions SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
+END;
+
+CREATE TABLE IF NOT EXISTS MonthlyAggregates (
+    user_id INTEGER NOT NULL REFERENCES Users(id) ON DELETE CASCADE,
+    year INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    category_id INTEGER NOT NULL REFERENCES Categories(id) ON DELETE CASCADE,
+    type TEXT NOT NULL CHECK (type IN ('income', 'expense', 'transfer')),
+    total_amount REAL NOT NULL DEFAULT 0.00,
+    transaction_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, year, month, category_id, type)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS AnomalyState (
+    user_id INTEGER NOT NULL REFERENCES Users(id) ON DELETE CASCADE,
+    category_id INTEGER NOT NULL REFERENCES Categories(id) ON DELETE CASCADE,
+    mean REAL NOT NULL,
+    variance REAL NOT NULL,
+    observations INTEGER NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (user_id, category_id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS UsageSketches (
+    user_id INTEGER NOT NULL REFERENCES Users(id) ON DELETE CASCADE,
+    year INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    fingerprint TEXT NOT NULL,
+    data TEXT NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (user_id, year, month)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS Tags (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL REFERENCES Users(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (user_id, name)
+);
+
+CREATE TABLE IF NOT EXISTS TransactionTags (
+    transaction_id INTEGER NOT NULL REFERENCES Transactions(id) ON DELETE CASCADE,
+    tag_id INTEGER NOT NULL REFERENCES Tags(id) ON DELETE CASCADE,
+    PRIMARY KEY (tag_id, transaction_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_transaction_tags ON TransactionTags (transaction_id);
+
+CREATE TABLE IF NOT EXISTS Budgets (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL REFERENCES Users(id) ON DELETE CASCADE,
+    category_id INTEGER NOT NULL REFERENCES Categories(id),
+    monthly_limit REAL NOT NULL,
+    start_date DATE NOT NULL,
+    end_date DATE NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_budgets_user ON Budgets (user_id, category_id);
+
+CREATE TABLE IF NOT EXISTS SavingsGoals (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL REFERENCES Users(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    target_amount REAL NOT NULL,
+    current_amount REAL DEFAULT 0.00,
+    target_date DATE,
+    priority TEXT DEFAULT 'medium' CHECK (priority IN ('low', 'medium', 'high')),
+    is_active BOOLEAN DEFAULT TRUE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_goals_user ON SavingsGoals (user_id);
+
+CREATE TABLE IF NOT EXISTS TransactionTemplates (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL REFERENCES Users(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    type TEXT NOT NULL CHECK (type IN ('income', 'expense')),
+    amount REAL,
+    category_id INTEGER NOT NULL REFERENCES Categories(id),
+    description TEXT,
+    notes TEXT,
+    usage_count INTEGER DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_templates_user ON TransactionTemplates (user_id);
+
+CREATE TABLE IF NOT EXISTS SharedExpenses (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    transaction_id INTEGER NOT NULL REFERENCES Transactions(id) ON DELETE CASCADE,
+    shared_with_user_id INTEGER NOT NULL REFERENCES Users(id) ON DELETE CASCADE,
+    share_amount REAL NOT NULL,
+    is_settled BOOLEAN DEFAULT FALSE,
+    settled_date DATE,
+    notes TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS FinancialInsights (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL REFERENCES Users(id) ON DELETE CASCADE,
+    insight_type TEXT NOT NULL CHECK (insight_type IN ('anomaly', 'trend', 'suggestion', 'achievement')),
+    title TEXT NOT NULL,
+    description TEXT,
+    data JSON,
+    is_read BOOLEAN DEFAULT FALSE,
+    priority TEXT DEFAULT 'medium' CHECK (priority IN ('low', 'medium', 'high')),
+    period TEXT NOT NULL DEFAULT '',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    expires_at TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_insights_user ON FinancialInsights (user_id, created_at);
+CREATE UNIQUE INDEX IF NOT EXISTS uq_insight_period ON FinancialInsights (user_id, insight_type, title, period);
+CREATE INDEX IF NOT EXISTS idx_insights_expiry ON FinancialInsights (expires_at);
+
+CREATE TABLE IF NOT EXISTS RecurringSchedules (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL REFERENCES Users(id) ON DELETE CASCADE,
+    template_id INTEGER NOT NULL REFERENCES TransactionTemplates(id),
+    frequency TEXT NOT NULL CHECK (frequency IN ('daily', 'weekly', 'monthly', 'quarterly', 'yearly')),
+    interval_value INTEGER DEFAULT 1,
+    start_date DATE NOT NULL,
+    end_date DATE,
+    next_occurrence DATE NOT NULL,
+    is_active BOOLEAN DEFAULT TRUE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_schedules_due ON RecurringSchedules (is_active, next_occurrence);
+
+INSERT OR IGNORE INTO Currencies (name, symbol, code) VALUES
+('US Dollar', '$', 'USD'),
+('Indian Rupee', '₹', 'INR'),
+('Euro', '€', 'EUR'),
+('British Pound', '£', 'GBP'),
+('Japanese Yen', '¥', 'JPY'),
+('Canadian Dollar', 'C$', 'CAD'),
+('Australian Dollar', 'A$', 'AUD'),
+('Swiss Franc', 'Fr', 'CHF');
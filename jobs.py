@@ -0,0 +1,65 @@
+"""Periodic maintenance jobs, meant to be run from cron or a scheduled task.
+
+    python jobs.py insights    # regenerate insights for every user, then prune expired ones
+    python jobs.py recurring   # post due recurring transactions (with catch-up) and advance schedules
+    python jobs.py backup      # write a snapshot of every user's data to the configured backup target
+"""
+import sys
+import time
+
+from database.db_manager import DBManager
+from utils.backup import BackupEngine, get_target
+
+
+def run_insights(db):
+    started = time.perf_counter()
+    written = db.generate_insights_for_users()
+    pruned = db.prune_expired_insights()
+    print(f"Insights: {written} upserted, {pruned} expired removed in {time.perf_counter() - started:.1f}s")
+
+
+def run_recurring(db):
+    stats = db.post_due_schedules()
+    rate = stats['schedules'] / stats['seconds'] if stats['seconds'] else 0
+    print(f"Recurring: {stats['posted']} posted, {stats['skipped']} already posted, "
+          f"{stats['deactivated']} schedules ended; {stats['schedules']} schedules in {stats['seconds']:.1f}s "
+          f"({rate:.0f}/s)")
+
+
+def run_backup(db):
+    started = time.perf_counter()
+    target = get_target()
+    users = [row[0] for row in db.execute_query("SELECT id FROM Users", fetch_results=True) or []]
+    rows = 0
+    for user_id in users:
+        entry = BackupEngine(db, user_id, target).run()
+        rows += sum(table['rows'] for table in entry['tables'].values())
+    print(f"Backup: {len(users)} users, {rows} rows in {time.perf_counter() - started:.1f}s")
+
+
+JOBS = {
+    "recurring": run_recurring,
+    "insights": run_insights,
+    "backup": run_backup,
+}
+
+
+def main(argv):
+    names = argv or list(JOBS)
+    unknown = [name for name in names if name not in JOBS]
+    if unknown:
+        print(f"Unknown job(s): {', '.join(unknown)}; available: {', '.join(JOBS)}")
+        return 1
+    db = DBManager()
+    if not db.connect():
+        return 1
+    try:
+        for name in names:
+            JOBS[name](db)
+    finally:
+        db.disconnect()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
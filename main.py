@@ -15,6 +15,16 @@ def print_module_paths():
     print("  ", os.path.abspath(os.path.join(os.getcwd(), "ui", "login_window.py")))
     print("  ", os.path.abspath(os.path.join(os.getcwd(), "ui", "main_window.py")))
 
+def open_database():
+    """A connected DBManager from config, or None; run off the GUI thread, since connecting can block"""
+    from database.db_manager import DBManager
+    db = DBManager()
+    return db if db.connect() else None
+
+def is_registered(db, user_id):
+    """Whether user_id is a row in Users; the login window does not check yet"""
+    return bool(db.execute_query("SELECT id FROM Users WHERE id = %s", (user_id,), fetch_results=True))
+
 def global_exception_hook(exctype, value, tb):
     error_msg = "".join(traceback.format_exception(exctype, value, tb))
     print("Uncaught exception:", error_msg)
@@ -26,6 +36,15 @@ class WalletWhizApp:
         print_module_paths()
         self.app = QApplication(sys.argv)  # <-- Ensure QApplication is created first
         sys.excepthook = global_exception_hook
+        # Histogram of event-loop stalls, printed on exit
+        from ui.workers import UIBlockingMonitor
+        self.ui_monitor = UIBlockingMonitor()
+        self.ui_monitor.start()
+        self.app.aboutToQuit.connect(self.ui_monitor.dump)
+        self.app.aboutToQuit.connect(self.shutdown)
+        from ui.workers import BackgroundRunner
+        self.runner = BackgroundRunner(self.app)
+        self.posting_recurring = False
         try:
             from ui.login_window import LoginWindow
             from ui.main_window import WalletWhizMainWindow
@@ -40,6 +59,34 @@ class WalletWhizApp:
 
         self.login_window = None
         self.main_window = None
+        self.db = None
+        self.waiting_for_db = []   # callbacks for the connect in flight
+        self.closing = False
+        self.backup_scheduler = None
+        self.backup_user_id = None   # signed-in user whose backups are starting or running
+
+    def with_database(self, callback):
+        """Call callback(db) on the GUI thread once the DBManager is connected; dropped if unreachable"""
+        if self.db is not None:
+            callback(self.db)
+            return
+        self.waiting_for_db.append(callback)
+        if len(self.waiting_for_db) == 1:
+            self.runner.submit(open_database, on_done=self.on_database_opened,
+                               on_error=lambda error: self.on_database_opened(None, error))
+
+    def on_database_opened(self, db, error=None):
+        callbacks, self.waiting_for_db = self.waiting_for_db, []
+        if self.closing:
+            if db:
+                db.disconnect()
+            return
+        if db is None:
+            print(f"Database unreachable; skipping recurring transactions and backups{': ' + error if error else ''}")
+            return
+        self.db = db
+        for callback in callbacks:
+            callback(db)
 
     def show_login(self):
         try:
@@ -60,17 +107,72 @@ class WalletWhizApp:
             if self.login_window:
                 self.login_window.close()
             self.main_window = self.WalletWhizMainWindow(user_id)
+            self.main_window.logout_requested.connect(self.stop_backups)
             self.main_window.logout_requested.connect(self.show_login)  # Add logout handler
             self.main_window.show()
             print("Main window shown.")
+            self.start_backups(user_id)
         except Exception as e:
             print("Error in on_login_success:", e)
             print(traceback.format_exc())
             QMessageBox.critical(None, "Application Error", f"Failed to load main application:\n{e}\n\n{traceback.format_exc()}")
             self.show_login()
 
+    def start_backups(self, user_id):
+        """Snapshot the signed-in user's data on the configured interval, once the database is connected"""
+        self.stop_backups()
+        self.backup_user_id = user_id
+        self.with_database(lambda db: self.runner.submit(
+            is_registered, db, user_id, on_done=lambda registered: self.schedule_backups(db, user_id, registered)))
+
+    def schedule_backups(self, db, user_id, registered):
+        from utils.backup import schedule_backup
+        if self.closing or user_id != self.backup_user_id or self.backup_scheduler:
+            return  # Signed out (or quit) while connecting
+        if not registered:
+            print(f"Backups not scheduled: user {user_id} is not in the database")
+            return
+        self.backup_scheduler = schedule_backup(db=db, user_ids=[user_id])
+
+    def stop_backups(self):
+        self.backup_user_id = None
+        if self.backup_scheduler:
+            self.backup_scheduler.stop()
+            self.backup_scheduler = None
+
+    def shutdown(self):
+        self.closing = True
+        self.stop_backups()
+        self.runner.shutdown()
+        if self.db:
+            self.db.disconnect()
+
+    def post_recurring_transactions(self):
+        """Post recurring transactions that fell due while the app was closed, off the GUI thread"""
+        self.with_database(self.post_due_schedules)
+
+    def post_due_schedules(self, db):
+        # Schedules of every user in the database; the window's own records live in its TransactionStore
+        if self.posting_recurring:
+            return  # The running pass posts everything due; a second one would only contend for the same rows
+        self.posting_recurring = True
+        self.runner.submit(db.post_due_schedules, on_done=self.on_recurring_posted,
+                           on_error=self.on_recurring_failed)
+
+    def on_recurring_posted(self, stats):
+        self.posting_recurring = False
+        if stats.get('error'):
+            self.on_recurring_failed(stats['error'])
+        else:
+            print(f"Recurring: {stats['posted']} posted, {stats['deactivated']} schedules ended")
+
+    def on_recurring_failed(self, error):
+        self.posting_recurring = False
+        QMessageBox.warning(None, "Recurring Transactions", f"Posting due recurring transactions failed:\n{error}")
+
     def run(self):
         try:
+            self.post_recurring_transactions()
             self.show_login()
             print("Starting event loop...")
             result = self.app.exec_()
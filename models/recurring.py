@@ -1,17 +1,94 @@
+import calendar
+import heapq
+from datetime import date, timedelta
+
+FREQUENCIES = ("daily", "weekly", "monthly", "quarterly", "yearly")
+_MONTHS = {"monthly": 1, "quarterly": 3, "yearly": 12}
+
+
+def advance(day, frequency, interval=1, anchor_day=None):
+    """Date interval periods after day; month steps clamp anchor_day to short months"""
+    if frequency == "daily":
+        return day + timedelta(days=interval)
+    if frequency == "weekly":
+        return day + timedelta(weeks=interval)
+    if frequency not in _MONTHS:
+        raise ValueError(f"Unknown frequency: {frequency}")
+    months = day.year * 12 + day.month - 1 + _MONTHS[frequency] * interval
+    year, month = divmod(months, 12)
+    month += 1
+    return date(year, month, min(anchor_day or day.day, calendar.monthrange(year, month)[1]))
+
+
 class RecurringPayment:
-    def __init__(self, name, amount, due_date, category, active=True):
+    def __init__(self, name, amount, due_date, category, active=True, frequency="monthly", interval=1):
         self.name = name
         self.amount = amount
         self.due_date = due_date
         self.category = category
         self.active = active
+        self.frequency = frequency
+        self.interval = interval
+        self.anchor_day = getattr(due_date, "day", None)   # Day of month kept across short months
+
 
 class RecurringManager:
+    """Recurring payments in a due-date heap plus a date index; stale heap entries are skipped lazily"""
+
     def __init__(self):
         self.payments = []
+        self._heap = []
+        self._by_date = {}
+        self._sequence = 0
+
+    def _index(self, payment):
+        self._sequence += 1
+        heapq.heappush(self._heap, (payment.due_date, self._sequence, payment))
+        self._by_date.setdefault(payment.due_date, []).append(payment)
+
+    def _unindex(self, payment):
+        bucket = self._by_date.get(payment.due_date, [])
+        if payment in bucket:
+            bucket.remove(payment)
+            if not bucket:
+                del self._by_date[payment.due_date]
 
     def add_payment(self, payment):
         self.payments.append(payment)
+        self._index(payment)
+
+    def remove_payment(self, payment):
+        self.payments.remove(payment)
+        self._unindex(payment)
+
+    def reschedule(self, payment, due_date):
+        """Move a payment to a new due date"""
+        self._unindex(payment)
+        payment.due_date = due_date
+        self._index(payment)
 
     def get_due_payments(self, today):
-        return [p for p in self.payments if p.due_date == today and p.active]
+        return [p for p in self._by_date.get(today, ()) if p.active]
+
+    def _is_current(self, entry):
+        due_date, _, payment = entry
+        return payment.due_date == due_date and payment in self._by_date.get(due_date, ())
+
+    def pop_due(self, today):
+        """Active payments due on or before today, each advanced to its next due date (catch-up included)"""
+        due, paused = [], []
+        while self._heap and self._heap[0][0] <= today:
+            entry = heapq.heappop(self._heap)
+            payment = entry[2]
+            if not self._is_current(entry):
+                continue
+            if not payment.active:
+                paused.append(entry)
+                continue
+            due.append((payment.due_date, payment))
+            self._unindex(payment)
+            payment.due_date = advance(payment.due_date, payment.frequency, payment.interval, payment.anchor_day)
+            self._index(payment)
+        for entry in paused:
+            heapq.heappush(self._heap, entry)
+        return due
@@ -0,0 +1,153 @@
+import sys
+from array import array
+from datetime import date, datetime
+from functools import lru_cache
+
+FIELDS = ("id", "date", "type", "amount", "category", "notes", "tags")
+EMPTY_TAGS = ()
+
+
+@lru_cache(maxsize=None)
+def iso_date(day):
+    """'YYYY-MM-DD' for a day ordinal; one shared string per distinct day"""
+    return date.fromordinal(day).isoformat()
+
+
+def to_day(value):
+    """Day ordinal of a date, datetime or 'YYYY-MM-DD' string (ValueError if unparseable)"""
+    if isinstance(value, int):
+        return value
+    if isinstance(value, datetime):
+        return value.date().toordinal()
+    if isinstance(value, date):
+        return value.toordinal()
+    return date.fromisoformat(str(value).strip()[:10]).toordinal()
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _tags(tags):
+    if not tags:
+        return EMPTY_TAGS
+    if isinstance(tags, tuple):
+        return tags
+    return tuple(_intern(tag) for tag in tags)
+
+
+class Transaction:
+    """One transaction in fixed slots instead of a dict; still readable as t["date"] or t.get("tags")"""
+
+    __slots__ = ("id", "day", "type", "amount", "category", "notes", "tags")
+
+    def __init__(self, date, type, amount, category, notes="", tags=None, id=None):
+        self.id = id
+        self.day = to_day(date)
+        self.type = _intern(type)
+        self.amount = amount
+        self.category = _intern(category)
+        self.notes = notes or ""
+        self.tags = _tags(tags)
+
+    @classmethod
+    def from_dict(cls, record):
+        if isinstance(record, cls):
+            return record
+        return cls(record["date"], record["type"], record["amount"], record.get("category", "Other"),
+                   record.get("notes", ""), record.get("tags"), record.get("id"))
+
+    @property
+    def date(self):
+        return iso_date(self.day)
+
+    def to_dict(self):
+        return {"id": self.id, "date": self.date, "type": self.type, "amount": self.amount,
+                "category": self.category, "notes": self.notes, "tags": list(self.tags)}
+
+    def replace(self, **changes):
+        """Copy with some fields changed"""
+        values = {field: self[field] for field in FIELDS}
+        values.update(changes)
+        return Transaction(**values)
+
+    # Mapping-style access for code written against dict records
+    def __getitem__(self, key):
+        if key not in FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        if key not in FIELDS:
+            raise KeyError(key)
+        if key == "date":
+            self.day = to_day(value)
+        elif key == "tags":
+            self.tags = _tags(value)
+        else:
+            setattr(self, key, _intern(value))
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in FIELDS else default
+
+    def __contains__(self, key):
+        return key in FIELDS
+
+    def keys(self):
+        return FIELDS
+
+    def __repr__(self):
+        return (f"Transaction(id={self.id!r}, date={self.date!r}, type={self.type!r}, amount={self.amount!r}, "
+                f"category={self.category!r})")
+
+
+class TransactionArray:
+    """Typed column arrays for large, mostly read-only transaction sets; rows become Transactions on access"""
+
+    def __init__(self, records=()):
+        self.ids = array("q")
+        self.days = array("i")
+        self.amounts = array("q")
+        self.type_codes = array("b")
+        self.category_codes = array("i")
+        self.notes = []
+        self.tags = []
+        self.types = []
+        self.categories = []
+        self._type_index = {}
+        self._category_index = {}
+        self.extend(records)
+
+    def _code(self, index, values, value):
+        code = index.get(value)
+        if code is None:
+            code = index[value] = len(values)
+            values.append(_intern(value))
+        return code
+
+    def append(self, record):
+        record = Transaction.from_dict(record)
+        self.ids.append(record.id if record.id is not None else -1)
+        self.days.append(record.day)
+        self.amounts.append(round(record.amount * 100))
+        self.type_codes.append(self._code(self._type_index, self.types, record.type))
+        self.category_codes.append(self._code(self._category_index, self.categories, record.category))
+        self.notes.append(record.notes)
+        self.tags.append(record.tags)
+
+    def extend(self, records):
+        for record in records:
+            self.append(record)
+
+    def __len__(self):
+        return len(self.days)
+
+    def __getitem__(self, index):
+        transaction_id = self.ids[index]
+        return Transaction(self.days[index], self.types[self.type_codes[index]], self.amounts[index] / 100,
+                           self.categories[self.category_codes[index]], self.notes[index], self.tags[index],
+                           None if transaction_id == -1 else transaction_id)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
@@ -0,0 +1,111 @@
+from collections import defaultdict
+
+
+class TransactionStore:
+    """In-memory transactions with running totals; subscribers get callback(event, record, previous)"""
+
+    def __init__(self):
+        self._records = {}
+        self._subscribers = []
+        self._next_id = 1
+        self.type_totals = defaultdict(float)
+        self.category_totals = defaultdict(float)
+        self.daily_totals = defaultdict(float)
+
+    def subscribe(self, callback):
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        self._subscribers.remove(callback)
+
+    def add(self, record):
+        """Add a record (assigning an id if it has none) and return it"""
+        self._insert(record)
+        self._notify("add", record)
+        return record
+
+    def extend(self, records):
+        """Add many records with one 'extend' notification, for imports"""
+        records = [self._insert(record) for record in records]
+        if records:
+            self._notify("extend", records)
+        return records
+
+    def replace(self, records):
+        """Swap every record for records with one 'reset' notification, for restores"""
+        self._reset()
+        records = [self._insert(record) for record in records]
+        self._notify("reset", records)
+        return records
+
+    def remove(self, record_id):
+        record = self._records.pop(record_id, None)
+        if record is not None:
+            self._apply(record, -1)
+            self._notify("remove", record)
+        return record
+
+    def update(self, record_id, **changes):
+        previous = self._records.get(record_id)
+        if previous is None:
+            return None
+        record = previous.replace(**changes) if hasattr(previous, "replace") else dict(previous, **changes)
+        self._apply(previous, -1)
+        self._records[record_id] = record
+        self._apply(record, 1)
+        self._notify("update", record, previous)
+        return record
+
+    def clear(self):
+        self._reset()
+        self._notify("clear", None)
+
+    def get(self, record_id):
+        return self._records.get(record_id)
+
+    def __iter__(self):
+        return iter(self._records.values())
+
+    def __len__(self):
+        return len(self._records)
+
+    def __bool__(self):
+        return bool(self._records)
+
+    # Totals
+    def total(self, transaction_type):
+        return self.type_totals.get(transaction_type, 0.0)
+
+    def category_total(self, transaction_type, category):
+        return self.category_totals.get((transaction_type, category), 0.0)
+
+    def daily_total(self, transaction_type, day):
+        return self.daily_totals.get((transaction_type, day), 0.0)
+
+    def _insert(self, record):
+        if record.get("id") is None:
+            record["id"] = self._next_id
+        self._next_id = max(self._next_id, record["id"] + 1)
+        self._records[record["id"]] = record
+        self._apply(record, 1)
+        return record
+
+    def _reset(self):
+        self._records.clear()
+        self.type_totals.clear()
+        self.category_totals.clear()
+        self.daily_totals.clear()
+
+    def _apply(self, record, sign):
+        amount = sign * record["amount"]
+        transaction_type = record["type"]
+        # Rounded to paise so repeated add/remove does not accumulate float drift
+        self.type_totals[transaction_type] = round(self.type_totals[transaction_type] + amount, 2)
+        key = (transaction_type, record["category"])
+        self.category_totals[key] = round(self.category_totals[key] + amount, 2)
+        key = (transaction_type, record["date"])
+        self.daily_totals[key] = round(self.daily_totals[key] + amount, 2)
+
+    def _notify(self, event, record, previous=None):
+        for callback in list(self._subscribers):
+            callback(event, record, previous)
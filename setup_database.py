@@ -1,12 +1,12 @@
-import mysql.connector
-from mysql.connector import Error
 from config import DB_CONFIG
+from database.backends import MySQLBackend, DB_ERRORS as Error
 
 def create_database():
     """Create the database if it doesn't exist"""
     try:
+        import mysql.connector
         # Connect without specifying database
-        config_no_db = DB_CONFIG.copy()
+        config_no_db = dict(MySQLBackend(DB_CONFIG).driver_args)
         db_name = config_no_db.pop('database')
         
         connection = mysql.connector.connect(**config_no_db)
@@ -25,7 +25,7 @@ def create_database():
 def create_tables():
     """Create all required tables"""
     try:
-        connection = mysql.connector.connect(**DB_CONFIG)
+        connection = MySQLBackend(DB_CONFIG).connect()
         cursor = connection.cursor()
         
         # Read and execute schema
@@ -49,8 +49,87 @@ def create_tables():
     except FileNotFoundError:
         print("schema.sql file not found")
 
+def create_sqlite_database():
+    """Create the SQLite database file; its schema is applied on first connect"""
+    from database.db_manager import DBManager
+    db = DBManager()
+    if db.connect():
+        print("All tables created successfully")
+    db.disconnect()
+
+def rebuild_aggregates():
+    """Recompute the MonthlyAggregates rollup from Transactions"""
+    from database.db_manager import DBManager
+    db = DBManager()
+    if db.rebuild_monthly_aggregates():
+        print("Monthly aggregates rebuilt")
+    db.disconnect()
+
+# Columns added after the first release, as (table, column, ALTER TABLE clauses,
+# statement run first to make existing rows fit). SQLite files get the same
+# changes on connect (SQLITE_ADDED_COLUMNS).
+MYSQL_ADDED_COLUMNS = [
+    ("Transactions", "fingerprint",
+     "ADD COLUMN fingerprint CHAR(16), ADD INDEX idx_user_fingerprint (user_id, fingerprint)", None),
+    ("FinancialInsights", "period",
+     "ADD COLUMN period VARCHAR(16) NOT NULL DEFAULT '', "
+     "ADD UNIQUE KEY uq_insight_period (user_id, insight_type, title, period), "
+     "ADD INDEX idx_insights_expiry (expires_at)",
+     "DELETE f FROM FinancialInsights f JOIN FinancialInsights newer "
+     "ON newer.user_id = f.user_id AND newer.insight_type = f.insight_type "
+     "AND newer.title = f.title AND newer.id > f.id"),
+]
+
+# Indexes added after the first release, as (table, index name, ADD clause)
+MYSQL_ADDED_INDEXES = [
+    ("Transactions", "uq_schedule_occurrence",
+     "ADD UNIQUE KEY uq_schedule_occurrence (recurring_schedule_id, transaction_date)"),
+    ("RecurringSchedules", "idx_schedules_due", "ADD INDEX idx_schedules_due (is_active, next_occurrence)"),
+    ("Transactions", "ft_transactions_text", "ADD FULLTEXT INDEX ft_transactions_text (description, notes, location)"),
+]
+
+def upgrade_database():
+    """Bring an existing database up to the current schema and backfill derived columns"""
+    from database.db_manager import DBManager
+    db = DBManager()
+    if not db.connect():
+        return
+    if db.backend.name == 'mysql':
+        create_tables()  # Tables added since (CREATE TABLE IF NOT EXISTS)
+        for table, column, clauses, fixup in MYSQL_ADDED_COLUMNS:
+            try:
+                with db.transaction() as cursor:
+                    cursor.execute(f"SELECT {column} FROM {table} LIMIT 1")
+                    cursor.fetchall()
+            except Error:
+                if fixup:
+                    db.execute_query(fixup)
+                db.execute_query(f"ALTER TABLE {table} {clauses}")
+                print(f"Added {table}.{column}")
+        for table, index, clause in MYSQL_ADDED_INDEXES:
+            if not db.execute_query(f"SHOW INDEX FROM {table} WHERE Key_name = %s", (index,), fetch_results=True):
+                db.execute_query(f"ALTER TABLE {table} {clause}")
+                print(f"Added index {table}.{index}")
+    print(f"Fingerprinted {db.backfill_fingerprints()} transactions")
+    if db.rebuild_anomaly_state():
+        print("Anomaly statistics rebuilt")
+    tagged = db.rebuild_tags()
+    if tagged >= 0:
+        print(f"Indexed tags of {tagged} transactions")
+    db.disconnect()
+
 if __name__ == '__main__':
+    import sys
+    if '--rebuild-aggregates' in sys.argv:
+        rebuild_aggregates()
+        sys.exit(0)
+    if '--upgrade' in sys.argv:
+        upgrade_database()
+        sys.exit(0)
     print("Setting up WalletWhiz database...")
-    create_database()
-    create_tables()
+    if DB_CONFIG.get('backend') == 'sqlite':
+        create_sqlite_database()
+    else:
+        create_database()
+        create_tables()
     print("Database setup complete!")
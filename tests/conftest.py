@@ -0,0 +1,34 @@
+import os
+
+import pytest
+
+
+@pytest.fixture
+def db(tmp_path):
+    """Connected DBManager on a throwaway SQLite database"""
+    pytest.importorskip("bcrypt")
+    from database.db_manager import DBManager
+    manager = DBManager({'backend': 'sqlite', 'sqlite': {'path': str(tmp_path / 'walletwhiz.db')}})
+    assert manager.connect()
+    yield manager
+    manager.disconnect()
+
+
+@pytest.fixture
+def user_id(db):
+    assert db.create_user('tester', 'secret')
+    return db.authenticate_user('tester', 'secret')
+
+
+@pytest.fixture
+def categories(db, user_id):
+    """name -> id of the user's expense categories"""
+    return {name: category_id for category_id, name, kind in db.get_categories(user_id) if kind == 'expense'}
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    """The QApplication for tests that need Qt objects, rendering offscreen"""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    QtWidgets = pytest.importorskip("PyQt5.QtWidgets")
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
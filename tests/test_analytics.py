@@ -0,0 +1,36 @@
+import pytest
+
+from utils import analytics
+from utils.analytics import to_columns
+
+TRANSACTIONS = [
+    {"date": "2025-01-05", "type": "Expense", "amount": 10.10, "category": "Food"},
+    {"date": "2025-01-05", "type": "Income", "amount": 500, "category": "Salary"},
+    {"date": "2025-03-02", "type": "Expense", "amount": 0.20, "category": "Food"},
+    {"date": "2025-03-02", "type": "Expense", "amount": 40, "category": "Travel"},
+    {"date": "someday", "type": "Expense", "amount": 1, "category": "Travel"},
+]
+
+
+@pytest.fixture(params=[False, True], ids=["loops", "numpy"])
+def numpy_mode(request, monkeypatch):
+    if request.param:
+        pytest.importorskip("numpy")
+    monkeypatch.setattr(analytics, "NUMPY_AVAILABLE", request.param)
+
+
+def test_grouped_totals(numpy_mode):
+    columns = to_columns(TRANSACTIONS)
+    assert to_columns(columns) is columns and len(columns) == 5
+    assert columns.type_totals() == {"Expense": 51.3, "Income": 500}
+    assert columns.category_totals() == {"Food": 10.3, "Salary": 500, "Travel": 41}
+    assert columns.category_totals("Income") == {"Food": 0, "Salary": 500, "Travel": 0}
+    assert columns.category_totals("Transfer") == {"Food": 0, "Salary": 0, "Travel": 0}
+    assert columns.daily_totals("Expense") == {"2025-01-05": 10.1, "2025-03-02": 40.2, "someday": 1}
+
+
+def test_monthly_totals_fill_gaps_and_skip_bad_dates(numpy_mode):
+    series, first = to_columns(TRANSACTIONS).monthly_totals("Expense")
+    assert first == (2025, 1)
+    assert series == {"Food": [10.1, 0, 0.2], "Salary": [0, 0, 0], "Travel": [0, 0, 40]}
+    assert to_columns([]).monthly_totals() == ({}, None)
@@ -0,0 +1,57 @@
+from datetime import date
+
+from utils.anomaly import AnomalyDetector, series_zscore
+
+
+def test_scores_after_warmup_and_in_log_space():
+    detector = AnomalyDetector(warmup=5)
+    for key, base in (("coffee", 50), ("groceries", 5000)):
+        for amount in [base * (1 + (i % 3) / 10) for i in range(5)]:
+            assert detector.observe(key, amount) == (None, False)
+        assert detector.observe(key, base * 1.1)[1] is False
+        z, is_anomaly = detector.observe(key, base * 6)
+        assert is_anomaly and z >= detector.threshold
+    assert abs(detector.score("coffee", 300) - detector.score("groceries", 30000)) < 1
+    assert detector.score("unknown", 10) is None
+    assert 50 < detector.typical("coffee") < 80
+
+
+def test_dirty_state_is_handed_out_once():
+    detector = AnomalyDetector()
+    detector.observe("a", 10)
+    detector.observe("b", 10)
+    assert sorted(key for key, _ in detector.take_dirty()) == ["a", "b"]
+    assert detector.take_dirty() == []
+    detector.load("c", 1.0, 0.5, 20)
+    detector.forget(lambda key: key != "c")
+    assert list(detector.states) == ["c"]
+
+
+def test_series_zscore():
+    assert series_zscore([100, 110], 500) is None
+    assert series_zscore([100, 110, 95, 105, 100], 500) > 3
+    assert abs(series_zscore([100, 110, 95, 105, 100], 102)) < 1
+
+
+def unusual(db, user_id):
+    return [title for title, in db.execute_query("SELECT title FROM FinancialInsights WHERE user_id = %s "
+                                                 "AND title LIKE 'Unusual%%'", (user_id,), fetch_results=True)]
+
+
+def state(db, user_id):
+    return db.execute_query("SELECT category_id, observations, ROUND(mean, 6) FROM AnomalyState WHERE user_id = %s",
+                            (user_id,), fetch_results=True)
+
+
+def test_outlier_expense_becomes_an_insight(db, user_id, categories):
+    food = categories['Food & Dining']
+    for day in range(1, 11):
+        db.add_transaction(user_id, 'expense', 200 + day, food, f'Lunch {day}', date(2025, 3, day))
+    assert unusual(db, user_id) == []
+    db.add_transaction(user_id, 'expense', 4000, food, 'Party catering', date(2025, 3, 12))
+    assert unusual(db, user_id) == ['Unusual expense: Party catering']
+
+    incremental = state(db, user_id)
+    assert incremental[0][:2] == (food, 11)
+    assert db.rebuild_anomaly_state(user_id)
+    assert state(db, user_id) == incremental
@@ -0,0 +1,44 @@
+from datetime import date
+
+import pytest
+
+from database.backends import BackendError, SQLiteBackend, get_backend, translate_to_sqlite
+
+
+def test_translate_mysql_dialect():
+    assert translate_to_sqlite("SELECT * FROM T WHERE a = %s AND b = %s") == "SELECT * FROM T WHERE a = ? AND b = ?"
+    assert translate_to_sqlite("insert ignore INTO T (a) VALUES (%s)") == "INSERT OR IGNORE INTO T (a) VALUES (?)"
+    assert translate_to_sqlite("ON DUPLICATE KEY UPDATE n = n + VALUES(n)") == \
+        "ON CONFLICT DO UPDATE SET n = n + excluded.n"
+    assert translate_to_sqlite("WHERE YEAR(t.d) = 2025 AND MONTH(t.d) = 3") == \
+        "WHERE CAST(strftime('%Y', t.d) AS INTEGER) = 2025 AND CAST(strftime('%m', t.d) AS INTEGER) = 3"
+    assert translate_to_sqlite("DATEDIFF(g.target_date, CURDATE())") == \
+        "CAST(julianday(g.target_date) - julianday(date('now', 'localtime')) AS INTEGER)"
+
+
+def test_unknown_backend():
+    with pytest.raises(BackendError):
+        get_backend({'backend': 'postgres'})
+
+
+def test_sqlite_connection(tmp_path):
+    backend = get_backend({'backend': 'sqlite', 'sqlite': {'path': str(tmp_path / 'data.db')}, 'pool_size': 3})
+    assert isinstance(backend, SQLiteBackend) and backend.pool_args['size'] == 3
+    conn = backend.connect()
+    assert conn.raw.execute("PRAGMA journal_mode").fetchone() == ('wal',)
+    assert conn.raw.execute("PRAGMA foreign_keys").fetchone() == (1,)
+    cursor = conn.cursor()
+    cursor.execute("INSERT INTO Users (username, hashed_password) VALUES (%s, %s)", ('a', 'x'))
+    user_id = cursor.lastrowid
+    cursor.execute("INSERT INTO Categories (user_id, name, type) VALUES (%s, %s, %s)", (user_id, 'Food', 'expense'))
+    category_id = cursor.lastrowid
+    cursor.execute("""INSERT INTO Transactions (user_id, type, amount, category_id, description, transaction_date)
+                      VALUES (%s, 'expense', %s, %s, 'x', %s)""", (user_id, 12.5, category_id, date(2025, 3, 1)))
+    cursor.execute("SELECT transaction_date, MONTH(transaction_date) FROM Transactions")
+    assert cursor.fetchone() == (date(2025, 3, 1), 3)
+    conn.close()
+    assert SQLiteBackend.is_alive(conn) is False
+
+
+def test_memory_database_uses_one_connection():
+    assert get_backend({'backend': 'sqlite', 'sqlite': {'path': ':memory:'}}).pool_args['size'] == 1
@@ -0,0 +1,90 @@
+import json
+import os
+import time
+from datetime import date
+
+import pytest
+
+from models.transaction import Transaction
+from utils.backup import (BackupEngine, BackupScheduler, ContentDigest, LocalDirectoryTarget, backup_to_local,
+                          iter_backup, iter_snapshot, restore_from_local)
+
+
+class FailingEngine:
+    user_id = 1
+
+    def __init__(self):
+        self.attempts = 0
+
+    def load_manifest(self):
+        return {"snapshots": []}
+
+    def run(self):
+        self.attempts += 1
+        raise RuntimeError("database unreachable")
+
+
+def test_failing_backup_backs_off():
+    scheduler = BackupScheduler(None, [], interval=3600, retry=0.05)
+    engine = FailingEngine()
+    scheduler.engines = [engine]
+    scheduler.start()
+    time.sleep(0.5)
+    scheduler.stop()
+    scheduler.join(1)
+    # Due at once, then retried after 0.05s, 0.1s and 0.2s
+    assert 2 <= engine.attempts <= 5
+    assert scheduler.failures == engine.attempts
+
+
+def test_content_digest_ignores_order_and_ids():
+    first, second = ContentDigest(), ContentDigest()
+    for row in ({"id": 1, "amount": 10, "category_id": 4}, {"id": 2, "amount": 20, "category_id": 4}):
+        first.add(row)
+    for row in ({"id": 9, "amount": 20, "category_id": 7}, {"id": 8, "amount": 10, "category_id": 7}):
+        second.add(row)
+    assert first.hexdigest() == second.hexdigest() and first.rows == 2
+    second.add({"id": 10, "amount": 10, "category_id": 7})
+    assert first.hexdigest() != second.hexdigest()
+
+
+@pytest.mark.parametrize("name", ["transactions.json", "transactions.json.gz"])
+def test_local_file_round_trip(tmp_path, name):
+    records = [{"date": "2025-03-01", "type": "Expense", "amount": 10.5, "category": "Food", "tags": ["x"]},
+               {"date": "2025-03-02", "type": "Income", "amount": 500, "category": "Salary"}]
+    filename = str(tmp_path / name)
+    backup_to_local(records, filename)
+    assert [t.to_dict() for t in iter_backup(filename)] == [Transaction.from_dict(r).to_dict() for r in records]
+    legacy = tmp_path / "legacy.json"
+    legacy.write_text(json.dumps(records), encoding="utf-8")
+    assert [t["amount"] for t in restore_from_local(str(legacy))] == [10.5, 500]
+
+
+def test_snapshot_chain_rotation_and_checksums(db, user_id, categories, tmp_path):
+    target = LocalDirectoryTarget(str(tmp_path / "backups"))
+    engine = BackupEngine(db, user_id, target, full_every=3, keep_full=1)
+    kinds = []
+    for day in range(1, 6):
+        db.add_transaction(user_id, 'expense', day, categories['Shopping'], f'item {day}', date(2025, 3, day))
+        kinds.append(engine.run()["kind"])
+    assert kinds == ["full", "incremental", "incremental", "full", "incremental"]
+    chain = engine.restore_chain()
+    assert [entry["kind"] for entry in chain] == ["full", "incremental"]
+    assert engine.load_manifest()["snapshots"] == chain   # older than the last full were pruned
+    assert sorted(os.listdir(target.path)) == sorted([entry["file"] for entry in chain] + [engine.manifest_name])
+    assert sum(1 for table, _ in iter_snapshot(target, chain[0]) if table == "Transactions") == 4
+
+    path = os.path.join(target.path, chain[-1]["file"])
+    with open(path, "r+b") as f:
+        f.seek(-6, os.SEEK_END)
+        f.write(b"\0\0\0\0")
+    with pytest.raises(ValueError):
+        list(iter_snapshot(target, chain[-1]))
+
+
+def test_scheduler_runs_at_once_only_when_due(db, user_id, tmp_path):
+    target = LocalDirectoryTarget(str(tmp_path / "backups"))
+    scheduler = BackupScheduler(db, [user_id], interval="hourly", target=target)
+    assert scheduler._seconds_until_due() == 0
+    scheduler.engines[0].run()
+    assert 3590 < scheduler._seconds_until_due() <= 3600
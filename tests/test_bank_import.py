@@ -0,0 +1,63 @@
+import os
+
+from utils.bank_import import import_bank_csv, import_bank_csv_to_db, iter_bank_csv
+
+
+def write_csv(tmp_path, text):
+    path = tmp_path / "statement.csv"
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def test_default_profile_parses_thousands_separators(tmp_path):
+    filename = write_csv(tmp_path, 'Date,Description,Amount,Type\n'
+                                   '2025-03-01,Rent,"1,234.50",Expense\n'
+                                   '2025-03-02,Salary,"85,000",Income\n'
+                                   '2025-03-03,Blank,,Expense\n')
+    invalid = []
+    batches = list(iter_bank_csv(filename, on_invalid=lambda line, error: invalid.append(line)))
+    rows = [t for batch in batches for t in batch]
+    assert [(t["notes"], t["type"], t["amount"]) for t in rows] == [("Rent", "Expense", 1234.5),
+                                                                   ("Salary", "Income", 85000.0)]
+    assert invalid == [4]
+
+
+def test_debit_credit_profile(tmp_path):
+    filename = write_csv(tmp_path, 'Txn Date,Description,Debit,Credit\n'
+                                   '01 Mar 2025,SWIGGY ORDER,"1,250.00",\n'
+                                   '02 Mar 2025,NEFT SALARY,,"90,000.00"\n'
+                                   '03 Mar 2025,BALANCE B/F,,\n')
+    invalid = []
+    rows = [t for batch in iter_bank_csv(filename, {"swiggy": "Food"}, profile="sbi",
+                                         on_invalid=lambda line, error: invalid.append(line)) for t in batch]
+    assert [(t["date"], t["type"], t["amount"], t["category"]) for t in rows] == [
+        ("2025-03-01", "Expense", 1250.0, "Food"), ("2025-03-02", "Income", 90000.0, "Other")]
+    assert invalid == [4]
+
+
+def test_first_mapping_rule_wins(tmp_path):
+    filename = write_csv(tmp_path, 'Date,Description,Amount,Type\n2025-03-01,Uber Eats dinner,300,Expense\n')
+    assert import_bank_csv(filename, {"uber eats": "Food", "uber": "Transport"})[0]["category"] == "Food"
+    assert import_bank_csv(filename, {"uber": "Transport", "uber eats": "Food"})[0]["category"] == "Transport"
+
+
+def test_streams_bounded_batches_with_progress(tmp_path):
+    filename = write_csv(tmp_path, 'Date,Description,Amount,Type\n' +
+                         ''.join(f'2025-03-0{day},Item {day},{day}0,Expense\n' for day in range(1, 6)))
+    progress = []
+    batches = list(iter_bank_csv(filename, batch_size=2, progress=lambda *args: progress.append(args)))
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert [rows for rows, _, _ in progress] == [2, 4, 5]
+    assert progress[-1][1] == progress[-1][2] == os.path.getsize(filename)
+
+
+def test_import_into_database(tmp_path, db, user_id):
+    filename = write_csv(tmp_path, 'Date,Description,Amount,Type\n'
+                                   '2025-03-01,UPI/1111/SWIGGY,250,Expense\n'
+                                   '2025-03-01,Uber trip,90,Expense\n'
+                                   '2025-03-02,Unknown shop,40,Expense\n'
+                                   '2025-03-02,not a date,40,Expense\n'
+                                   '2025-03-01,UPI/2222/SWIGGY,250,Expense\n')
+    summary = import_bank_csv_to_db(db, user_id, filename, {"swiggy": "Food & Dining"}, batch_size=2)
+    assert summary == {"inserted": 2, "duplicates": 1, "invalid": 2}
+    assert {row[3] for row in db.get_transactions(user_id)} == {"Food & Dining", "Transportation"}
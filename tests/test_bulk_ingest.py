@@ -0,0 +1,30 @@
+from datetime import date
+
+
+def test_bulk_insert_validates_and_categorizes(db, user_id, categories):
+    rows = [
+        {'type': 'expense', 'amount': '120.456', 'category': 'Shopping', 'description': 'Myntra', 'date': '2025-03-01'},
+        {'type': 'Expense', 'amount': 80, 'category_id': categories['Healthcare'], 'description': 'Apollo',
+         'transaction_date': date(2025, 3, 2), 'tags': ['health']},
+        {'amount': 45, 'description': 'Uber ride', 'transaction_date': '2025-03-03'},   # auto-categorized
+        {'type': 'refund', 'amount': 10, 'description': 'x', 'transaction_date': '2025-03-04'},
+        {'type': 'expense', 'amount': 'ten', 'description': 'x', 'transaction_date': '2025-03-04'},
+        {'type': 'expense', 'amount': 0, 'description': 'x', 'transaction_date': '2025-03-04'},
+        {'type': 'expense', 'amount': 10, 'description': 'Swiggy', 'transaction_date': '03/04/2025'},
+        {'type': 'expense', 'amount': 10, 'description': 'no keyword here', 'transaction_date': '2025-03-04'},
+    ]
+    summary = db.add_transactions_bulk(user_id, rows, chunk_size=2, generate_insights=False)
+    assert (summary['success'], summary['inserted'], summary['invalid']) == (True, 3, 5)
+    assert [result['status'] for result in summary['results']] == ['inserted'] * 3 + ['invalid'] * 5
+    stored = {description: (amount, category) for _, _, amount, category, description, *_
+              in db.get_transactions(user_id)}
+    assert stored == {'Myntra': (120.46, 'Shopping'), 'Apollo': (80, 'Healthcare'),
+                      'Uber ride': (45, 'Transportation')}
+
+
+def test_bulk_insert_can_keep_duplicates(db, user_id):
+    row = {'type': 'expense', 'amount': 99, 'category': 'Food & Dining', 'description': 'Cafe',
+           'transaction_date': '2025-03-01'}
+    summary = db.add_transactions_bulk(user_id, [row, dict(row)], skip_duplicates=False, generate_insights=False)
+    assert (summary['inserted'], summary['duplicates']) == (2, 0)
+    assert len(db.get_transactions(user_id, 3, 2025)) == 2
@@ -0,0 +1,42 @@
+from utils.categorizer import KeywordMatcher, build_category_matcher
+
+
+def test_overlapping_keywords():
+    matcher = KeywordMatcher([("he", 3, "he"), ("she", 2, "she"), ("hers", 1, "hers"), ("his", 4, "his")])
+    assert matcher.match("ushers") == "hers"     # ends inside "she", reached through a suffix link
+    assert matcher.match("ushe") == "she"
+    assert matcher.match("this") == "his"
+    assert matcher.match("nothing") is None
+    assert matcher.match("") is None
+
+
+def test_lowest_rank_wins_wherever_it_occurs():
+    matcher = KeywordMatcher([("pizza", 2, "food"), ("uber", 1, "travel"), ("uber eats", 0, "delivery")])
+    assert matcher.match("Pizza then Uber home") == "travel"
+    assert matcher.match("uber eats pizza") == "delivery"
+    # An equal rank keeps the keyword compiled first
+    assert KeywordMatcher([("cafe", 1, "a"), ("cafe", 1, "b")]).match("cafe") == "a"
+
+
+def test_case_insensitive():
+    matcher = KeywordMatcher([("NetFlix", 0, "tv"), ("", 0, "empty")])
+    assert matcher.match("NETFLIX.COM") == "tv"
+    assert matcher.match("netflix") == "tv"
+    assert len(matcher) == len("netflix")
+
+
+def test_user_rules_before_built_ins_before_later_categories():
+    patterns = {'Food & Dining': ['swiggy', 'food'], 'Shopping': ['amazon', 'store'], 'Healthcare': ['pharmacy']}
+    ids = {'Food & Dining': 1, 'Shopping': 2}   # no Healthcare category
+    matcher = build_category_matcher(patterns, ids, [('amazon fresh', 1), ('amazon', 5)])
+    assert matcher.match("Amazon Fresh order") == 1
+    assert matcher.match("AMAZON.in") == 5
+    assert matcher.match("food store") == 1
+    assert matcher.match("Apollo Pharmacy") is None
+
+
+def test_auto_categorize_uses_user_rules(db, user_id, categories):
+    assert db.auto_categorize_transaction("UPI SWIGGY 4021", 250, user_id) == categories["Food & Dining"]
+    assert db.auto_categorize_transaction("Cult fitness", 1500, user_id) is None
+    assert db.add_category_rule(user_id, " Cult ", categories["Healthcare"])
+    assert db.auto_categorize_transaction("Cult fitness", 1500, user_id) == categories["Healthcare"]
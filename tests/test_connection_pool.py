@@ -0,0 +1,124 @@
+import threading
+
+import pytest
+
+from database.connection_pool import ConnectionPool, PoolTimeout, split_pool_config
+
+
+class FakeConnection:
+    def __init__(self):
+        self.alive = True
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def make_pool(**kwargs):
+    opened = []
+
+    def connect():
+        opened.append(FakeConnection())
+        return opened[-1]
+
+    return ConnectionPool(connect, lambda conn: conn.alive, **kwargs), opened
+
+
+def test_split_pool_config():
+    driver_args, pool_args = split_pool_config({'host': 'localhost', 'pool_size': 2})
+    assert driver_args == {'host': 'localhost'}
+    assert pool_args['size'] == 2 and pool_args['checkout_timeout'] == 10.0
+
+
+def test_checkout_and_return_reuses_connections():
+    pool, opened = make_pool(size=2)
+    first = pool.acquire()
+    second = pool.acquire()
+    pool.release(second)
+    assert pool.acquire() is second      # the most recently returned one goes out first
+    pool.release(first)
+    pool.release(second)
+    assert len(opened) == 2
+    stats = pool.get_stats()
+    assert (stats['open'], stats['idle'], stats['in_use'], stats['checkouts']) == (2, 2, 0, 3)
+
+
+def test_exhausted_pool_times_out():
+    pool, _ = make_pool(size=1, checkout_timeout=0.05)
+    held = pool.acquire()
+    with pytest.raises(PoolTimeout):
+        pool.acquire()
+    assert pool.get_stats()['timeouts'] == 1
+    pool.release(held)
+    assert pool.acquire() is held
+
+
+def test_waiter_gets_a_returned_connection():
+    pool, _ = make_pool(size=1, checkout_timeout=5)
+    held = pool.acquire()
+    got = []
+    waiter = threading.Thread(target=lambda: got.append(pool.acquire()))
+    waiter.start()
+    pool.release(held)
+    waiter.join(5)
+    assert got == [held]
+    assert pool.get_stats()['waits'] <= 1
+
+
+def test_connection_returned_after_exception():
+    pool, opened = make_pool(size=1, checkout_timeout=0.05)
+    with pytest.raises(RuntimeError):
+        with pool.connection():
+            raise RuntimeError("query failed")
+    assert pool.get_stats()['in_use'] == 0
+    with pool.connection() as conn:      # a live connection goes back to the pool
+        assert conn is opened[0]
+    assert len(opened) == 1 and not opened[0].closed
+
+
+def test_dead_connection_discarded_after_exception():
+    pool, opened = make_pool(size=1, checkout_timeout=0.05)
+    with pytest.raises(RuntimeError):
+        with pool.connection() as conn:
+            conn.alive = False
+            raise RuntimeError("server went away")
+    assert opened[0].closed
+    with pool.connection() as conn:
+        assert conn is opened[1]
+    assert pool.get_stats()['discarded'] == 1
+
+
+def test_stale_idle_connection_replaced_on_checkout():
+    pool, opened = make_pool(size=1, idle_check=0)
+    pool.release(pool.acquire())
+    opened[0].alive = False
+    assert pool.acquire() is opened[1]
+    assert opened[0].closed
+    assert pool.get_stats()['reconnects'] == 1
+
+
+def test_failed_connect_frees_its_slot():
+    calls = []
+
+    def connect():
+        calls.append(1)
+        if len(calls) == 1:
+            raise OSError("refused")
+        return FakeConnection()
+
+    pool = ConnectionPool(connect, lambda conn: True, size=1, checkout_timeout=0.05)
+    with pytest.raises(OSError):
+        pool.acquire()
+    assert pool.acquire() is not None
+
+
+def test_close_rejects_checkouts():
+    pool, opened = make_pool(size=2)
+    held = pool.acquire()
+    pool.release(pool.acquire())
+    pool.close()
+    assert opened[1].closed and not held.closed
+    pool.release(held)
+    assert held.closed
+    with pytest.raises(PoolTimeout):
+        pool.acquire()
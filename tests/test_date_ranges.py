@@ -0,0 +1,12 @@
+from datetime import date
+
+
+def test_month_filter_keeps_boundary_days(db, user_id, categories):
+    shopping = categories['Shopping']
+    for day, description in [(date(2025, 11, 30), 'Nov'), (date(2025, 12, 1), 'Dec 1'), (date(2025, 12, 31), 'Dec 31'),
+                             (date(2025, 12, 31), 'Dec 31 again'), (date(2026, 1, 1), 'Jan')]:
+        db.add_transaction(user_id, 'expense', 10, shopping, description, day)
+    december = [row[4] for row in db.get_transactions(user_id, 12, 2025)]
+    assert december == ['Dec 31 again', 'Dec 31', 'Dec 1']   # newest first, later id first on the same day
+    assert [row[4] for row in db.get_transactions(user_id, 1, 2026)] == ['Jan']
+    assert [row[4] for row in db.get_transactions(user_id, 11, 2025)] == ['Nov']
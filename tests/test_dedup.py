@@ -0,0 +1,56 @@
+from datetime import date
+
+from utils.dedup import DedupIndex, is_near_duplicate, normalize_description, transaction_fingerprint
+
+
+def test_fingerprint_ignores_references_and_punctuation():
+    assert normalize_description("UPI/402918337711/SWIGGY-Order") == "upi swiggy order"
+    assert transaction_fingerprint(250, "2025-03-01", "UPI/402918337711/SWIGGY") == \
+        transaction_fingerprint(250.0, date(2025, 3, 1), "upi 998877665544 swiggy")
+    assert transaction_fingerprint(250, "2025-03-01", "Swiggy") != transaction_fingerprint(250, "2025-03-02", "Swiggy")
+
+
+def test_near_duplicates():
+    assert is_near_duplicate("amazon pay", "amazon pay india")
+    assert not is_near_duplicate("swiggy", "zomato")
+
+
+def test_index_within_a_batch():
+    index = DedupIndex()
+    assert index.check_and_add(250, "2025-03-01", "SWIGGY 40291833") is None
+    assert index.check_and_add(250, "2025-03-01", "Swiggy 77001122") == "exact"
+    assert index.check_and_add(250, "2025-03-01", "Swiggy Instamart") == "fuzzy"
+    # Kept: another amount, another day, another merchant
+    assert index.check_and_add(260, "2025-03-01", "Swiggy") is None
+    assert index.check_and_add(250, "2025-03-02", "Swiggy") is None
+    assert index.check_and_add(250, "2025-03-01", "Zomato") is None
+    assert len(index) == 4
+
+
+def bulk_row(amount, day, description):
+    return {'type': 'expense', 'amount': amount, 'category': 'Food & Dining', 'description': description,
+            'transaction_date': day}
+
+
+def test_bulk_import_skips_duplicates(db, user_id, categories):
+    db.add_transaction(user_id, 'expense', 120, categories["Food & Dining"], 'UPI/11112222/ZOMATO', date(2025, 3, 1))
+    summary = db.add_transactions_bulk(user_id, [
+        bulk_row(120, '2025-03-01', 'UPI/33334444/ZOMATO'),    # an existing row
+        bulk_row(300, '2025-03-02', 'Dominos Pizza'),
+        bulk_row(300, '2025-03-02', 'DOMINOS PIZZA'),           # earlier in the batch
+        bulk_row(300, '2025-03-03', 'Dominos Pizza'),           # near-duplicates that are kept:
+        bulk_row(310, '2025-03-02', 'Dominos Pizza'),           # another day, another amount,
+        bulk_row(300, '2025-03-02', 'Pizza Hut'),               # another merchant
+    ], generate_insights=False)
+    assert (summary['inserted'], summary['duplicates']) == (4, 2)
+    assert [result['status'] for result in summary['results']] == \
+        ['duplicate', 'inserted', 'duplicate', 'inserted', 'inserted', 'inserted']
+
+
+def test_check_duplicate_transaction(db, user_id, categories):
+    db.add_transaction(user_id, 'expense', 499, categories["Shopping"], 'Amazon Pay 123456789', date(2025, 3, 1))
+    assert db.check_duplicate_transaction(user_id, 499, 'AMAZON PAY 987654321', date(2025, 3, 1))
+    assert db.check_duplicate_transaction(user_id, 499, 'Amazon Pay India', date(2025, 3, 1))
+    assert not db.check_duplicate_transaction(user_id, 499.5, 'Amazon Pay', date(2025, 3, 1))
+    assert not db.check_duplicate_transaction(user_id, 499, 'Flipkart', date(2025, 3, 1))
+    assert not db.check_duplicate_transaction(user_id, 499, 'Amazon Pay', date(2025, 3, 2))
@@ -0,0 +1,56 @@
+from datetime import date
+
+import pytest
+
+from utils import forecasting
+from utils.forecasting import ForecastCache, fit_batch, fit_series, projected_month_end, trim_leading_zeros
+
+SEASONAL = [100 + (400 if month % 12 == 11 else 0) for month in range(36)]   # every December is 500
+
+
+def test_trim_leading_zeros():
+    assert trim_leading_zeros([0, 0, 5, 0, 7]) == [5, 0, 7]
+    assert trim_leading_zeros([0, 0]) == [0]
+
+
+def test_flat_and_short_series_forecast_their_mean():
+    assert fit_series([0, 0, 80, 80, 80, 80]).forecast() == 80
+    assert fit_series([50, 70]).forecast() == 60
+
+
+def test_trend_and_season():
+    assert 185 < fit_series([10 * month for month in range(1, 19)]).forecast() < 200
+    model = fit_series(SEASONAL)
+    assert model.gamma > 0
+    assert model.forecast(12) > 400 > model.forecast(1)   # next December vs next January
+    assert fit_series([100, 5, 0, 0, 0, 0]).forecast() >= 0
+
+
+@pytest.mark.parametrize("use_numpy", [False, True], ids=["loops", "numpy"])
+def test_batch_fit_matches_single_fits(use_numpy, monkeypatch):
+    if use_numpy:
+        pytest.importorskip("numpy")
+    monkeypatch.setattr(forecasting, "NUMPY_AVAILABLE", use_numpy)
+    rows = [SEASONAL, [float(month) for month in range(1, 37)], [300.0 + (month % 3) for month in range(36)]]
+    for row, model in zip(rows, fit_batch(rows)):
+        assert model.forecast() == pytest.approx(fit_series(row).forecast())
+
+
+def test_cache_refits_only_changed_series():
+    cache = ForecastCache()
+    cache.forecast_many({"food": [100] * 6, "rent": [900] * 6})
+    assert cache.refits == 2
+    assert cache.forecast_many({"food": [0, 100, 100, 100, 100, 100, 100], "rent": [900] * 6}) == \
+        {"food": 100, "rent": 900}
+    assert cache.refits == 2   # a leading zero month does not change the series
+    cache.forecast("food", [100] * 5 + [160])
+    assert cache.refits == 3
+    cache.invalidate(lambda key: key == "rent")
+    cache.forecast("rent", [900] * 6)
+    assert cache.refits == 4
+
+
+def test_projected_month_end():
+    assert projected_month_end(300, None, date(2025, 4, 10)) == 900
+    assert projected_month_end(300, 600, date(2025, 4, 10)) == 700
+    assert projected_month_end(300, 600, date(2025, 4, 30)) == 300
@@ -0,0 +1,59 @@
+from datetime import date
+
+from utils.heatmap import HEAT_COLORS, DailySeries, HeatmapEngine, get_heat_color
+
+
+def test_series_grows_both_ways():
+    series = DailySeries()
+    assert list(series.window(10, 12)) == [0, 0, 0]
+    assert series.add("2025-03-01", 500) == (0, 500)
+    assert series.add("2025-03-01", 250) == (500, 750)
+    series.add("2020-01-01", 100)                       # before the origin
+    series.add("2030-12-31", 100)                       # past the end
+    march = date(2025, 3, 1).toordinal()
+    assert series.get("2025-03-01") == 750 and series.get("2020-01-01") == 100
+    assert list(series.window(march - 1, march + 1)) == [0, 750, 0]
+    assert sum(series.window(date(2019, 1, 1).toordinal(), date(2031, 1, 1).toordinal())) == 950
+
+
+def test_quantile_levels_follow_changes():
+    engine = HeatmapEngine.from_transactions(
+        [{"date": f"2025-03-{day:02d}", "type": "Expense", "amount": day * 10} for day in range(1, 9)] +
+        [{"date": "2025-03-09", "type": "Income", "amount": 5000}])
+    assert engine.breaks() == [3000, 5000, 7000]
+    assert engine.color("2025-03-01") == HEAT_COLORS[1]
+    assert engine.color("2025-03-08") == HEAT_COLORS[4]
+    assert engine.color("2025-03-09") == HEAT_COLORS[0]
+    engine.remove("2025-03-08", 80)
+    engine.add("2025-03-01", 1000)                      # now the heaviest day
+    assert engine.total("2025-03-08") == 0 and engine.color("2025-03-08") == HEAT_COLORS[0]
+    assert engine.color("2025-03-01") == HEAT_COLORS[4]
+    assert get_heat_color(10.0, engine.breaks()) == HEAT_COLORS[1]
+    assert get_heat_color(10.0) == "#4CAF50"
+
+
+def test_year_view_pads_weeks():
+    engine = HeatmapEngine()
+    engine.add("2025-01-01", 40)                        # a lone spending day is the lowest band
+    weeks = engine.year_view(2025)
+    assert all(len(week) == 7 for week in weeks)
+    assert weeks[0][:2] == [None, None]                 # 2025 starts on a Wednesday
+    assert weeks[0][2] == (date(2025, 1, 1), 40.0, HEAT_COLORS[1])
+    assert sum(cell is not None for week in weeks for cell in week) == 365
+    assert engine.colors_between("2024-12-31", "2025-01-01") == {date(2024, 12, 31): HEAT_COLORS[0],
+                                                                  date(2025, 1, 1): HEAT_COLORS[1]}
+
+
+def test_cached_heatmap_tracks_writes(db, user_id, categories):
+    food = categories["Food & Dining"]
+    assert db.add_transaction(user_id, 'expense', 120, food, 'Lunch', date(2025, 3, 1))
+    assert db.add_transaction(user_id, 'income', 900, food, 'Refund', date(2025, 3, 2))
+    heatmap = db.get_heatmap(user_id)
+    assert heatmap.total("2025-03-01") == 120 and heatmap.total("2025-03-02") == 0
+    assert db.get_heatmap(user_id) is heatmap
+
+    assert db.add_transaction(user_id, 'expense', 30, food, 'Snack', date(2025, 3, 1))
+    assert heatmap.total("2025-03-01") == 150
+    lunch = [row[0] for row in db.get_transactions(user_id) if row[4] == 'Lunch'][0]
+    assert db.delete_transaction(user_id, lunch)
+    assert db.get_heatmap(user_id).total("2025-03-01") == 30
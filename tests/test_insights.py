@@ -0,0 +1,61 @@
+from datetime import date, datetime, timedelta
+
+from utils import insights
+from utils.insights import predict_expenses
+
+
+def monthly(category, amounts, transaction_type="Expense"):
+    return [{"date": f"2025-{month:02d}-10", "type": transaction_type, "amount": amount, "category": category}
+            for month, amount in enumerate(amounts, start=1)]
+
+
+def test_income_not_forecast_as_spending():
+    transactions = monthly("Food", [100] * 6) + monthly("Food", [5000] * 6, "Income") + monthly("Salary", [9000] * 6, "Income")
+    forecast = predict_expenses(transactions, user_id=1)
+    assert set(forecast) == {"Food"}
+    assert abs(forecast["Food"] - 100) < 1
+
+
+def test_forecasts_kept_per_user():
+    assert abs(predict_expenses(monthly("Food", [100] * 6), user_id=1)["Food"] - 100) < 1
+    assert abs(predict_expenses(monthly("Food", [900] * 6), user_id=2)["Food"] - 900) < 1
+    refits = insights._forecasts.refits
+    assert abs(predict_expenses(monthly("Food", [100] * 6), user_id=1)["Food"] - 100) < 1
+    assert insights._forecasts.refits == refits   # user 2's history did not evict user 1's model
+
+
+def insight(title, description="", **extra):
+    return dict({'type': 'suggestion', 'title': title, 'description': description, 'priority': 'low'}, **extra)
+
+
+def stored(db, user_id):
+    return db.execute_query("SELECT title, description, period FROM FinancialInsights WHERE user_id = %s "
+                            "ORDER BY title, period", (user_id,), fetch_results=True)
+
+
+def test_regenerated_insight_is_refreshed_not_duplicated(db, user_id):
+    assert db.save_insights([(user_id, insight('Tip', 'old')), (user_id, insight('Tip', 'old', period='2025-01'))]) == 2
+    assert db.save_insights([(user_id, insight('Tip', 'new'))]) == 1
+    this_month = datetime.now().strftime('%Y-%m')
+    assert stored(db, user_id) == [('Tip', 'old', '2025-01'), ('Tip', 'new', this_month)]
+
+
+def test_expired_insights_hidden_and_pruned(db, user_id):
+    past = datetime.now().replace(microsecond=0) - timedelta(days=1)
+    db.save_insights([(user_id, insight('Stale', expires_at=past)), (user_id, insight('Fresh'))])
+    assert [i['title'] for i in db.get_insights(user_id)] == ['Fresh']
+    assert db.prune_expired_insights(batch_size=1) == 1
+    assert [title for title, _, _ in stored(db, user_id)] == ['Fresh']
+
+
+def test_budget_insights_for_several_users(db, user_id, categories):
+    assert db.create_user('second', 'secret')
+    other = db.authenticate_user('second', 'secret')
+    other_food = next(c for c, name, kind in db.get_categories(other) if name == 'Food & Dining')
+    today = date.today()
+    for owner, food, spent in ((user_id, categories['Food & Dining'], 900), (other, other_food, 100)):
+        db.set_budget(owner, food, 500, today.replace(day=1), today + timedelta(days=31))
+        db.add_transaction(owner, 'expense', spent, food, 'Groceries', today)
+    assert db.generate_insights_for_users([user_id, other]) >= 1
+    assert 'Budget Exceeded: Food & Dining' in [title for title, _, _ in stored(db, user_id)]
+    assert 'Budget Exceeded: Food & Dining' not in [title for title, _, _ in stored(db, other)]
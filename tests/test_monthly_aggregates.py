@@ -0,0 +1,47 @@
+from datetime import date
+
+
+def income_category(db, user_id):
+    return next(category_id for category_id, _, kind in db.get_categories(user_id) if kind == 'income')
+
+
+def aggregates(db, user_id):
+    return db.execute_query("""SELECT year, month, category_id, type, total_amount, transaction_count
+                               FROM MonthlyAggregates WHERE user_id = %s AND transaction_count > 0
+                               ORDER BY year, month, category_id, type""", (user_id,), fetch_results=True)
+
+
+def test_dashboard_and_budgets_follow_inserts_and_deletes(db, user_id, categories):
+    food, travel = categories['Food & Dining'], categories['Transportation']
+    db.add_transaction(user_id, 'income', 5000, income_category(db, user_id), 'Salary', date(2025, 3, 1))
+    db.add_transaction(user_id, 'expense', 300, food, 'Swiggy', date(2025, 3, 5))
+    db.add_transaction(user_id, 'expense', 200, food, 'Zomato', date(2025, 3, 31))
+    db.add_transaction(user_id, 'expense', 150, travel, 'Uber', date(2025, 3, 9))
+    db.add_transaction(user_id, 'expense', 999, food, 'Next month', date(2025, 4, 1))
+
+    dashboard = db.get_dashboard_data(user_id, 3, 2025)
+    assert (dashboard['income'], dashboard['expense'], dashboard['balance']) == (5000, 650, 4350)
+    assert dashboard['category_expenses'] == [('Food & Dining', 500), ('Transportation', 150)]
+
+    assert db.set_budget(user_id, food, 400, date(2025, 1, 1), date(2025, 12, 31))
+    [budget] = db.get_budget_summary(user_id, 3, 2025)
+    assert (budget['category'], budget['spent'], budget['remaining']) == ('Food & Dining', 500, -100)
+
+    uber = next(row[0] for row in db.get_transactions(user_id) if row[4] == 'Uber')
+    assert db.delete_transaction(user_id, uber)
+    assert not db.delete_transaction(user_id, uber)
+    dashboard = db.get_dashboard_data(user_id, 3, 2025)
+    assert dashboard['expense'] == 500
+    assert dashboard['category_expenses'] == [('Food & Dining', 500)]
+
+
+def test_rebuild_matches_incremental_rollup(db, user_id, categories):
+    db.add_transactions_bulk(user_id, [
+        {'amount': 10 + day, 'category': name, 'description': f'{name} {day}', 'transaction_date': date(2025, month, day)}
+        for month in (1, 2) for day in (1, 15, 28) for name in ('Shopping', 'Healthcare')
+    ], skip_duplicates=False, generate_insights=False)
+    incremental = aggregates(db, user_id)
+    assert len(incremental) == 4
+    db.execute_query("DELETE FROM MonthlyAggregates WHERE user_id = %s", (user_id,))
+    assert db.rebuild_monthly_aggregates(user_id)
+    assert aggregates(db, user_id) == incremental
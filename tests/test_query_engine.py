@@ -0,0 +1,93 @@
+from datetime import date
+
+from utils.ai_analysis import analyze_expenses
+from utils.query_engine import build_plan, choose_source, match_categories, parse_question, resolve_period
+
+DEFAULT_CATEGORIES = ["Food & Dining", "Transportation", "Shopping", "Entertainment",
+                      "Bills & Utilities", "Healthcare"]
+
+
+def test_parse_is_cached_by_normalized_text():
+    question = parse_question("How much did I spend on food?")
+    assert parse_question("how much did i spend on food") is question
+    assert (question.metric, question.type, question.period, question.terms) == ("sum", "expense", None, ("food",))
+    top = parse_question("top 3 categories last month")
+    assert (top.group_by, top.order, top.limit, top.period) == ("category", "desc", 3, ("last", "month"))
+
+
+def test_periods_and_source():
+    today = date(2026, 10, 18)
+    for text, period, source in [
+            ("average income this year", (date(2026, 1, 1), date(2026, 12, 31)), "aggregates"),
+            ("biggest expense in march 2025", (date(2025, 3, 1), date(2025, 3, 31)), "transactions"),
+            ("how many transactions in the last 2 weeks", (date(2026, 10, 5), today), "transactions"),
+            ("spending in june", (date(2026, 6, 1), date(2026, 6, 30)), "aggregates"),
+            ("spending in december", (date(2025, 12, 1), date(2025, 12, 31)), "aggregates")]:
+        question = parse_question(text)
+        assert resolve_period(question.period, today) == period, text
+        assert choose_source(question, *period) == source, text
+
+
+def test_category_name_wins_over_synonym():
+    assert match_categories(["rent"], DEFAULT_CATEGORIES + ["Rent"]) == (["Rent"], [])
+    assert match_categories(["travel"], DEFAULT_CATEGORIES + ["Travel"]) == (["Travel"], [])
+
+
+def test_synonym_used_when_no_category_matches():
+    assert match_categories(["rent"], DEFAULT_CATEGORIES) == (["Bills & Utilities"], [])
+    assert match_categories(["travel"], DEFAULT_CATEGORIES) == (["Transportation"], [])
+    assert match_categories(["yoga"], DEFAULT_CATEGORIES) == ([], ["yoga"])
+
+
+def test_question_on_rent_category():
+    question = "How much did I spend on rent in June?"
+    june = build_plan(parse_question(question), {"Rent"}, date.today()).date_from
+    transactions = [
+        {"date": june.isoformat(), "type": "Expense", "amount": 15000, "category": "Rent"},
+        {"date": june.isoformat(), "type": "Expense", "amount": 400, "category": "Bills & Utilities"},
+    ]
+    answer = analyze_expenses(transactions, question)
+    assert "No category matches" not in answer
+    assert "15,000" in answer and "Rent" in answer
+
+
+def test_month_groups_over_partial_months(db, user_id, categories):
+    from utils.query_engine import QueryEngine
+    today = date(2026, 10, 18)
+    food = categories["Food & Dining"]
+    for day, amount in [(date(2026, 9, 25), 40), (date(2026, 10, 2), 60), (date(2026, 10, 15), 25)]:
+        assert db.add_transaction(user_id, 'expense', amount, food, 'lunch', day)
+    engine = QueryEngine(db, user_id)
+    answer = engine.ask("monthly breakdown last 30 days", today)
+    assert answer["plan"].source == "transactions"
+    assert answer["rows"] == [("Sep 2026", 40.0), ("Oct 2026", 85.0)]
+    assert engine.ask("spending by month this week", today)["rows"] == [("Oct 2026", 25.0)]
+    assert engine.ask("spending per month in the last 10 days", today)["rows"] == [("Oct 2026", 25.0)]
+
+
+def test_execution_errors_answered_like_parse_errors(db, user_id):
+    from utils.query_engine import QueryEngine
+    engine = QueryEngine(db, user_id)
+    engine.execute = lambda plan: (_ for _ in ()).throw(ValueError("that cannot be answered"))
+    answer = engine.ask("how much did I spend this month")
+    assert answer["answer"] == "Sorry, that cannot be answered." and answer["value"] is None
+
+
+def test_aggregates_agree_with_transactions(db, user_id, categories):
+    from utils.query_engine import QueryEngine
+    food, shopping = categories["Food & Dining"], categories["Shopping"]
+    for day, amount, category in [(date(2026, 8, 30), 10, food), (date(2026, 9, 2), 40, food),
+                                  (date(2026, 9, 20), 60, shopping), (date(2026, 9, 21), 5, food)]:
+        assert db.add_transaction(user_id, 'expense', amount, category, 'x', day)
+    engine = QueryEngine(db, user_id)
+    today = date(2026, 10, 18)
+    for text in ["how much did I spend last month", "how much did I spend on food last month",
+                 "how many transactions last month", "average spending last month",
+                 "top 2 categories last month"]:
+        question = parse_question(text)
+        plan = engine.plan(question, today)
+        assert plan.source == "aggregates", text
+        scan = build_plan(question, engine.categories(), today, source="transactions")
+        assert engine.execute(scan) == engine.execute(plan), text
+    assert engine.ask("how much did I spend on food last month", today)["value"] == 45
+    assert engine.ask("biggest expense last month", today)["value"] == 60
@@ -0,0 +1,79 @@
+from datetime import date
+
+from models.recurring import RecurringManager, RecurringPayment, advance
+
+
+def test_month_steps_keep_the_anchor_day():
+    assert advance(date(2025, 1, 31), "monthly") == date(2025, 2, 28)
+    assert advance(date(2025, 2, 28), "monthly", anchor_day=31) == date(2025, 3, 31)
+    assert advance(date(2025, 1, 10), "weekly", 2) == date(2025, 1, 24)
+
+
+def test_pop_due_catches_up_each_missed_occurrence_once():
+    manager = RecurringManager()
+    rent = RecurringPayment("Rent", 15000, date(2025, 1, 31), "Rent")
+    gym = RecurringPayment("Gym", 900, date(2025, 3, 5), "Health", active=False)
+    manager.add_payment(rent)
+    manager.add_payment(gym)
+    due = manager.pop_due(date(2025, 4, 30))
+    assert [day for day, _ in due] == [date(2025, 1, 31), date(2025, 2, 28), date(2025, 3, 31), date(2025, 4, 30)]
+    assert rent.due_date == date(2025, 5, 31)
+    assert manager.pop_due(date(2025, 4, 30)) == []
+    gym.active = True   # paused payments stay queued
+    assert manager.pop_due(date(2025, 4, 30)) == [(date(2025, 3, 5), gym), (date(2025, 4, 5), gym)]
+
+
+def test_rescheduled_payment_surfaces_once():
+    manager = RecurringManager()
+    bill = RecurringPayment("Phone", 499, date(2025, 1, 5), "Bills")
+    manager.add_payment(bill)
+    manager.reschedule(bill, date(2025, 1, 20))
+    assert manager.pop_due(date(2025, 1, 10)) == []
+    assert manager.pop_due(date(2025, 1, 20)) == [(date(2025, 1, 20), bill)]
+
+
+def add_schedule(db, user_id, category_id, start, frequency="monthly"):
+    template_id = db.execute_query(
+        "INSERT INTO TransactionTemplates (user_id, name, type, amount, category_id, description) "
+        "VALUES (%s, 'Rent', 'expense', 15000, %s, 'Rent')", (user_id, category_id), fetch_id=True)
+    return db.execute_query(
+        "INSERT INTO RecurringSchedules (user_id, template_id, frequency, interval_value, start_date, "
+        "next_occurrence) VALUES (%s, %s, %s, 1, %s, %s)", (user_id, template_id, frequency, start, start),
+        fetch_id=True)
+
+
+def posted_dates(db, schedule_id):
+    rows = db.execute_query("SELECT transaction_date FROM Transactions WHERE recurring_schedule_id = %s "
+                            "ORDER BY transaction_date", (schedule_id,), fetch_results=True)
+    return [str(row[0])[:10] for row in rows]
+
+
+def test_same_occurrence_posted_once(db, user_id, categories):
+    schedule_id = add_schedule(db, user_id, categories["Bills & Utilities"], date(2025, 3, 1))
+    assert db.post_due_schedules(date(2025, 3, 1))["posted"] == 1
+    # As if the run died after posting but before advancing the schedule
+    db.execute_query("UPDATE RecurringSchedules SET next_occurrence = %s WHERE id = %s", (date(2025, 3, 1), schedule_id))
+    stats = db.post_due_schedules(date(2025, 3, 1))
+    assert stats["posted"] == 0 and stats["skipped"] == 1
+    assert posted_dates(db, schedule_id) == ["2025-03-01"]
+
+
+def test_missed_periods_posted_once_each(db, user_id, categories):
+    schedule_id = add_schedule(db, user_id, categories["Bills & Utilities"], date(2025, 1, 31))
+    stats = db.post_due_schedules(date(2025, 5, 15))
+    assert stats["posted"] == 4 and stats["schedules"] == 1
+    assert posted_dates(db, schedule_id) == ["2025-01-31", "2025-02-28", "2025-03-31", "2025-04-30"]
+    assert db.post_due_schedules(date(2025, 5, 15))["posted"] == 0
+    next_occurrence = db.execute_query("SELECT next_occurrence FROM RecurringSchedules WHERE id = %s",
+                                       (schedule_id,), fetch_results=True)[0][0]
+    assert str(next_occurrence)[:10] == "2025-05-31"
+
+
+def test_unique_occurrence_stops_a_racing_second_post(db, user_id, categories, monkeypatch):
+    schedule_id = add_schedule(db, user_id, categories["Bills & Utilities"], date(2025, 3, 1))
+    assert db.post_due_schedules(date(2025, 3, 1))["posted"] == 1
+    db.execute_query("UPDATE RecurringSchedules SET next_occurrence = %s WHERE id = %s", (date(2025, 3, 1), schedule_id))
+    # A second run that read before the first committed sees nothing posted yet
+    monkeypatch.setattr(type(db), "_already_posted", staticmethod(lambda cursor, schedule_ids, since: set()))
+    assert "error" in db.post_due_schedules(date(2025, 3, 1))
+    assert posted_dates(db, schedule_id) == ["2025-03-01"]
@@ -0,0 +1,56 @@
+from datetime import date, timedelta
+
+from utils.recurring_detector import amount_bands, detect_recurring, infer_period, merchant_key
+
+
+def payments(description, amount, days, transaction_type="expense", category="Bills"):
+    return [{"date": day, "type": transaction_type, "amount": amount, "description": description.format(i),
+             "category": category} for i, day in enumerate(days)]
+
+
+def monthly(first, count, day=5):
+    return [date(first.year + (first.month - 1 + i) // 12, (first.month - 1 + i) % 12 + 1, day) for i in range(count)]
+
+
+def test_merchant_key_and_bands():
+    assert merchant_key("NETFLIX.COM 8812 Mumbai") == merchant_key("Netflix.com 9931 mumbai") == "netflix com mumbai"
+    assert amount_bands([649, 199, 655, 210]) == [[1, 3], [0, 2]]
+
+
+def test_infer_period():
+    days = [day.toordinal() for day in monthly(date(2025, 1, 1), 6)]
+    assert infer_period(days) == ("monthly", 1.0)
+    assert infer_period(days[:3] + days[4:])[0] == "monthly"   # one skipped month
+    assert infer_period([date(2025, 1, 1).toordinal() + 7 * week for week in range(5)])[0] == "weekly"
+    assert infer_period(days[:2]) is None                      # too few for a monthly pattern
+    assert infer_period([1, 4, 20, 23, 60, 61]) is None
+
+
+def test_detects_each_pattern_once():
+    today = date(2025, 7, 10)
+    history = (payments("NETFLIX {0}8812", 649, monthly(date(2025, 1, 1), 7)) +
+               payments("Netflix {0}", 199, monthly(date(2025, 2, 1), 6, day=20)) +      # a second plan
+               payments("Swiggy order", 300, [date(2025, 3, d) for d in (1, 4, 9, 21, 22)]) +
+               payments("Salary ACME", 90000, monthly(date(2025, 1, 1), 7, day=1), "income", "Salary") +
+               payments("Old gym", 900, monthly(date(2024, 1, 1), 4)))
+    patterns = detect_recurring(history, today)
+    found = {(p["merchant"], p["amount"]): p for p in patterns}
+    assert set(found) == {("netflix", 649), ("netflix", 199), ("salary acme", 90000), ("old gym", 900)}
+    netflix = found[("netflix", 649)]
+    assert (netflix["frequency"], netflix["occurrences"], netflix["next_occurrence"]) == ("monthly", 7, date(2025, 8, 5))
+    assert netflix["active"] and found[("salary acme", 90000)]["type"] == "income"
+    assert not found[("old gym", 900)]["active"]
+    assert [p["next_occurrence"] for p in patterns] == sorted(p["next_occurrence"] for p in patterns)
+
+
+def test_schedules_created_once(db, user_id, categories):
+    assert db.create_transaction_template(user_id, 'Coffee', 'expense', 80, categories['Food & Dining'], 'Cafe')
+    start = date.today() - timedelta(days=200)
+    for day in monthly(start, 7, day=3):
+        db.add_transaction(user_id, 'expense', 499, categories['Entertainment'], 'SPOTIFY 88120341', day)
+    [created] = db.detect_recurring_schedules(user_id)
+    assert (created['name'], created['frequency']) == ('Spotify', 'monthly')
+    assert db.execute_query("SELECT s.template_id, t.name FROM RecurringSchedules s "
+                            "JOIN TransactionTemplates t ON t.id = s.template_id WHERE s.user_id = %s",
+                            (user_id,), fetch_results=True) == [(created['template_id'], 'Spotify')]
+    assert db.detect_recurring_schedules(user_id) == []
@@ -0,0 +1,76 @@
+import os
+from datetime import date, timedelta
+
+import pytest
+
+from utils.backup import SNAPSHOT_TABLES, BackupEngine, ContentDigest, LocalDirectoryTarget
+from utils.restore import restore_backup
+
+
+def account_digests(db, user_id):
+    digests = {}
+    for table in SNAPSHOT_TABLES:
+        with db.read_snapshot() as cursor:
+            cursor.execute(f"SELECT * FROM {table} WHERE user_id = %s", (user_id,))
+            columns = [column[0] for column in cursor.description]
+            digest = ContentDigest()
+            for values in cursor.fetchall():
+                digest.add(dict(zip(columns, values)))
+        digests[table] = (digest.rows, digest.hexdigest())
+    return digests
+
+
+@pytest.fixture
+def backed_up(db, user_id, categories, tmp_path):
+    """(engine, target) after a full snapshot and an incremental with an edit and an insert"""
+    food = categories["Food & Dining"]
+    db.add_transactions_bulk(user_id, [{'type': 'expense', 'amount': 10 + i, 'category_id': food,
+                                        'description': f'lunch {i}', 'transaction_date': date(2025, 5, 1) + timedelta(days=i)}
+                                       for i in range(40)], generate_insights=False)
+    target = LocalDirectoryTarget(str(tmp_path / 'backups'))
+    engine = BackupEngine(db, user_id, target)
+    engine.run(full=True)
+    db.execute_query("UPDATE Transactions SET amount = 999 WHERE user_id = %s AND description = 'lunch 3'", (user_id,))
+    db.add_transaction(user_id, 'expense', 42, categories["Shopping"], 'shoes', date(2025, 6, 20))
+    assert engine.run(full=False)['tables']['Transactions']['rows'] == 2
+    return engine, target
+
+
+def test_round_trip_into_fresh_user(db, user_id, backed_up):
+    _, target = backed_up
+    assert db.create_user('restored', 'secret')
+    fresh = db.authenticate_user('restored', 'secret')
+    result = restore_backup(db, user_id, fresh, target=target)
+    assert result["verified"], result["problems"]
+    assert result["snapshots"] == 2
+    assert account_digests(db, fresh) == account_digests(db, user_id)
+
+
+def test_failed_restore_leaves_account_unchanged(db, user_id, categories, backed_up):
+    _, target = backed_up
+    assert db.create_user('restored', 'secret')
+    fresh = db.authenticate_user('restored', 'secret')
+    db.add_transaction(fresh, 'expense', 5, db.get_categories(fresh)[0][0], 'kept', date(2025, 1, 1))
+    before = account_digests(db, fresh)
+
+    def fail(done, seconds):
+        raise RuntimeError("disk full")
+    with pytest.raises(RuntimeError):
+        restore_backup(db, user_id, fresh, target=target, chunk_size=10, progress=fail)
+    assert account_digests(db, fresh) == before
+
+
+def test_corrupt_snapshot_rejected_before_writing(db, user_id, backed_up):
+    engine, target = backed_up
+    entry = engine.restore_chain()[-1]
+    with open(os.path.join(target.path, entry["file"]), "ab") as f:
+        f.write(b"garbage")
+    before = account_digests(db, user_id)
+    with pytest.raises(ValueError, match="Checksum mismatch"):
+        restore_backup(db, user_id, user_id, target=target)
+    assert account_digests(db, user_id) == before
+
+
+def test_restore_without_backup(db, user_id, tmp_path):
+    with pytest.raises(ValueError, match="No full snapshot"):
+        restore_backup(db, user_id, user_id, target=LocalDirectoryTarget(str(tmp_path / 'empty')))
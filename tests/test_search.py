@@ -0,0 +1,68 @@
+from datetime import date
+
+import pytest
+
+from utils.search import fts5_expression, like_pattern, parse_query
+
+
+def test_parse_query():
+    assert parse_query('star "iced latte" -decaf') == ([("star",), ("iced", "latte")], [("decaf",)])
+    assert fts5_expression(*parse_query('star -"iced latte"')) == '"star"* NOT "iced latte"'
+    assert fts5_expression([], [("decaf",)]) is None
+
+
+def test_like_pattern_escapes_wildcards():
+    assert like_pattern(("50%",)) == "%50!%%"
+    assert like_pattern(("a_b", "c!")) == "%a!_b c!!%"
+
+
+@pytest.fixture(params=["fts", "like"])
+def search(request, db, user_id, categories):
+    """search(text, **filters) -> descriptions, over the full-text index or the LIKE fallback"""
+    if request.param == "fts" and not db.backend.fulltext:
+        pytest.skip("this SQLite build has no FTS5")
+    db.backend.fulltext = request.param == "fts"
+    food, shopping = categories["Food & Dining"], categories["Shopping"]
+    for description, notes, amount, category, day in [
+            ("Starbucks coffee", None, 5, food, date(2025, 3, 1)),
+            ("Starbucks decaf", "evening", 6, food, date(2025, 3, 2)),
+            ("Bookshop", "starbucks gift card", 25, shopping, date(2025, 3, 3)),
+            ("Order ref_42", None, 80, shopping, date(2025, 3, 4)),
+            ("Order refx42", None, 90, shopping, date(2025, 3, 5))]:
+        db.add_transaction(user_id, 'expense', amount, category, description, day, notes)
+    assert db.create_user('other', 'secret')
+    other = db.authenticate_user('other', 'secret')
+    db.add_transaction(other, 'expense', 7, db.get_categories(other)[0][0], 'Starbucks coffee', date(2025, 3, 1))
+
+    def run(text, **filters):
+        return [row[4] for row in db.search_transactions(user_id, text, **filters)['results']]
+    return run
+
+
+def test_prefix_exclusion_and_filters(search):
+    assert sorted(search("star")) == ["Bookshop", "Starbucks coffee", "Starbucks decaf"]
+    assert sorted(search("starbucks -decaf")) == ["Bookshop", "Starbucks coffee"]
+    assert search('"gift card"') == ["Bookshop"]
+    assert search("starbucks", date_from=date(2025, 3, 2), max_amount=10) == ["Starbucks decaf"]
+    assert search("", category_id=None, min_amount=85) == ["Order refx42"]
+
+
+def test_underscore_is_literal(search):
+    assert search("ref_42") == ["Order ref_42"]
+
+
+def test_ranking_and_paging(db, user_id, search):
+    if db.backend.fulltext:
+        # Description hits weigh more than notes hits
+        assert search("starbucks")[-1] == "Bookshop"
+    first = db.search_transactions(user_id, "starbucks", page_size=2)
+    second = db.search_transactions(user_id, "starbucks", page=2, page_size=2)
+    assert first['has_more'] and not second['has_more']
+    seen = [row[0] for row in first['results'] + second['results']]
+    assert len(seen) == len(set(seen)) == 3
+
+
+def test_filters_without_words_list_newest_first(search):
+    assert search("") == ["Order refx42", "Order ref_42", "Bookshop", "Starbucks decaf", "Starbucks coffee"]
+    assert search("-order", date_to=date(2025, 3, 2)) == ["Starbucks decaf", "Starbucks coffee"]
+    assert search("starbucks", transaction_type="income") == []
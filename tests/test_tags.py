@@ -0,0 +1,86 @@
+from utils.tags import TagIndex, TagTrie, extract_tags, filter_transactions_by_tag, normalize_tags, suggest_tags
+
+
+def test_extract_and_normalize():
+    assert extract_tags("lunch #Food #urgent today") == ["Food", "urgent"]
+    assert normalize_tags([" #Food", "food", "", "Travel"]) == ("food", "travel")
+
+
+def test_trie_ranks_by_count_then_name():
+    trie = TagTrie(cached=2)
+    for tag, uses in [("food", 3), ("fuel", 3), ("fun", 1), ("gift", 5)]:
+        trie.add(tag, uses)
+    assert trie.top("f") == ["food", "fuel", "fun"]      # k beyond the cache walks the subtree
+    assert trie.top("f", k=2) == ["food", "fuel"]
+    assert trie.top("", k=1) == ["gift"]
+    trie.add("fun", 4)                                   # stale caches are rebuilt
+    assert trie.top("f", k=1) == ["fun"]
+    assert trie.top("x") == [] and trie.count("fu") == 0
+
+
+def test_index_matches_and_reuses_slots():
+    index = TagIndex()
+    index.extend([(1, ["food", "work"], None), (2, ["food"], None), (3, ["travel", "work"], None)])
+    assert index.ids(all_of=["food"]) == [1, 2]
+    assert index.ids(all_of=["#Work"], none_of=["food"]) == [3]
+    assert index.ids(any_of=["travel", "food"]) == [1, 2, 3]
+    assert index.ids(all_of=["work"], any_of=["food", "gift"]) == [1]
+    assert index.ids(all_of=["food", "missing"]) == []
+    assert index.count("food") == 2 and index.suggest("f") == ["food"]
+
+    index.remove(2)
+    assert 2 not in index and index.count("food") == 1
+    index.add(4, ["food"])                                # takes the freed slot
+    index.add(1, ["travel"])                              # re-index drops the old tags
+    assert index.ids(all_of=["food"]) == [4]
+    assert index.ids(all_of=["travel"]) == [1, 3]
+    assert index.tags_of(1) == ("travel",) and "work" in index.bitmaps
+    index.remove(3)
+    assert "work" not in index.bitmaps and len(index) == 2
+
+
+def test_helpers_accept_lists_or_an_index():
+    transactions = [{"tags": ["Food"]}, {"tags": ["food", "fuel"]}, {"tags": None}]
+    assert filter_transactions_by_tag(transactions, "#food") == transactions[:2]
+    index = TagIndex.from_transactions(transactions)
+    assert filter_transactions_by_tag(index, "food") == transactions[:2]
+    assert suggest_tags(index, "f") == suggest_tags(transactions, "f") == ["food", "fuel"]
+
+
+def _add_tagged(db, user_id, rows):
+    summary = db.add_transactions_bulk(user_id, [
+        {'type': 'expense', 'amount': amount, 'category': 'Shopping', 'description': description,
+         'transaction_date': day, 'tags': tags} for description, amount, day, tags in rows
+    ], generate_insights=False)
+    assert summary['inserted'] == len(rows)
+
+
+def test_transactions_by_tags(db, user_id):
+    _add_tagged(db, user_id, [("Laptop", 900, "2025-03-01", ["work", "tech"]),
+                              ("Dinner", 40, "2025-03-03", ["food", "work"]),
+                              ("Snacks", 5, "2025-03-02", ["food"])])
+    assert db.create_user('other', 'secret')
+    _add_tagged(db, db.authenticate_user('other', 'secret'), [("Lunch", 12, "2025-03-04", ["work"])])
+
+    def descriptions(**tags):
+        return [row[4] for row in db.get_transactions_by_tags(user_id, **tags)]
+    assert descriptions(all_of=["work"]) == ["Dinner", "Laptop"]
+    assert descriptions(any_of=["tech", "food"], none_of=["work"]) == ["Snacks"]
+    assert [row[4] for row in db.get_transactions_by_tags(user_id, any_of=["food"], limit=1)] == ["Dinner"]
+    assert db.suggest_tags(user_id, "w") == ["work"]
+
+    # Deletes and later inserts keep the cached index current
+    db.delete_transaction(user_id, db.get_transactions_by_tags(user_id, all_of=["tech"])[0][0])
+    _add_tagged(db, user_id, [("Monitor", 200, "2025-03-05", ["tech"])])
+    assert descriptions(all_of=["tech"]) == ["Monitor"]
+
+
+def test_rebuild_tags(db, user_id):
+    _add_tagged(db, user_id, [("Laptop", 900, "2025-03-01", ["work"]),
+                              ("Dinner", 40, "2025-03-03", ["food", "work"]),
+                              ("Rent", 800, "2025-03-02", None)])
+    db.execute_query("DELETE FROM TransactionTags")
+    db._forget_tag_indexes()
+    assert db.get_transactions_by_tags(user_id, all_of=["work"]) == []
+    assert db.rebuild_tags(user_id, batch_size=1) == 2
+    assert [row[4] for row in db.get_transactions_by_tags(user_id, all_of=["work"])] == ["Dinner", "Laptop"]
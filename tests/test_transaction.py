@@ -0,0 +1,42 @@
+from datetime import date, datetime
+
+import pytest
+
+from models.transaction import Transaction, TransactionArray
+from utils.analytics import to_columns
+
+
+def test_reads_like_a_dict():
+    t = Transaction(datetime(2025, 3, 1, 9, 30), "Expense", 12.5, "Food", None, ["cafe"], id=7)
+    assert t["date"] == "2025-03-01" and t.day == date(2025, 3, 1).toordinal()
+    assert t.get("tags", []) == ("cafe",) and t.get("missing", "x") == "x"
+    assert "notes" in t and t["notes"] == ""
+    assert Transaction.from_dict(t.to_dict()).to_dict() == t.to_dict()
+    assert Transaction.from_dict(t) is t
+    with pytest.raises(KeyError):
+        t["missing"]
+    with pytest.raises(AttributeError):
+        t.extra = 1   # slotted, no per-record dict
+
+
+def test_updates_and_copies():
+    t = Transaction("2025-03-01", "Expense", 10, "Food")
+    t["date"] = date(2025, 4, 2)
+    t["tags"] = ["a", "b"]
+    assert (t["date"], t.tags) == ("2025-04-02", ("a", "b"))
+    moved = t.replace(amount=20, category="Travel")
+    assert (moved.amount, moved.category, moved.date, t.amount) == (20, "Travel", "2025-04-02", 10)
+    assert Transaction("2025-03-01", "Expense", 1, "Food").tags is Transaction("2025-03-02", "Expense", 2, "Food").tags
+
+
+def test_array_round_trips_records():
+    records = [{"date": "2025-03-01", "type": "Expense", "amount": 10.1, "category": "Food", "notes": "a"},
+               {"date": "2025-03-02", "type": "Income", "amount": 500, "category": "Salary", "id": 3,
+                "tags": ["pay"]},
+               {"date": "2025-03-02", "type": "Expense", "amount": 0.2, "category": "Food", "notes": ""}]
+    packed = TransactionArray(records)
+    assert len(packed) == 3 and packed.categories == ["Food", "Salary"]
+    assert [t.to_dict() for t in packed] == [Transaction.from_dict(r).to_dict() for r in records]
+    assert packed[1].id == 3 and packed[0].id is None
+    assert to_columns(packed).category_totals() == to_columns(records).category_totals()
+    assert to_columns(packed).daily_totals() == to_columns(records).daily_totals()
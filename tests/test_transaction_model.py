@@ -0,0 +1,72 @@
+from datetime import date
+
+import pytest
+
+
+@pytest.fixture
+def model_module(qapp):
+    from ui import transaction_model
+    return transaction_model
+
+
+def record(day, record_id, amount=10.0):
+    return {"id": record_id, "date": date(2025, 3, day), "type": "Expense", "amount": amount,
+            "category": "Food", "notes": f"#{record_id}"}
+
+
+def test_list_pager_pages_newest_first(model_module):
+    pager = model_module.ListPager()
+    pager.extend([record(1, 1), record(3, 3), record(2, 2)])
+    pager.add(record(3, 4))
+    pager.add(record(2, 5))
+    first = pager.fetch_page(None, 2)
+    assert [r["id"] for r in first] == [4, 3]
+    after = model_module.record_key(first[-1])
+    assert [r["id"] for r in pager.fetch_page(after, 10)] == [5, 2, 1]
+    pager.remove(record(2, 5))
+    assert [r["id"] for r in pager.fetch_page(after, 10)] == [2, 1]
+
+
+def test_model_fetches_pages_and_updates_rows(model_module):
+    pager = model_module.ListPager()
+    pager.extend(record(day, day) for day in range(1, 8))
+    calls = []
+
+    def fetch_page(after, limit):
+        calls.append(after)
+        return pager.fetch_page(after, limit)
+
+    model = model_module.TransactionTableModel(fetch_page, page_size=3)
+    while model.canFetchMore():
+        model.fetchMore()
+    assert model.rowCount() == 7 and len(calls) == 3
+    assert model.data(model.index(0, 0)) == "2025-03-07"
+    assert model.data(model.index(6, 4)) == "#1"
+
+    model.insert_record(record(5, 9))
+    assert [model.record(row)["id"] for row in range(4)] == [7, 6, 9, 5]
+    model.remove_record(record(6, 6))
+    model.update_record(record(7, 7, amount=99.0))
+    assert model.data(model.index(0, 2)) == "99.0"
+    assert model.rowCount() == 7
+
+
+def test_model_skips_records_older_than_the_loaded_page(model_module):
+    pager = model_module.ListPager()
+    pager.extend(record(day, day) for day in range(2, 8))
+    model = model_module.TransactionTableModel(pager.fetch_page, page_size=3)
+    model.fetchMore()
+    model.insert_record(record(1, 1))   # fetchMore brings it in later
+    assert model.rowCount() == 3
+    model.reset()
+    assert model.rowCount() == 0 and model.canFetchMore()
+
+
+def test_keyset_pages_from_the_database(db, user_id, categories):
+    for day in (1, 2, 2, 3, 4):
+        db.add_transaction(user_id, 'expense', 10, categories['Shopping'], f'day {day}', date(2025, 3, day))
+    first = db.get_transactions(user_id, limit=3)
+    rest = db.get_transactions(user_id, limit=3, after=(first[-1][5], first[-1][0]))
+    ids = [row[0] for row in first + rest]
+    assert len(ids) == 5 and len(set(ids)) == 5
+    assert [row[5].day for row in first + rest] == [4, 3, 2, 2, 1]
@@ -0,0 +1,61 @@
+from models.transaction_store import TransactionStore
+from utils.achievements import AchievementTracker, check_achievements
+from utils.heatmap import HeatmapEngine
+from utils.tags import TagIndex
+
+
+def record(day, amount, tags=(), transaction_type="Expense"):
+    return {"date": day, "type": transaction_type, "amount": amount, "category": "Food", "notes": "",
+            "tags": list(tags)}
+
+
+def test_batches_notify_once_and_followers_keep_up():
+    store, events = TransactionStore(), []
+    heatmap, tags = HeatmapEngine(), TagIndex()
+    heatmap.follow(store)
+    tags.follow(store)
+    store.subscribe(lambda event, changed, previous: events.append((event, len(changed) if isinstance(changed, list) else 1)))
+
+    store.add(record("2025-03-01", 10, ["cafe"]))
+    store.extend([record("2025-03-01", 5, ["cafe"]), record("2025-03-02", 7), record("2025-03-02", 100, (), "Income")])
+    assert events == [("add", 1), ("extend", 3)]
+    assert store.total("Expense") == 22 and len(store) == 4
+    assert heatmap.total("2025-03-01") == 15 and tags.count("cafe") == 2
+
+    store.replace([record("2025-04-01", 3, ["rent"])])
+    assert events[-1] == ("reset", 1)
+    assert store.total("Expense") == 3 and store.total("Income") == 0 and len(store) == 1
+    assert heatmap.total("2025-03-01") == 0 and heatmap.total("2025-04-01") == 3
+    assert tags.count("cafe") == 0 and tags.count("rent") == 1
+
+    store.clear()
+    assert events[-1] == ("clear", 1) and tags.count("rent") == 0
+
+
+def test_totals_follow_single_changes():
+    store, events = TransactionStore(), []
+    store.subscribe(lambda event, changed, previous: events.append((event, previous["amount"] if previous else None)))
+    first = store.add(record("2025-03-01", 10.1))
+    second = store.add(record("2025-03-01", 20.2))
+    assert (first["id"], second["id"]) == (1, 2)
+    store.update(second["id"], amount=5, category="Travel")
+    assert events[-1] == ("update", 20.2)
+    assert store.total("Expense") == 15.1
+    assert store.category_total("Expense", "Food") == 10.1 and store.category_total("Expense", "Travel") == 5
+    assert store.daily_total("Expense", "2025-03-01") == 15.1
+    store.remove(first["id"])
+    assert store.remove(first["id"]) is None and store.update(first["id"], amount=1) is None
+    assert store.total("Expense") == 5 and store.category_total("Expense", "Food") == 0
+    assert [event for event, _ in events] == ["add", "add", "update", "remove"]
+
+
+def test_achievements_reported_once():
+    store, unlocked = TransactionStore(), []
+    AchievementTracker(store, unlocked.append)
+    salary = store.add(record("2025-03-01", 9000, transaction_type="Income"))
+    store.add(record("2025-03-02", 1000))
+    assert unlocked == [check_achievements(store)] and len(unlocked[0]) == 1
+    store.update(salary["id"], amount=5000)   # savings drop below the goal
+    store.update(salary["id"], amount=9000)   # and earn it again
+    assert len(unlocked) == 2
+    assert check_achievements(list(store)) == check_achievements(store)
@@ -0,0 +1,69 @@
+from datetime import date
+
+import pytest
+
+from utils.usage_stats import CountMinSketch, SpaceSaving, UsageStats, merge_usage_stats
+
+
+def test_space_saving_keeps_heavy_hitters_within_error():
+    stream = ["a"] * 50 + ["b"] * 30 + [f"rare{n}" for n in range(40)] + ["c"] * 20
+    summary = SpaceSaving(capacity=8)
+    for item in stream:
+        summary.add(item)
+    assert len(summary) == 8
+    top = summary.top(3)
+    assert [item for item, _, _ in top] == ["a", "b", "c"]
+    for item, total, error in top:
+        assert total - error <= stream.count(item) <= total
+    assert SpaceSaving.from_dict(summary.to_dict()).top(3) == top
+
+
+def test_space_saving_merge_and_weights():
+    left, right = SpaceSaving(capacity=2), SpaceSaving(capacity=2)
+    left.add("rent", 800)
+    left.add("cafe", 5)
+    right.add("rent", 800)
+    right.add("grocer", 60)
+    right.add("bus", 2)        # evicts the smallest counter and inherits it as error
+    assert right.top(2) == [("rent", 800, 0), ("bus", 62, 60)]
+    assert left.merge(right).top(1) == [("rent", 1600, 0)]
+
+
+def test_count_min_never_underestimates():
+    sketch, other = CountMinSketch(width=8, depth=3), CountMinSketch(width=8, depth=3)
+    truth = {f"m{n}": n + 1 for n in range(30)}
+    for item, count in truth.items():
+        sketch.add(item, count)
+    other.add("m0", 5)
+    sketch = CountMinSketch.from_dict(sketch.merge(other).to_dict())
+    truth["m0"] += 5
+    assert all(sketch.estimate(item) >= count for item, count in truth.items())
+    with pytest.raises(ValueError):
+        sketch.merge(CountMinSketch(width=4, depth=3))
+
+
+def test_top_merchants_and_merge():
+    january = UsageStats.from_transactions([{"amount": 5, "description": "Cafe Blue"}] * 3 +
+                                           [{"amount": 50, "description": "Grocer"}])
+    february = UsageStats.from_transactions([{"amount": 50, "description": "Grocer"}] * 2)
+    year = merge_usage_stats([january, february])
+    assert [value for value, _, _ in year.top("merchant", 2)] == ["cafe blue", "grocer"]
+    assert year.top("merchant", 1, by="spend")[0][:2] == ("grocer", 150.0)
+    assert year.most_used("location") == "Unknown"
+    assert year.frequency("merchant", "grocer") >= 3 and year.spend_at("merchant", "grocer") >= 150
+    assert UsageStats.from_dict(year.to_dict()).top("merchant", 2, by="spend") == year.top("merchant", 2, by="spend")
+
+
+def test_edit_keeping_count_and_total_is_seen(db, user_id, categories):
+    food = categories["Food & Dining"]
+    for name in ("Cafe Blue", "Cafe Blue", "Grocer"):
+        db.add_transaction(user_id, 'expense', 20, food, name, date(2025, 3, 4))
+    assert db.get_usage_stats(user_id, 2025, 3).most_used("merchant") == "cafe blue"
+
+    # Delete one Cafe Blue and add the same amount at a new merchant: the month's count and total stay the same
+    cafe = db.execute_query("SELECT MIN(id) FROM Transactions WHERE user_id = %s AND description = 'Cafe Blue'",
+                            (user_id,), fetch_results=True)[0][0]
+    assert db.delete_transaction(user_id, cafe)
+    db.add_transaction(user_id, 'expense', 20, food, 'Grocer', date(2025, 3, 9))
+    assert db.get_usage_stats(user_id, 2025, 3).most_used("merchant") == "grocer"
+    assert db.get_usage_stats(user_id, 2025).most_used("merchant") == "grocer"
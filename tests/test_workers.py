@@ -0,0 +1,72 @@
+import threading
+import time
+
+import pytest
+
+
+@pytest.fixture
+def runner(qapp):
+    from ui.workers import BackgroundRunner
+    runner = BackgroundRunner(max_threads=2)
+    yield runner
+    runner.shutdown()
+
+
+def wait_for(qapp, condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        qapp.processEvents()
+        time.sleep(0.005)
+    return condition()
+
+
+def test_callbacks_run_on_the_gui_thread(qapp, runner):
+    results, errors = [], []
+    runner.submit(lambda a, b: (a + b, threading.current_thread()), 2, b=3,
+                  on_done=lambda value: results.append((value, threading.current_thread())))
+    runner.submit(lambda: 1 / 0, on_error=errors.append)
+    assert wait_for(qapp, lambda: results and errors)
+    (total, worker), caller = results[0]
+    assert total == 5 and worker is not threading.main_thread() and caller is threading.main_thread()
+    assert "ZeroDivisionError" in errors[0]
+
+
+def test_cancelled_result_is_dropped(qapp, runner):
+    release, results = threading.Event(), []
+    token = runner.submit(release.wait, 5, on_done=results.append)
+    token.cancel()
+    release.set()
+    runner.pool.waitForDone(5000)
+    qapp.processEvents()
+    assert results == []
+
+
+def test_coalesced_burst_runs_once_with_the_last_call(qapp, runner):
+    calls, results, snapshots = [], [], []
+
+    def snapshot():
+        snapshots.append(1)
+        return "data"
+
+    def work(data, n):
+        calls.append(n)
+        return (data, n)
+
+    for n in range(5):
+        runner.submit_coalesced("insights", work, n, delay_ms=20, snapshot=snapshot, on_done=results.append)
+    assert wait_for(qapp, lambda: results)
+    assert calls == [4] and results == [("data", 4)] and snapshots == [1]
+
+    runner.submit_coalesced("insights", work, 9, delay_ms=20, on_done=results.append)
+    runner.cancel("insights")
+    assert not wait_for(qapp, lambda: calls != [4], timeout=0.1)
+
+
+def test_latency_histogram_buckets(qapp):
+    from ui.workers import LatencyHistogram
+    histogram = LatencyHistogram()
+    for ms in (5, 8, 20, 3000):
+        histogram.record(ms)
+    assert histogram.counts[0] == 1 and histogram.counts[1] == 1 and histogram.counts[2] == 1
+    assert histogram.counts[-1] == 1 and histogram.max_ms == 3000 and histogram.samples == 4
+    assert histogram.format().startswith("UI thread blocking: 4 samples, max 3000ms")
@@ -1,17 +1,31 @@
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QLabel, QCalendarWidget, QTabWidget, QPushButton,
     QHBoxLayout, QTableWidget, QTableWidgetItem, QLineEdit, QComboBox, QTextEdit,
-    QSpinBox, QDoubleSpinBox, QGroupBox, QMessageBox, QProgressBar, QFileDialog
+    QSpinBox, QDoubleSpinBox, QGroupBox, QMessageBox, QProgressBar, QFileDialog, QTableView
 )
 from PyQt5.QtCore import pyqtSignal, QDate
+from PyQt5.QtGui import QColor, QTextCharFormat
 import csv
-from utils.tags import extract_tags, suggest_tags, filter_transactions_by_tag
-from utils.heatmap import get_daily_spending, get_heat_color
+from datetime import date, timedelta
+from utils.tags import extract_tags, suggest_tags, filter_transactions_by_tag, TagIndex
+from utils.heatmap import HeatmapEngine
 from utils.bank_import import import_bank_csv
 from utils.backup import backup_to_local, restore_from_local
 from utils.ai_analysis import analyze_expenses, get_payment_method_stats
 from utils.recurring_detector import detect_recurring
-from utils.achievements import check_achievements
+from utils.achievements import check_achievements, AchievementTracker
+from models.transaction import Transaction
+from models.transaction_store import TransactionStore
+from utils.insights import spending_insights
+from ui.workers import BackgroundRunner
+from ui.transaction_model import TransactionTableModel, DeleteButtonDelegate, ListPager, ACTIONS_COLUMN
+
+def write_transactions_csv(filename, rows):
+    with open(filename, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Date", "Type", "Amount", "Category", "Notes"])
+        writer.writerows(rows)
+
 
 class WalletWhizMainWindow(QWidget):
     logout_requested = pyqtSignal()
@@ -21,11 +35,15 @@ class WalletWhizMainWindow(QWidget):
         self.user_id = user_id
         self.setWindowTitle("WalletWhiz Main")
         self.setFixedSize(900, 700)
-        self.transactions = []
+        # Running totals live in the store; panels react to its add/remove deltas
+        self.transactions = TransactionStore()
         self.budgets = {}
         self.lendings = []
         self.currency = "₹"
         self.theme = "Light"
+        # File I/O and analytics run here so they never block the event loop
+        self.runner = BackgroundRunner(self)
+        self.latest_insights = []
         main_layout = QVBoxLayout(self)
         main_layout.setSpacing(16)
         main_layout.setContentsMargins(18, 18, 18, 18)
@@ -62,7 +80,9 @@ class WalletWhizMainWindow(QWidget):
         self.dashboard_summary.setStyleSheet("font-size: 18px; font-weight: bold; color: #333;")
         dashboard_group_layout.addWidget(self.dashboard_summary)
         dashboard_group_layout.addWidget(QLabel("Pie/Bar Chart (Demo)"))
-        dashboard_group_layout.addWidget(QCalendarWidget())
+        self.heatmap_calendar = QCalendarWidget()
+        self.heatmap_calendar.currentPageChanged.connect(lambda year, month: self.refresh_heatmap())
+        dashboard_group_layout.addWidget(self.heatmap_calendar)
         dashboard_layout.addWidget(dashboard_group)
         self.tabs.addTab(dashboard_tab, "Dashboard")
 
@@ -102,11 +122,15 @@ class WalletWhizMainWindow(QWidget):
         table_group = QGroupBox("Transactions")
         table_group.setStyleSheet("QGroupBox { font-size: 15px; font-weight: bold; }")
         table_layout = QVBoxLayout(table_group)
-        self.transactions_table = QTableWidget(0, 6)
-        self.transactions_table.setHorizontalHeaderLabels(
-            ["Date", "Type", "Amount", "Category", "Notes", "Actions"]
-        )
-        self.transactions_table.setStyleSheet("QTableWidget { font-size: 13px; }")
+        # Rows are paged in lazily; add/delete only touch the affected row
+        self.transaction_pager = ListPager()
+        self.transaction_model = TransactionTableModel(self.transaction_pager.fetch_page)
+        self.transactions_table = QTableView()
+        self.transactions_table.setModel(self.transaction_model)
+        self.delete_delegate = DeleteButtonDelegate(self.transactions_table)
+        self.delete_delegate.delete_requested.connect(self.delete_transaction)
+        self.transactions_table.setItemDelegateForColumn(ACTIONS_COLUMN, self.delete_delegate)
+        self.transactions_table.setStyleSheet("QTableView { font-size: 13px; }")
         table_layout.addWidget(self.transactions_table)
         transactions_layout.addWidget(table_group)
         self.tabs.addTab(transactions_tab, "Transactions")
@@ -152,6 +176,18 @@ class WalletWhizMainWindow(QWidget):
         export_btn.setStyleSheet("QPushButton { background: #764ba2; color: white; border-radius: 8px; font-weight: bold; }")
         export_btn.clicked.connect(self.export_csv)
         reports_layout.addWidget(export_btn)
+        import_btn = QPushButton("Import Bank CSV")
+        import_btn.setStyleSheet("QPushButton { background: #764ba2; color: white; border-radius: 8px; font-weight: bold; }")
+        import_btn.clicked.connect(self.import_csv)
+        reports_layout.addWidget(import_btn)
+        backup_btn = QPushButton("Backup")
+        backup_btn.setStyleSheet("QPushButton { background: #007bff; color: white; border-radius: 8px; font-weight: bold; }")
+        backup_btn.clicked.connect(self.backup_data)
+        reports_layout.addWidget(backup_btn)
+        restore_btn = QPushButton("Restore")
+        restore_btn.setStyleSheet("QPushButton { background: #007bff; color: white; border-radius: 8px; font-weight: bold; }")
+        restore_btn.clicked.connect(self.restore_data)
+        reports_layout.addWidget(restore_btn)
         self.tabs.addTab(reports_tab, "Reports")
 
         # Settings Tab
@@ -234,48 +270,71 @@ class WalletWhizMainWindow(QWidget):
         self.tabs.addTab(insights_tab, "Insights")
 
         self.setLayout(main_layout)
+        # Daily expense totals for the calendar; subscribed first so refresh_heatmap sees each change
+        self.heatmap = HeatmapEngine()
+        self.heatmap.follow(self.transactions)
+        self.transactions.subscribe(self.on_transactions_changed)
+        # Tag autocomplete and filters read this instead of scanning the store
+        self.tag_index = TagIndex()
+        self.tag_index.follow(self.transactions)
+        self.achievement_tracker = AchievementTracker(self.transactions, self.show_achievements)
         self.refresh_dashboard()
         self.refresh_transactions()
         self.refresh_budget()
         self.refresh_lending()
+        self.refresh_heatmap()
 
     # Transactions
     def add_transaction(self):
-        t = {
-            "date": self.trans_date_widget.selectedDate().toString("yyyy-MM-dd"),
-            "type": self.trans_type.currentText(),
-            "amount": self.trans_amount.value(),
-            "category": self.trans_category.currentText(),
-            "notes": self.trans_notes.text()
-        }
-        tags = extract_tags(self.trans_notes.text())
-        t["tags"] = tags
-        self.transactions.append(t)
-        self.refresh_transactions()
+        notes = self.trans_notes.text()
+        self.transactions.add(Transaction(
+            self.trans_date_widget.selectedDate().toPyDate(),
+            self.trans_type.currentText(),
+            self.trans_amount.value(),
+            self.trans_category.currentText(),
+            notes,
+            extract_tags(notes)
+        ))
+
+    def on_transactions_changed(self, event, t, previous):
+        # One delta in, only the affected widgets repainted
+        if event == "add":
+            self.transaction_pager.add(t)
+            self.transaction_model.insert_record(t)
+        elif event == "remove":
+            self.transaction_pager.remove(t)
+            self.transaction_model.remove_record(t)
+        elif event == "update":
+            self.transaction_pager.remove(previous)
+            self.transaction_pager.add(t)
+            self.transaction_model.remove_record(previous)
+            self.transaction_model.insert_record(t)
+        else:
+            # clear, or a whole import/restore at once: rebuild the pager and reload the view once
+            if event != "extend":
+                self.transaction_pager.clear()
+            if event != "clear":
+                self.transaction_pager.extend(t)
+            self.refresh_transactions()
         self.refresh_dashboard()
-        self.refresh_budget()
+        budget_category = self.budget_category.currentText()
+        if event not in ("add", "remove", "update") or \
+                budget_category in (t["category"], previous and previous["category"]):
+            self.refresh_budget()
         self.refresh_heatmap()
-        self.refresh_achievements()
+        # Five quick edits -> one recompute on a worker thread
+        self.runner.submit_coalesced("insights", spending_insights, snapshot=lambda: list(self.transactions),
+                                     on_done=self.set_latest_insights)
+
+    def set_latest_insights(self, insights):
+        self.latest_insights = insights
 
     def refresh_transactions(self):
-        self.transactions_table.setRowCount(len(self.transactions))
-        for i, t in enumerate(self.transactions):
-            self.transactions_table.setItem(i, 0, QTableWidgetItem(t["date"]))
-            self.transactions_table.setItem(i, 1, QTableWidgetItem(t["type"]))
-            self.transactions_table.setItem(i, 2, QTableWidgetItem(str(t["amount"])))
-            self.transactions_table.setItem(i, 3, QTableWidgetItem(t["category"]))
-            self.transactions_table.setItem(i, 4, QTableWidgetItem(t["notes"]))
-            # Actions
-            delete_btn = QPushButton("Delete")
-            delete_btn.setStyleSheet("QPushButton { background: #F44336; color: white; border-radius: 8px; font-weight: bold; }")
-            delete_btn.clicked.connect(lambda _, row=i: self.delete_transaction(row))
-            self.transactions_table.setCellWidget(i, 5, delete_btn)
+        # Full reload; normal edits go through insert_record/remove_record instead
+        self.transaction_model.reset()
 
     def delete_transaction(self, row):
-        del self.transactions[row]
-        self.refresh_transactions()
-        self.refresh_dashboard()
-        self.refresh_budget()  # Ensure budget is updated after deletion
+        self.transactions.remove(self.transaction_model.record(row)["id"])
 
     # Budget
     def set_budget(self):
@@ -287,7 +346,7 @@ class WalletWhizMainWindow(QWidget):
     def refresh_budget(self):
         cat = self.budget_category.currentText()
         limit = self.budgets.get(cat, 0)
-        spent = sum(t["amount"] for t in self.transactions if t["category"] == cat and t["type"] == "Expense")
+        spent = self.transactions.category_total("Expense", cat)
         self.budget_bar.setMaximum(int(limit) if limit else 1)
         self.budget_bar.setValue(int(spent))
         if limit and spent > limit:
@@ -297,8 +356,8 @@ class WalletWhizMainWindow(QWidget):
 
     # Dashboard
     def refresh_dashboard(self):
-        income = sum(t["amount"] for t in self.transactions if t["type"] == "Income")
-        expense = sum(t["amount"] for t in self.transactions if t["type"] == "Expense")
+        income = self.transactions.total("Income")
+        expense = self.transactions.total("Expense")
         balance = income - expense
         self.dashboard_summary.setText(
             f"Total Income: {self.currency}{income} | Expenses: {self.currency}{expense} | Balance: {self.currency}{balance}"
@@ -308,12 +367,40 @@ class WalletWhizMainWindow(QWidget):
     def export_csv(self):
         filename, _ = QFileDialog.getSaveFileName(self, "Export CSV", "transactions.csv", "CSV Files (*.csv)")
         if filename:
-            with open(filename, "w", newline="", encoding="utf-8") as f:
-                writer = csv.writer(f)
-                writer.writerow(["Date", "Type", "Amount", "Category", "Notes"])
-                for t in self.transactions:
-                    writer.writerow([t["date"], t["type"], t["amount"], t["category"], t["notes"]])
-            QMessageBox.information(self, "Export", "CSV exported!")
+            rows = [[t["date"], t["type"], t["amount"], t["category"], t["notes"]] for t in self.transactions]
+            self.runner.submit(write_transactions_csv, filename, rows,
+                               on_done=lambda _: QMessageBox.information(self, "Export", "CSV exported!"),
+                               on_error=self.show_background_error)
+
+    def import_csv(self):
+        filename, _ = QFileDialog.getOpenFileName(self, "Import Bank CSV", "", "CSV Files (*.csv)")
+        if filename:
+            self.runner.submit(import_bank_csv, filename, on_done=self.add_imported_transactions,
+                               on_error=self.show_background_error)
+
+    def add_imported_transactions(self, transactions):
+        self.transactions.extend(transactions)
+        QMessageBox.information(self, "Import", f"Imported {len(transactions)} transactions.")
+
+    def backup_data(self):
+        filename, _ = QFileDialog.getSaveFileName(self, "Backup", "walletwhiz_backup.json", "JSON Files (*.json)")
+        if filename:
+            self.runner.submit(backup_to_local, list(self.transactions), filename,
+                               on_done=lambda _: QMessageBox.information(self, "Backup", "Backup saved!"),
+                               on_error=self.show_background_error)
+
+    def restore_data(self):
+        filename, _ = QFileDialog.getOpenFileName(self, "Restore", "", "JSON Files (*.json)")
+        if filename:
+            self.runner.submit(restore_from_local, filename, on_done=self.replace_transactions,
+                               on_error=self.show_background_error)
+
+    def replace_transactions(self, transactions):
+        self.transactions.replace(transactions)
+        QMessageBox.information(self, "Restore", f"Restored {len(transactions)} transactions.")
+
+    def show_background_error(self, error):
+        QMessageBox.critical(self, "Error", error)
 
     # Settings
     def change_currency(self, text):
@@ -330,12 +417,9 @@ class WalletWhizMainWindow(QWidget):
         QMessageBox.information(self, "Theme", f"Theme changed to {text}")
 
     def reset_data(self):
-        self.transactions.clear()
         self.budgets.clear()
         self.lendings.clear()
-        self.refresh_transactions()
-        self.refresh_dashboard()
-        self.refresh_budget()
+        self.transactions.clear()
         self.refresh_lending()
         QMessageBox.information(self, "Reset", "All data reset!")
 
@@ -365,26 +449,37 @@ class WalletWhizMainWindow(QWidget):
         if not self.transactions:
             self.insights_label.setText("No transactions yet.")
             return
-        food_expense = sum(t["amount"] for t in self.transactions if t["category"] == "Food" and t["type"] == "Expense")
-        rent_expense = sum(t["amount"] for t in self.transactions if t["category"] == "Rent" and t["type"] == "Expense")
+        food_expense = self.transactions.category_total("Expense", "Food")
+        rent_expense = self.transactions.category_total("Expense", "Rent")
         msg = f"You spent {self.currency}{food_expense} on Food, {self.currency}{rent_expense} on Rent."
-        self.insights_label.setText(msg)
+        self.insights_label.setText("\n".join([msg] + self.latest_insights))
 
     def handle_logout(self):
         reply = QMessageBox.question(self, "Logout", "Are you sure you want to logout?",
                                      QMessageBox.Yes | QMessageBox.No)
         if reply == QMessageBox.Yes:
+            self.runner.shutdown()
             self.close()
             self.logout_requested.emit()
 
     def refresh_heatmap(self):
-        # Stub for calendar heatmap update
-        # Implement actual heatmap logic here later
-        pass
+        # Color the shown page's days by their spending level, read from the heatmap's daily array
+        calendar = self.heatmap_calendar
+        calendar.setDateTextFormat(QDate(), QTextCharFormat())
+        first = date(calendar.yearShown(), calendar.monthShown(), 1)
+        # The page also shows the ends of the neighbouring months
+        days = self.heatmap.colors_between(first - timedelta(days=14), first + timedelta(days=45))
+        empty = self.heatmap.colors[0]
+        for day, color in days.items():
+            if color != empty:
+                text_format = QTextCharFormat()
+                text_format.setBackground(QColor(color))
+                calendar.setDateTextFormat(QDate(day.year, day.month, day.day), text_format)
 
     def refresh_achievements(self):
-        # Stub for achievements logic
-        # Implement actual achievements logic here later
         achievements = check_achievements(self.transactions)
         if achievements:
-            QMessageBox.information(self, "Achievements", "\n".join(achievements))
\ No newline at end of file
+            self.show_achievements(achievements)
+
+    def show_achievements(self, achievements):
+        QMessageBox.information(self, "Achievements", "\n".join(achievements))
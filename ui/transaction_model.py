@@ -0,0 +1,202 @@
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QEvent, QRectF, pyqtSignal
+from PyQt5.QtGui import QColor, QFont, QPainter
+from PyQt5.QtWidgets import QStyledItemDelegate
+
+from models.transaction import Transaction
+
+COLUMNS = ["Date", "Type", "Amount", "Category", "Notes", "Actions"]
+ACTIONS_COLUMN = 5
+
+
+def record_key(record):
+    """Sort key of a transaction record: (date, id), shown newest first"""
+    return (str(record["date"]), record["id"])
+
+
+def _desc_position(keys, key):
+    """Index of the first element of descending ``keys`` that sorts below ``key``"""
+    lo, hi = 0, len(keys)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if keys[mid] > key:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+class ListPager:
+    """In-memory page source, kept sorted by (date, id) descending"""
+
+    def __init__(self):
+        self._keys = []
+        self._records = []
+
+    def add(self, record):
+        key = record_key(record)
+        position = _desc_position(self._keys, key)
+        self._keys.insert(position, key)
+        self._records.insert(position, record)
+
+    def extend(self, records):
+        """Add many records with one sort instead of an insert each"""
+        pairs = list(zip(self._keys, self._records))
+        pairs.extend((record_key(record), record) for record in records)
+        pairs.sort(key=lambda pair: pair[0], reverse=True)
+        self._keys = [key for key, _ in pairs]
+        self._records = [record for _, record in pairs]
+
+    def remove(self, record):
+        position = _desc_position(self._keys, record_key(record))
+        if position < len(self._keys) and self._keys[position] == record_key(record):
+            del self._keys[position]
+            del self._records[position]
+
+    def clear(self):
+        self._keys.clear()
+        self._records.clear()
+
+    def fetch_page(self, after, limit):
+        start = _desc_position(self._keys, after) if after else 0
+        if after and start < len(self._keys) and self._keys[start] == after:
+            start += 1
+        return self._records[start:start + limit]
+
+
+class DBPager:
+    """Page source backed by DBManager.get_transactions keyset pagination"""
+
+    def __init__(self, db, user_id):
+        self.db = db
+        self.user_id = user_id
+
+    def fetch_page(self, after, limit):
+        rows = self.db.get_transactions(self.user_id, limit=limit, after=after)
+        return [Transaction(row[5], row[1].capitalize(), float(row[2]), row[3], row[6] or row[4] or "",
+                            id=row[0]) for row in rows]
+
+
+class TransactionTableModel(QAbstractTableModel):
+    """Transaction rows for a QTableView, paged in from fetch_page(after_key, limit) as it scrolls"""
+
+    def __init__(self, fetch_page, page_size=200, parent=None):
+        super().__init__(parent)
+        self._fetch_page = fetch_page
+        self.page_size = page_size
+        self._records = []
+        self._keys = []
+        self._exhausted = False
+
+    # Qt model API
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._records)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return COLUMNS[section]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+        record = self._records[index.row()]
+        column = index.column()
+        if column == 0:
+            return str(record["date"])
+        if column == 1:
+            return record["type"]
+        if column == 2:
+            return str(record["amount"])
+        if column == 3:
+            return record["category"]
+        if column == 4:
+            return record["notes"]
+        return "Delete"
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._exhausted:
+            return
+        after = self._keys[-1] if self._keys else None
+        page = self._fetch_page(after, self.page_size)
+        if len(page) < self.page_size:
+            self._exhausted = True
+        if not page:
+            return
+        first = len(self._records)
+        self.beginInsertRows(QModelIndex(), first, first + len(page) - 1)
+        self._records.extend(page)
+        self._keys.extend(record_key(record) for record in page)
+        self.endInsertRows()
+
+    # Incremental updates
+    def record(self, row):
+        return self._records[row]
+
+    def insert_record(self, record):
+        """Show a newly added record if it falls inside the loaded range"""
+        key = record_key(record)
+        position = _desc_position(self._keys, key)
+        if position == len(self._keys) and not self._exhausted:
+            return  # Older than everything loaded; fetchMore will bring it in
+        self.beginInsertRows(QModelIndex(), position, position)
+        self._records.insert(position, record)
+        self._keys.insert(position, key)
+        self.endInsertRows()
+
+    def remove_record(self, record):
+        """Drop one record's row, if loaded"""
+        key = record_key(record)
+        position = _desc_position(self._keys, key)
+        if position >= len(self._keys) or self._keys[position] != key:
+            return
+        self.beginRemoveRows(QModelIndex(), position, position)
+        del self._records[position]
+        del self._keys[position]
+        self.endRemoveRows()
+
+    def update_record(self, record):
+        """Repaint one record's row after its fields changed"""
+        position = _desc_position(self._keys, record_key(record))
+        if position < len(self._keys) and self._keys[position] == record_key(record):
+            self._records[position] = record
+            self.dataChanged.emit(self.index(position, 0), self.index(position, len(COLUMNS) - 1))
+
+    def reset(self):
+        """Forget loaded rows and start paging again from the newest"""
+        self.beginResetModel()
+        self._records.clear()
+        self._keys.clear()
+        self._exhausted = False
+        self.endResetModel()
+
+
+class DeleteButtonDelegate(QStyledItemDelegate):
+    """Paints a 'Delete' button in a cell and reports clicks, instead of a QPushButton per row"""
+
+    delete_requested = pyqtSignal(int)
+
+    def paint(self, painter, option, index):
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+        rect = QRectF(option.rect.adjusted(4, 3, -4, -3))
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(QColor("#F44336"))
+        painter.drawRoundedRect(rect, 8, 8)
+        font = QFont(option.font)
+        font.setBold(True)
+        painter.setFont(font)
+        painter.setPen(QColor("white"))
+        painter.drawText(rect, Qt.AlignCenter, index.data())
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton:
+            self.delete_requested.emit(index.row())
+            return True
+        return super().editorEvent(event, model, option, index)
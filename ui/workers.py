@@ -0,0 +1,190 @@
+import threading
+import time
+import traceback
+from bisect import bisect_right
+from contextlib import contextmanager
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, QTimer, QElapsedTimer, pyqtSignal, pyqtSlot
+
+
+class CancelToken:
+    """Shared flag a task can poll to stop early; results of cancelled tasks are dropped"""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+
+class _Task(QRunnable):
+    def __init__(self, runner, token, fn, args, kwargs, on_done, on_error):
+        super().__init__()
+        self.runner = runner
+        self.token = token
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.on_done = on_done
+        self.on_error = on_error
+
+    def run(self):
+        if self.token.cancelled:
+            return
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except Exception:
+            if not self.token.cancelled:
+                self.runner._deliver_signal.emit(self.token, self.on_error, traceback.format_exc())
+        else:
+            if not self.token.cancelled:
+                self.runner._deliver_signal.emit(self.token, self.on_done, result)
+
+
+class BackgroundRunner(QObject):
+    """Runs database and analytics calls on a QThreadPool; on_done/on_error run on the GUI thread"""
+
+    _deliver_signal = pyqtSignal(object, object, object)
+
+    def __init__(self, parent=None, max_threads=None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        if max_threads:
+            self.pool.setMaxThreadCount(max_threads)
+        self._pending = {}    # key -> (QTimer, call)
+        self._in_flight = {}  # key -> CancelToken
+        self._deliver_signal.connect(self._deliver)
+
+    def submit(self, fn, *args, on_done=None, on_error=None, **kwargs):
+        """Run fn(*args, **kwargs) in the pool; returns a CancelToken"""
+        token = CancelToken()
+        self.pool.start(_Task(self, token, fn, args, kwargs, on_done, on_error))
+        return token
+
+    def submit_coalesced(self, key, fn, *args, delay_ms=250, snapshot=None, on_done=None, on_error=None,
+                         **kwargs):
+        """Like submit, but only the last of rapid calls with the same key runs.
+
+        snapshot() runs on the GUI thread when the timer fires and is passed to fn first.
+        """
+        call = (fn, args, kwargs, snapshot, on_done, on_error)
+        pending = self._pending.get(key)
+        if pending:
+            timer = pending[0]
+        else:
+            timer = QTimer(self)
+            timer.setSingleShot(True)
+            timer.timeout.connect(lambda: self._fire(key))
+        self._pending[key] = (timer, call)
+        timer.start(delay_ms)
+
+    def cancel(self, key):
+        pending = self._pending.pop(key, None)
+        if pending:
+            pending[0].stop()
+            pending[0].deleteLater()
+        token = self._in_flight.pop(key, None)
+        if token:
+            token.cancel()
+
+    def shutdown(self, wait_ms=3000):
+        """Cancel queued work and wait briefly for running tasks"""
+        for key in list(self._pending) + list(self._in_flight):
+            self.cancel(key)
+        self.pool.clear()
+        self.pool.waitForDone(wait_ms)
+
+    def _fire(self, key):
+        timer, (fn, args, kwargs, snapshot, on_done, on_error) = self._pending.pop(key)
+        timer.deleteLater()
+        if snapshot:
+            args = (snapshot(),) + args
+        previous = self._in_flight.pop(key, None)
+        if previous:
+            previous.cancel()
+
+        def finish(callback):
+            def wrapped(value):
+                if self._in_flight.get(key) is token:
+                    del self._in_flight[key]
+                if callback:
+                    callback(value)
+            return wrapped
+
+        token = self.submit(fn, *args, on_done=finish(on_done), on_error=finish(on_error), **kwargs)
+        self._in_flight[key] = token
+
+    @pyqtSlot(object, object, object)
+    def _deliver(self, token, callback, value):
+        if callback and not token.cancelled:
+            callback(value)
+
+
+class LatencyHistogram:
+    """Counts durations (ms) into fixed buckets"""
+
+    BOUNDS_MS = (8, 16, 33, 50, 100, 250, 500, 1000, 2000)
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BOUNDS_MS) + 1)
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.samples = 0
+
+    def record(self, ms):
+        self.counts[bisect_right(self.BOUNDS_MS, ms)] += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        self.samples += 1
+
+    def format(self, title="UI thread blocking"):
+        lines = [f"{title}: {self.samples} samples, max {self.max_ms:.0f}ms, total {self.total_ms:.0f}ms"]
+        lower = 0
+        for bound, count in zip(self.BOUNDS_MS + (None,), self.counts):
+            label = f"{lower:>5}-{bound}ms" if bound else f"{lower:>5}ms+"
+            lines.append(f"  {label:<12} {count:>7} {'#' * min(count, 60)}")
+            lower = bound
+        return "\n".join(lines)
+
+
+class UIBlockingMonitor(QObject):
+    """Records how late a heartbeat timer fires, i.e. how long the GUI event loop was blocked"""
+
+    def __init__(self, interval_ms=20, threshold_ms=8, parent=None):
+        super().__init__(parent)
+        self.interval_ms = interval_ms
+        self.threshold_ms = threshold_ms
+        self.histogram = LatencyHistogram()
+        self.measured = {}
+        self._clock = QElapsedTimer()
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self._tick)
+
+    def start(self):
+        self._clock.start()
+        self._timer.start(self.interval_ms)
+
+    def stop(self):
+        self._timer.stop()
+
+    def _tick(self):
+        overshoot = self._clock.restart() - self.interval_ms
+        if overshoot >= self.threshold_ms:
+            self.histogram.record(overshoot)
+
+    @contextmanager
+    def measure(self, label):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.measured.setdefault(label, LatencyHistogram()).record((time.perf_counter() - started) * 1000)
+
+    def dump(self):
+        print(self.histogram.format())
+        for label, histogram in sorted(self.measured.items()):
+            print(histogram.format(f"UI call '{label}'"))
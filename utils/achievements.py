@@ -1,8 +1,36 @@
+from utils.analytics import to_columns
+
+
 def check_achievements(transactions):
     achievements = []
-    savings = sum(t["amount"] for t in transactions if t["type"] == "Income") - \
-              sum(t["amount"] for t in transactions if t["type"] == "Expense")
+    # A TransactionStore keeps running totals; anything else is summed column-wise
+    totals = getattr(transactions, "type_totals", None)
+    if not isinstance(totals, dict):
+        totals = to_columns(transactions).type_totals()
+    savings = totals.get("Income", 0) - totals.get("Expense", 0)
     if savings >= 5000:
         achievements.append("🏅 Saved ₹5000 in one month!")
     # Add more rules
     return achievements
+
+
+class AchievementTracker:
+    """Re-checks achievements on every TransactionStore change and reports only new ones"""
+
+    def __init__(self, store, on_unlocked):
+        self.store = store
+        self.on_unlocked = on_unlocked
+        self.unlocked = set()
+        store.subscribe(self._on_change)
+
+    def _on_change(self, event, record, previous):
+        if event in ("clear", "reset"):
+            self.unlocked.clear()
+        if event == "clear":
+            return
+        current = check_achievements(self.store)
+        new = [a for a in current if a not in self.unlocked]
+        # Achievements that no longer hold can be earned again later
+        self.unlocked = set(current)
+        if new:
+            self.on_unlocked(new)
@@ -1,13 +1,22 @@
-def analyze_expenses(transactions, query):
-    # Stub: Use NLP to parse query and filter transactions
-    # Example: "How much did I spend on travel in June?"
-    # Return dummy result for now
-    return "Spent ₹1200 on travel in June."
+from datetime import date
+
+from utils.query_engine import QueryEngine, build_plan, describe, parse_question, run_in_memory
+from utils.usage_stats import UNKNOWN, UsageStats
+
+
+def analyze_expenses(transactions, query, db=None, user_id=None, currency="₹"):
+    # Answer a question such as "How much did I spend on travel in June?"
+    # With a db the question runs as an aggregate query (see utils/query_engine.py);
+    # otherwise the same plan is evaluated over the transaction records
+    if db is not None:
+        return QueryEngine(db, user_id, currency).ask(query)["answer"]
+    try:
+        plan = build_plan(parse_question(query), {t["category"] for t in transactions}, date.today(), "memory")
+    except ValueError as e:
+        return f"Sorry, {e}."
+    value, rows = run_in_memory(plan, transactions)
+    return describe(plan, value, rows, currency)
 
 def get_payment_method_stats(transactions):
-    # Example: Most used payment method
-    methods = {}
-    for t in transactions:
-        method = t.get("payment_method", "Unknown")
-        methods[method] = methods.get(method, 0) + 1
-    return max(methods, key=methods.get)
+    # Most used payment method; see utils/usage_stats.py for merchants, locations and spend
+    return UsageStats.from_transactions(transactions).most_used("payment_method") or UNKNOWN
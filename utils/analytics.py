@@ -0,0 +1,149 @@
+from array import array
+from datetime import date, datetime
+
+from models.transaction import TransactionArray, iso_date
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+
+def _to_ordinal(value):
+    if isinstance(value, datetime):
+        return value.date().toordinal()
+    if isinstance(value, date):
+        return value.toordinal()
+    return date.fromisoformat(str(value)[:10]).toordinal()
+
+
+def _encode(values):
+    """(distinct values in first-seen order, code of every value)"""
+    index = {}
+    codes = [index.setdefault(value, len(index)) for value in values]
+    return list(index), codes
+
+
+class TransactionColumns:
+    """Column-wise copy of transaction records (paise amounts, coded categories/types/dates) for grouped sums"""
+
+    def __init__(self, transactions):
+        if isinstance(transactions, TransactionArray):
+            # Already columnar; only the dates need codes
+            self.categories, categories = list(transactions.categories), transactions.category_codes
+            self.types, types = list(transactions.types), transactions.type_codes
+            day_ordinals, days = _encode(transactions.days)
+            self.day_keys = [iso_date(day) for day in day_ordinals]
+            amounts = transactions.amounts
+        else:
+            if not isinstance(transactions, (list, tuple)):
+                transactions = list(transactions)
+            self.categories, categories = _encode([t["category"] for t in transactions])
+            self.types, types = _encode([t["type"] for t in transactions])
+            self.day_keys, days = _encode([t["date"] for t in transactions])
+            day_ordinals = []
+            for key in self.day_keys:
+                try:
+                    day_ordinals.append(_to_ordinal(key))
+                except ValueError:
+                    day_ordinals.append(-len(day_ordinals) - 1)  # Unparseable dates still group by value
+            amounts = [round(t["amount"] * 100) for t in transactions]
+
+        if NUMPY_AVAILABLE:
+            self.amounts = np.array(amounts, dtype=np.int64)
+            self.category_codes = np.array(categories, dtype=np.int32)
+            self.type_codes = np.array(types, dtype=np.int32)
+            self.day_codes = np.array(days, dtype=np.int32)
+            self.day_ordinals = np.array(day_ordinals, dtype=np.int32)
+        else:
+            self.amounts = array("q", amounts)
+            self.category_codes = array("i", categories)
+            self.type_codes = array("b", types)
+            self.day_codes = array("i", days)
+            self.day_ordinals = array("i", day_ordinals)
+
+    def __len__(self):
+        return len(self.amounts)
+
+    @property
+    def days(self):
+        """Day ordinal of every row"""
+        if NUMPY_AVAILABLE:
+            return self.day_ordinals[self.day_codes]
+        return array("i", (self.day_ordinals[code] for code in self.day_codes))
+
+    def _group_paise(self, codes, size, transaction_type=None):
+        """Sum amounts (paise) per code, optionally only rows of one type"""
+        type_code = None
+        if transaction_type is not None:
+            if transaction_type not in self.types:
+                return [0] * size
+            type_code = self.types.index(transaction_type)
+
+        if NUMPY_AVAILABLE:
+            weights = self.amounts
+            if type_code is not None:
+                weights = np.where(self.type_codes == type_code, weights, 0)
+            # float64 is exact for paise totals below 2**53
+            return np.rint(np.bincount(codes, weights=weights, minlength=size)).astype(np.int64).tolist()
+
+        totals = [0] * size
+        if type_code is None:
+            for code, amount in zip(codes, self.amounts):
+                totals[code] += amount
+        else:
+            for code, row_type, amount in zip(codes, self.type_codes, self.amounts):
+                if row_type == type_code:
+                    totals[code] += amount
+        return totals
+
+    def type_totals(self):
+        """{type: total}"""
+        totals = self._group_paise(self.type_codes, len(self.types))
+        return {name: paise / 100 for name, paise in zip(self.types, totals)}
+
+    def category_totals(self, transaction_type=None):
+        """{category: total} over all rows, or only rows of transaction_type"""
+        totals = self._group_paise(self.category_codes, len(self.categories), transaction_type)
+        return {name: paise / 100 for name, paise in zip(self.categories, totals)}
+
+    def daily_totals(self, transaction_type=None):
+        """{date value: total} for every date present, 0 on dates with no matching rows"""
+        totals = self._group_paise(self.day_codes, len(self.day_keys), transaction_type)
+        return {key: paise / 100 for key, paise in zip(self.day_keys, totals)}
+
+    def monthly_totals(self, transaction_type=None):
+        """({category: [total per month, first to last month present]}, first (year, month)); bad dates skipped"""
+        months = []
+        for ordinal in self.day_ordinals:
+            if ordinal > 0:
+                day = date.fromordinal(ordinal)
+                months.append(day.year * 12 + day.month - 1)
+            else:
+                months.append(None)
+        present = [month for month in months if month is not None]
+        if not present:
+            return {}, None
+        first = min(present)
+        span = max(present) - first + 1
+        size = len(self.categories) * span
+        # Codes are category * span + month offset; rows without a month go to the extra bucket `size`
+        month_of_day = [size if month is None else month - first for month in months]
+        if NUMPY_AVAILABLE:
+            row_months = np.array(month_of_day, dtype=np.int64)[self.day_codes]
+            codes = np.where(row_months == size, size, self.category_codes.astype(np.int64) * span + row_months)
+        else:
+            codes = [size if month_of_day[day] == size else category * span + month_of_day[day]
+                     for category, day in zip(self.category_codes, self.day_codes)]
+        totals = self._group_paise(codes, size + 1, transaction_type)
+        series = {name: [paise / 100 for paise in totals[code * span:(code + 1) * span]]
+                  for code, name in enumerate(self.categories)}
+        return series, (first // 12, first % 12 + 1)
+
+
+def to_columns(transactions):
+    """Return transactions as TransactionColumns, building them if needed"""
+    if isinstance(transactions, TransactionColumns):
+        return transactions
+    return TransactionColumns(transactions)
@@ -0,0 +1,95 @@
+"""Online anomaly scoring: EWMA mean and variance of log(1 + amount) per (user, category)"""
+import math
+
+DEFAULT_ALPHA = 0.05       # weight of the newest observation
+DEFAULT_THRESHOLD = 3.0    # z-score above which an amount is reported
+DEFAULT_WARMUP = 8         # observations needed before a key is scored
+
+
+class EwmaState:
+    __slots__ = ("mean", "variance", "count")
+
+    def __init__(self, mean=0.0, variance=0.0, count=0):
+        self.mean = mean
+        self.variance = variance
+        self.count = count
+
+    def zscore(self, value):
+        if self.count < 2:
+            return 0.0
+        # Floor keeps near-constant series (e.g. a fixed subscription) from flagging tiny changes
+        spread = math.sqrt(max(self.variance, 0.01))
+        return (value - self.mean) / spread
+
+    def update(self, value, alpha):
+        if self.count == 0:
+            self.mean = value
+        else:
+            # Plain averages while warming up, so early values are not underweighted
+            weight = max(alpha, 1.0 / (self.count + 1))
+            delta = value - self.mean
+            self.mean += weight * delta
+            self.variance = (1 - weight) * (self.variance + weight * delta * delta)
+        self.count += 1
+
+
+class AnomalyDetector:
+    """EWMA z-scores per key; observe() scores an amount and then learns from it"""
+
+    def __init__(self, alpha=DEFAULT_ALPHA, threshold=DEFAULT_THRESHOLD, warmup=DEFAULT_WARMUP):
+        self.alpha = alpha
+        self.threshold = threshold
+        self.warmup = warmup
+        self.states = {}
+        self.dirty = set()
+
+    def load(self, key, mean, variance, count):
+        self.states[key] = EwmaState(float(mean), float(variance), int(count))
+
+    def score(self, key, amount):
+        """z-score of amount for key without learning from it (None while warming up)"""
+        state = self.states.get(key)
+        if state is None or state.count < self.warmup:
+            return None
+        return state.zscore(math.log1p(max(amount, 0.0)))
+
+    def observe(self, key, amount):
+        """Score amount, fold it into the key's statistics and return (zscore, is_anomaly)"""
+        value = math.log1p(max(amount, 0.0))
+        state = self.states.get(key)
+        if state is None:
+            state = self.states[key] = EwmaState()
+        z = state.zscore(value) if state.count >= self.warmup else None
+        state.update(value, self.alpha)
+        self.dirty.add(key)
+        return z, z is not None and z >= self.threshold
+
+    def typical(self, key):
+        """Typical amount for key (geometric-mean-like), or None"""
+        state = self.states.get(key)
+        return math.expm1(state.mean) if state and state.count else None
+
+    def take_dirty(self):
+        """[(key, EwmaState)] changed since the last call, for persisting"""
+        changed = [(key, self.states[key]) for key in self.dirty]
+        self.dirty = set()
+        return changed
+
+    def forget(self, predicate=None):
+        if predicate is None:
+            self.states.clear()
+            self.dirty.clear()
+        else:
+            for key in [key for key in self.states if predicate(key)]:
+                del self.states[key]
+                self.dirty.discard(key)
+
+
+def series_zscore(history, current, alpha=0.3):
+    """z-score of ``current`` against EWMA statistics of ``history`` (monthly totals, log scale)"""
+    state = EwmaState()
+    for value in history:
+        state.update(math.log1p(max(value, 0.0)), alpha)
+    if state.count < 3:
+        return None
+    return state.zscore(math.log1p(max(current, 0.0)))
@@ -1,19 +1,434 @@
-import sqlite3
+"""Transaction backups: JSON files for the UI, and full/incremental gzipped NDJSON snapshots with a manifest"""
+import gzip
+import hashlib
 import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from datetime import date, datetime
+from decimal import Decimal
+
+from models.transaction import Transaction
+
+try:
+    from config import BACKUP_CONFIG
+except ImportError:
+    BACKUP_CONFIG = {}
+
+FORMAT_VERSION = 1
+INTERVALS = {"hourly": 3600, "daily": 86400, "weekly": 7 * 86400}
+RETRY_SECONDS = 60   # first wait after a failed backup; doubles per failure up to the interval
+# Copied whole into every snapshot; Transactions is the only table copied incrementally
+REFERENCE_TABLES = ("Categories", "CategoryRules", "Budgets", "SavingsGoals", "TransactionTemplates",
+                    "RecurringSchedules")
+SNAPSHOT_TABLES = REFERENCE_TABLES + ("Transactions",)
+# Columns left out of content digests: ids are reassigned on restore, timestamps are not data
+DIGEST_EXCLUDED = ("id", "user_id", "created_at", "updated_at")
+_GZIP_MAGIC = b"\x1f\x8b"
+
+
+def _json_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode("utf-8", "replace")
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def _open_text(filename):
+    """Open a backup file for reading, gzip-compressed or not"""
+    with open(filename, "rb") as f:
+        compressed = f.read(2) == _GZIP_MAGIC
+    if compressed:
+        return gzip.open(filename, "rt", encoding="utf-8")
+    return open(filename, "r", encoding="utf-8")
+
+
+def _iter_json_array(f, chunk_size=1 << 16):
+    """Yield the elements of a top-level JSON array without loading the whole file"""
+    decoder = json.JSONDecoder()
+    buffer = f.read(chunk_size).lstrip()
+    if not buffer.startswith("["):
+        raise ValueError("Not a JSON array")
+    buffer = buffer[1:]
+    while True:
+        buffer = buffer.lstrip().lstrip(",").lstrip()
+        if buffer.startswith("]"):
+            return
+        try:
+            value, end = decoder.raw_decode(buffer)
+        except json.JSONDecodeError:
+            more = f.read(chunk_size)
+            if not more:
+                raise
+            buffer += more
+            continue
+        yield value
+        buffer = buffer[end:]
+        if len(buffer) < chunk_size:
+            buffer += f.read(chunk_size)
+
+
+def iter_backup(filename):
+    """Stream Transactions from a backup_to_local file (NDJSON, optionally gzipped, or a legacy JSON array)"""
+    with _open_text(filename) as f:
+        legacy = f.read(64).lstrip().startswith("[")
+        f.seek(0)
+        records = _iter_json_array(f) if legacy else (json.loads(line) for line in f if line.strip())
+        for record in records:
+            yield Transaction.from_dict(record)
+
 
 def backup_to_local(transactions, filename):
-    with open(filename, "w", encoding="utf-8") as f:
-        json.dump(transactions, f, indent=2)
+    """Write transactions one JSON object per line (gzip-compressed if filename ends in .gz)"""
+    opener = gzip.open if filename.endswith(".gz") else open
+    with opener(filename, "wt", encoding="utf-8") as f:
+        for t in transactions:
+            f.write(json.dumps(Transaction.from_dict(t).to_dict(), default=_json_value) + "\n")
 
 def restore_from_local(filename):
-    with open(filename, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return list(iter_backup(filename))
+
+
+_DIGEST_ENCODER = json.JSONEncoder(default=_json_value, separators=(",", ":"))
+_digest_fields = {}   # column names of a row -> the sorted ones that are digested
+
+
+def row_hash(row):
+    """64-bit hash of a row's digested columns, as summed by ContentDigest"""
+    keys = tuple(row)
+    fields = _digest_fields.get(keys)
+    if fields is None:
+        fields = _digest_fields[keys] = sorted(key for key in keys
+                                               if key not in DIGEST_EXCLUDED and not key.endswith("_id"))
+    canonical = _DIGEST_ENCODER.encode([int(value) if isinstance(value, bool) else value
+                                        for value in map(row.__getitem__, fields)])
+    return int.from_bytes(hashlib.sha256(canonical.encode()).digest()[:8], "big")
+
+
+def _version_hash(row):
+    """Short hash of every column but updated_at, telling two versions of a row apart"""
+    canonical = json.dumps({key: value for key, value in row.items() if key != "updated_at"},
+                           default=_json_value, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()[:16]
+
+
+class ContentDigest:
+    """Order-independent checksum of table rows (sum of per-row hashes mod 2**64)"""
+
+    def __init__(self):
+        self.total = 0
+        self.rows = 0
+
+    def add(self, row):
+        self.add_hash(row_hash(row))
+
+    def add_hash(self, value):
+        self.total = (self.total + value) % 2 ** 64
+        self.rows += 1
+
+    def hexdigest(self):
+        return f"{self.total:016x}"
+
+
+class LocalDirectoryTarget:
+    """Backup target in a local directory; stands in for a cloud bucket with the same methods"""
+
+    def __init__(self, path="backups"):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def _path(self, name):
+        return os.path.join(self.path, name)
+
+    def put(self, name, source_path):
+        """Upload a finished local file as name (atomically replaces an existing object)"""
+        partial = self._path(name + ".partial")
+        shutil.copyfile(source_path, partial)
+        os.replace(partial, self._path(name))
+
+    def put_bytes(self, name, data):
+        partial = self._path(name + ".partial")
+        with open(partial, "wb") as f:
+            f.write(data)
+        os.replace(partial, self._path(name))
+
+    def get_bytes(self, name):
+        """Object contents, or None if it does not exist"""
+        try:
+            with open(self._path(name), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def open(self, name):
+        """Binary file object for reading an object"""
+        return open(self._path(name), "rb")
+
+    def delete(self, name):
+        try:
+            os.remove(self._path(name))
+        except FileNotFoundError:
+            pass
+
+
+# Backup providers by name; register others (e.g. a cloud bucket client) here
+BACKUP_TARGETS = {
+    "local": LocalDirectoryTarget,
+}
+
+
+def get_target(provider=None, **options):
+    provider = provider or BACKUP_CONFIG.get("target", "local")
+    if provider not in BACKUP_TARGETS:
+        raise ValueError(f"Unknown backup target: {provider}")
+    if provider == "local":
+        options.setdefault("path", BACKUP_CONFIG.get("path", "backups"))
+    return BACKUP_TARGETS[provider](**options)
+
+
+class _HashingWriter:
+    """Binary file wrapper that SHA-256s everything written through it"""
+
+    def __init__(self, f):
+        self.f = f
+        self.sha256 = hashlib.sha256()
+
+    def write(self, data):
+        self.sha256.update(data)
+        return self.f.write(data)
+
+    def flush(self):
+        self.f.flush()
+
+
+class BackupEngine:
+    """Writes full and incremental snapshots of one user's data to a target"""
+
+    def __init__(self, db, user_id, target=None, full_every=None, keep_full=None, fetch_size=5000):
+        self.db = db
+        self.user_id = user_id
+        self.target = target or get_target()
+        self.full_every = full_every or BACKUP_CONFIG.get("full_every", 7)
+        self.keep_full = keep_full or BACKUP_CONFIG.get("keep_full", 2)
+        self.fetch_size = fetch_size
+
+    @property
+    def manifest_name(self):
+        return f"user{self.user_id}-manifest.json"
+
+    def load_manifest(self):
+        data = self.target.get_bytes(self.manifest_name)
+        if data is None:
+            return {"format": FORMAT_VERSION, "user_id": self.user_id, "snapshots": []}
+        return json.loads(data)
+
+    def _save_manifest(self, manifest):
+        self.target.put_bytes(self.manifest_name, json.dumps(manifest, indent=1).encode("utf-8"))
+
+    def run(self, full=None):
+        """Write one snapshot (full when due, or when full=True) and return its manifest entry"""
+        manifest = self.load_manifest()
+        snapshots = manifest["snapshots"]
+        since_full = 0
+        for entry in reversed(snapshots):
+            if entry["kind"] == "full":
+                break
+            since_full += 1
+        if full is None:
+            full = not snapshots or since_full >= self.full_every - 1
+        watermark = None if full else snapshots[-1]["watermark"]
+        boundary = {} if full else snapshots[-1].get("boundary", {})
+
+        created = datetime.now()
+        kind = "full" if full else "incremental"
+        name = f"user{self.user_id}-{created:%Y%m%dT%H%M%S%f}-{kind}.ndjson.gz"
+        fd, temp_path = tempfile.mkstemp(suffix=".ndjson.gz")
+        try:
+            with os.fdopen(fd, "wb") as raw:
+                hashing = _HashingWriter(raw)
+                with gzip.GzipFile(fileobj=hashing, mode="wb", mtime=0) as gz:
+                    tables, new_watermark, new_boundary = self._write_rows(gz, kind, created, watermark, boundary)
+            entry = {"file": name, "kind": kind, "created_at": created.isoformat(timespec="seconds"),
+                     "since": watermark, "watermark": new_watermark or watermark,
+                     "boundary": new_boundary,
+                     "sha256": hashing.sha256.hexdigest(), "bytes": os.path.getsize(temp_path),
+                     "tables": tables}
+            self.target.put(name, temp_path)
+        finally:
+            os.remove(temp_path)
+
+        # Only the newest entry's boundary is ever read
+        for previous in snapshots:
+            previous.pop("boundary", None)
+        snapshots.append(entry)
+        self._prune(snapshots)
+        self._save_manifest(manifest)
+        return entry
+
+    def _write_rows(self, out, kind, created, watermark, boundary):
+        """Write the rows; returns (tables, watermark, boundary) for the manifest entry"""
+        header = {"format": FORMAT_VERSION, "kind": kind, "user_id": self.user_id,
+                  "created_at": created.isoformat(timespec="seconds"), "since": watermark}
+        out.write((json.dumps(header) + "\n").encode("utf-8"))
+        tables = {}
+        new_watermark, new_boundary = watermark, dict(boundary)
+        # One read snapshot, so every table comes from the same point in time without blocking writers
+        with self.db.read_snapshot() as cursor:
+            for table in SNAPSHOT_TABLES:
+                query = f"SELECT * FROM {table} WHERE user_id = %s"
+                params = (self.user_id,)
+                if table == "Transactions" and watermark:
+                    # >= so rows updated later within the watermark's second are not missed;
+                    # the ones the previous snapshot already holds are skipped below
+                    query += " AND updated_at >= %s"
+                    params += (watermark,)
+                cursor.execute(query, params)
+                columns = [column[0] for column in cursor.description]
+                digest = ContentDigest()
+                while True:
+                    rows = cursor.fetchmany(self.fetch_size)
+                    if not rows:
+                        break
+                    lines = []
+                    for values in rows:
+                        row = dict(zip(columns, values))
+                        updated = row.get("updated_at")
+                        if updated is not None and table == "Transactions":
+                            updated = updated.isoformat(" ") if isinstance(updated, datetime) else str(updated)
+                            version = _version_hash(row)
+                            if new_watermark is None or updated > new_watermark:
+                                new_watermark, new_boundary = updated, {}
+                            if updated == new_watermark:
+                                new_boundary[str(row["id"])] = version
+                            if updated == watermark and boundary.get(str(row["id"])) == version:
+                                continue
+                        digest.add(row)
+                        lines.append(json.dumps({"table": table, "row": row}, default=_json_value,
+                                                separators=(",", ":")))
+                    if lines:
+                        out.write(("\n".join(lines) + "\n").encode("utf-8"))
+                tables[table] = {"rows": digest.rows, "digest": digest.hexdigest()}
+        return tables, new_watermark, new_boundary
+
+    def _prune(self, snapshots):
+        """Delete snapshots older than the keep_full most recent full ones"""
+        fulls = [index for index, entry in enumerate(snapshots) if entry["kind"] == "full"]
+        if len(fulls) <= self.keep_full:
+            return
+        cutoff = fulls[-self.keep_full]
+        for entry in snapshots[:cutoff]:
+            self.target.delete(entry["file"])
+        del snapshots[:cutoff]
+
+    def restore_chain(self):
+        """Manifest entries needed to restore the latest state: the last full snapshot and what follows it"""
+        snapshots = self.load_manifest()["snapshots"]
+        for index in range(len(snapshots) - 1, -1, -1):
+            if snapshots[index]["kind"] == "full":
+                return snapshots[index:]
+        return []
+
+
+def iter_snapshot(target, entry):
+    """Stream (table, row) pairs from a snapshot, checking its SHA-256 once fully read"""
+    with target.open(entry["file"]) as raw:
+        hashing = _HashingReader(raw)
+        try:
+            with gzip.GzipFile(fileobj=hashing, mode="rb") as gz:
+                lines = iter(gz)
+                next(lines)   # header
+                for line in lines:
+                    record = json.loads(line)
+                    yield record["table"], record["row"]
+        except (OSError, EOFError, StopIteration, ValueError) as e:
+            raise ValueError(f"Corrupt snapshot {entry['file']}: {e}") from e
+        hashing.drain()
+    if hashing.sha256.hexdigest() != entry["sha256"]:
+        raise ValueError(f"Checksum mismatch in {entry['file']}")
+
+
+class _HashingReader:
+    def __init__(self, f):
+        self.f = f
+        self.sha256 = hashlib.sha256()
+
+    def read(self, size=-1):
+        data = self.f.read(size)
+        self.sha256.update(data)
+        return data
+
+    def drain(self):
+        while self.read(1 << 16):
+            pass
+
+
+def backup_to_cloud(db, user_id, provider=None, full=None, **options):
+    """Write one snapshot of a user's data to a named target (see BACKUP_TARGETS)"""
+    return BackupEngine(db, user_id, get_target(provider, **options)).run(full)
+
+
+class BackupScheduler(threading.Thread):
+    """Background thread backing up some users every interval, retrying failed runs with backoff"""
+
+    def __init__(self, db, user_ids, interval=None, target=None, full_every=None, retry=RETRY_SECONDS):
+        super().__init__(name="backup-scheduler", daemon=True)
+        interval = interval or BACKUP_CONFIG.get("interval", "daily")
+        self.interval = INTERVALS.get(interval, interval)
+        self.retry = retry
+        self.engines = [BackupEngine(db, user_id, target, full_every) for user_id in user_ids]
+        self._stopped = threading.Event()
+        self.runs = 0
+        self.failures = 0   # consecutive runs with at least one failed user
+
+    def _seconds_until_due(self):
+        """Time until the user with the oldest newest snapshot is due"""
+        oldest = None
+        for engine in self.engines:
+            snapshots = engine.load_manifest()["snapshots"]
+            if not snapshots:
+                return 0
+            created = datetime.fromisoformat(snapshots[-1]["created_at"])
+            oldest = created if oldest is None or created < oldest else oldest
+        if oldest is None:
+            return self.interval
+        return max(0.0, self.interval - (datetime.now() - oldest).total_seconds())
+
+    def run(self):
+        delay = self._seconds_until_due()
+        while not self._stopped.wait(delay):
+            started = time.perf_counter()
+            failed = False
+            for engine in self.engines:
+                try:
+                    engine.run()
+                except Exception as e:
+                    failed = True
+                    print(f"Backup failed for user {engine.user_id}: {e}")
+            self.runs += 1
+            print(f"Backup of {len(self.engines)} user(s) took {time.perf_counter() - started:.1f}s")
+            # A failed run leaves the manifests as they were, so they would say it is still due
+            self.failures = self.failures + 1 if failed else 0
+            delay = min(self.interval, self.retry * 2 ** (self.failures - 1)) if failed else self.interval
+
+    def stop(self):
+        self._stopped.set()
 
-# Cloud backup stubs
-def backup_to_cloud(transactions, provider="gdrive"):
-    # Integrate with provider API (stub)
-    pass
 
-def schedule_backup(interval="daily"):
-    # Use OS scheduler or background thread (stub)
-    pass
+def schedule_backup(interval=None, db=None, user_ids=None, target=None, full_every=None):
+    """Start a BackupScheduler (every user by default); returns None if the database is unreachable"""
+    if db is None:
+        from database.db_manager import DBManager
+        db = DBManager()
+        if not db.connect():
+            print("Backups not scheduled: could not connect to the database")
+            return None
+    if user_ids is None:
+        user_ids = [row[0] for row in db.execute_query("SELECT id FROM Users", fetch_results=True) or []]
+    scheduler = BackupScheduler(db, user_ids, interval, target, full_every)
+    scheduler.start()
+    return scheduler
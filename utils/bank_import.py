@@ -1,23 +1,137 @@
 import csv
+import io
+import os
+from datetime import datetime
 
-def import_bank_csv(filename, mapping_rules=None):
+from models.transaction import Transaction
+from utils.categorizer import KeywordMatcher
+
+# Column layouts of supported statement exports. A profile either has a single
+# "amount" column (with an optional "type" column) or separate "debit"/"credit"
+# columns. "date_format" is the strptime format of the date column; dates are
+# normalized to YYYY-MM-DD.
+BANK_PROFILES = {
+    "default": {"date": "Date", "description": "Description", "amount": "Amount", "type": "Type",
+                "date_format": "%Y-%m-%d"},
+    "walletwhiz": {"date": "Date", "description": "Notes", "amount": "Amount", "type": "Type",
+                   "category": "Category", "tags": "Tags", "date_format": "%Y-%m-%d"},
+    "hdfc": {"date": "Date", "description": "Narration", "debit": "Withdrawal Amt.",
+             "credit": "Deposit Amt.", "date_format": "%d/%m/%y"},
+    "sbi": {"date": "Txn Date", "description": "Description", "debit": "Debit", "credit": "Credit",
+            "date_format": "%d %b %Y"},
+    "icici": {"date": "Transaction Date", "description": "Transaction Remarks",
+              "debit": "Withdrawal Amount (INR )", "credit": "Deposit Amount (INR )",
+              "date_format": "%d/%m/%Y"},
+}
+
+
+def compile_mapping_rules(mapping_rules):
+    """Precompile {keyword: category} rules; the first matching key in dict order wins"""
+    if not mapping_rules:
+        return None
+    return KeywordMatcher((key, order, category) for order, (key, category) in enumerate(mapping_rules.items()))
+
+
+def _parse_amount(value):
+    """Amount of a statement cell such as "1,234.50"; None when the cell is empty"""
+    value = (value or "").replace(",", "").strip()
+    return float(value) if value else None
+
+
+def _parse_date(value, date_format):
+    value = (value or "").strip()
+    if not date_format or date_format == "%Y-%m-%d":
+        return value
+    return datetime.strptime(value, date_format).strftime("%Y-%m-%d")
+
+
+def iter_bank_csv(filename, mapping_rules=None, profile="default", batch_size=1000,
+                  progress=None, on_invalid=None):
+    """Stream a bank statement as lists of at most batch_size transactions, skipping unparseable rows.
+
+    progress(rows, bytes_read, total_bytes) is called per batch, on_invalid(line, error) per skipped row.
+    """
+    layout = BANK_PROFILES[profile] if isinstance(profile, str) else profile
+    matcher = compile_mapping_rules(mapping_rules)
+    total_bytes = os.path.getsize(filename)
+    rows_done = 0
+
+    with open(filename, "rb") as raw:
+        reader = csv.DictReader(io.TextIOWrapper(raw, encoding="utf-8-sig", newline=""))
+        batch = []
+        for line, row in enumerate(reader, start=2):
+            try:
+                transaction = _to_transaction(row, layout, matcher)
+            except (ValueError, KeyError) as e:
+                if on_invalid:
+                    on_invalid(line, str(e))
+                continue
+            batch.append(transaction)
+            if len(batch) >= batch_size:
+                rows_done += len(batch)
+                yield batch
+                batch = []
+                if progress:
+                    progress(rows_done, raw.tell(), total_bytes)
+        if batch:
+            rows_done += len(batch)
+            yield batch
+        if progress:
+            progress(rows_done, total_bytes, total_bytes)
+
+
+def _to_transaction(row, layout, matcher):
+    desc = row.get(layout["description"]) or ""
+    if "debit" in layout:
+        debit = _parse_amount(row.get(layout["debit"]))
+        credit = _parse_amount(row.get(layout["credit"]))
+        if debit is None and credit is None:
+            raise ValueError("row has neither a debit nor a credit amount")
+        transaction_type = "Expense" if debit else "Income"
+        amount = debit or credit or 0.0
+    else:
+        transaction_type = row.get(layout.get("type", ""), None) or "Expense"
+        amount = _parse_amount(row.get(layout["amount"]))
+        if amount is None:
+            raise ValueError("row has no amount")
+
+    category = row.get(layout.get("category", ""), None) or "Other"
+    if matcher:
+        category = matcher.match(desc) or category
+    tags = row.get(layout.get("tags", ""), None)
+    return Transaction(_parse_date(row.get(layout["date"]), layout.get("date_format")), transaction_type,
+                       amount, category, desc, tags.split(",") if tags else None)
+
+
+def import_bank_csv(filename, mapping_rules=None, profile="default"):
+    """Load a whole statement into a list; use iter_bank_csv for large files"""
     transactions = []
-    with open(filename, newline='', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            desc = row.get("Description", "")
-            category = "Other"
-            if mapping_rules:
-                for key, value in mapping_rules.items():
-                    if key.lower() in desc.lower():
-                        category = value
-                        break
-            transactions.append({
-                "date": row.get("Date"),
-                "type": row.get("Type", "Expense"),
-                "amount": float(row.get("Amount", 0)),
-                "category": category,
-                "notes": desc,
-                "tags": []
-            })
+    for batch in iter_bank_csv(filename, mapping_rules, profile):
+        transactions.extend(batch)
     return transactions
+
+
+def import_bank_csv_to_db(db, user_id, filename, mapping_rules=None, profile="default",
+                          batch_size=1000, progress=None):
+    """Stream a statement into DBManager.add_transactions_bulk a batch at a time; returns summed counts"""
+    summary = {"inserted": 0, "duplicates": 0, "invalid": 0}
+
+    def count_invalid(line, error):
+        summary["invalid"] += 1
+
+    for batch in iter_bank_csv(filename, mapping_rules, profile, batch_size, progress, count_invalid):
+        result = db.add_transactions_bulk(user_id, [{
+            "type": t["type"].lower(),
+            "amount": t["amount"],
+            # "Other" is only a placeholder; let the DB categorizer try first
+            "category": t["category"] if t["category"] != "Other" else None,
+            "description": t["notes"],
+            "transaction_date": t["date"],
+            "tags": list(t["tags"]),
+        } for t in batch], chunk_size=batch_size, generate_insights=False)
+        for key in summary:
+            summary[key] += result[key]
+
+    if summary["inserted"]:
+        db.generate_spending_insights(user_id)
+    return summary
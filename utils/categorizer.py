@@ -0,0 +1,74 @@
+from collections import deque
+
+
+class KeywordMatcher:
+    """Case-insensitive Aho-Corasick matcher over (keyword, rank, value) triples; lowest rank wins"""
+
+    def __init__(self, keywords):
+        self._goto = [{}]
+        self._fail = [0]
+        self._best = [None]  # (rank, value) of the best keyword ending at or suffix-linked from a node
+
+        for keyword, rank, value in keywords:
+            keyword = keyword.lower()
+            if not keyword:
+                continue
+            node = 0
+            for ch in keyword:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._best.append(None)
+                node = nxt
+            if self._best[node] is None or rank < self._best[node][0]:
+                self._best[node] = (rank, value)
+
+        self._build_links()
+
+    def _build_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(ch, 0)
+                inherited = self._best[self._fail[child]]
+                if inherited is not None and (self._best[child] is None or inherited[0] < self._best[child][0]):
+                    self._best[child] = inherited
+
+    def __len__(self):
+        return len(self._goto) - 1
+
+    def match(self, text):
+        """Return the value of the best-ranked keyword found in text, or None"""
+        goto, fail, best_at = self._goto, self._fail, self._best
+        node = 0
+        best = None
+        for ch in text.lower():
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            found = best_at[node]
+            if found is not None and (best is None or found[0] < best[0]):
+                best = found
+        return best[1] if best else None
+
+
+def build_category_matcher(category_patterns, category_ids, user_rules=()):
+    """KeywordMatcher of category IDs: user rules first, then built-in categories in dict order"""
+    keywords = []
+    for order, (keyword, category_id) in enumerate(user_rules):
+        keywords.append((keyword, (0, order), category_id))
+    for order, (category_name, patterns) in enumerate(category_patterns.items()):
+        category_id = category_ids.get(category_name)
+        if category_id is None:
+            continue
+        for pattern in patterns:
+            keywords.append((pattern, (1, order), category_id))
+    return KeywordMatcher(keywords)
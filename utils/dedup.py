@@ -0,0 +1,96 @@
+import hashlib
+import re
+from collections import defaultdict
+from datetime import date, datetime
+
+_REFERENCE = re.compile(r"\d{4,}")      # UPI/card/cheque references differ between exports
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+FINGERPRINT_LENGTH = 16
+
+
+def normalize_description(description):
+    """Lowercase, drop long reference numbers and punctuation, collapse whitespace"""
+    text = _REFERENCE.sub(" ", (description or "").lower())
+    return " ".join(_NON_WORD.sub(" ", text).split())
+
+
+def to_paise(amount):
+    return int(round(float(amount) * 100))
+
+
+def _day(transaction_date):
+    if isinstance(transaction_date, datetime):
+        return transaction_date.date()
+    if isinstance(transaction_date, date):
+        return transaction_date
+    return datetime.strptime(str(transaction_date)[:10], "%Y-%m-%d").date()
+
+
+def transaction_fingerprint(amount, transaction_date, description):
+    """Stable hash of (amount in paise, day, normalized description) stored in Transactions.fingerprint"""
+    key = f"{to_paise(amount)}|{_day(transaction_date).isoformat()}|{normalize_description(description)}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:FINGERPRINT_LENGTH]
+
+
+def shingles(normalized, size=3):
+    """Character n-grams of a normalized description"""
+    if len(normalized) <= size:
+        return {normalized} if normalized else set()
+    return {normalized[i:i + size] for i in range(len(normalized) - size + 1)}
+
+
+def jaccard(a, b):
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def is_near_duplicate(normalized_a, normalized_b, threshold=0.6, shingles_a=None, shingles_b=None):
+    """Same merchant text give or take a few characters, or one contained in the other"""
+    if not normalized_a or not normalized_b:
+        return normalized_a == normalized_b
+    if normalized_a in normalized_b or normalized_b in normalized_a:
+        return True
+    return jaccard(shingles_a or shingles(normalized_a), shingles_b or shingles(normalized_b)) >= threshold
+
+
+class DedupIndex:
+    """Duplicate index for batch imports: fingerprint set, plus fuzzy checks within each (amount, day) bucket"""
+
+    def __init__(self, threshold=0.6, window_days=0):
+        self.threshold = threshold
+        self.window_days = window_days
+        self.fingerprints = set()
+        self._buckets = defaultdict(list)  # (paise, day ordinal) -> [(normalized, shingles)]
+
+    def __len__(self):
+        return len(self.fingerprints)
+
+    def add(self, amount, transaction_date, description, fingerprint=None):
+        normalized = normalize_description(description)
+        self.fingerprints.add(fingerprint or transaction_fingerprint(amount, transaction_date, description))
+        self._buckets[(to_paise(amount), _day(transaction_date).toordinal())].append(
+            (normalized, shingles(normalized)))
+
+    def find(self, amount, transaction_date, description, fingerprint=None):
+        """Return 'exact', 'fuzzy' or None"""
+        if (fingerprint or transaction_fingerprint(amount, transaction_date, description)) in self.fingerprints:
+            return "exact"
+        paise = to_paise(amount)
+        ordinal = _day(transaction_date).toordinal()
+        normalized = normalize_description(description)
+        grams = shingles(normalized)
+        for day in range(ordinal - self.window_days, ordinal + self.window_days + 1):
+            for other, other_grams in self._buckets.get((paise, day), ()):
+                if is_near_duplicate(normalized, other, self.threshold, grams, other_grams):
+                    return "fuzzy"
+        return None
+
+    def check_and_add(self, amount, transaction_date, description):
+        """find() and, if the row is new, remember it for later rows of the batch"""
+        fingerprint = transaction_fingerprint(amount, transaction_date, description)
+        match = self.find(amount, transaction_date, description, fingerprint)
+        if match is None:
+            self.add(amount, transaction_date, description, fingerprint)
+        return match
@@ -0,0 +1,171 @@
+"""Monthly spend forecasts from additive Holt-Winters smoothing of monthly totals, oldest first"""
+import calendar
+from datetime import date
+from itertools import product
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+SEASON = 12
+ALPHAS = (0.1, 0.3, 0.5, 0.8)
+BETAS = (0.0, 0.1, 0.3)
+GAMMAS = (0.1, 0.3, 0.5)
+
+
+class SeasonalModel:
+    """Fitted smoothing state of one series"""
+
+    __slots__ = ("alpha", "beta", "gamma", "level", "trend", "seasonals", "observations", "error")
+
+    def __init__(self, alpha, beta, gamma, level, trend, seasonals, observations, error):
+        self.alpha = alpha
+        self.beta = beta
+        self.gamma = gamma
+        self.level = level
+        self.trend = trend
+        self.seasonals = seasonals
+        self.observations = observations
+        self.error = error
+
+    def forecast(self, steps=1):
+        """Expected total ``steps`` months after the last observed month (never negative)"""
+        seasonal = self.seasonals[(self.observations + steps - 1) % SEASON] if self.seasonals else 0.0
+        return max(0.0, self.level + steps * self.trend + seasonal)
+
+
+def _grid(observations):
+    # Seasonality needs two full years to be told apart from noise
+    gammas = GAMMAS if observations >= 2 * SEASON else (0.0,)
+    return list(product(ALPHAS, BETAS, gammas))
+
+
+def _initial_state(series):
+    if len(series) >= 2 * SEASON:
+        first = sum(series[:SEASON]) / SEASON
+        second = sum(series[SEASON:2 * SEASON]) / SEASON
+        return first, (second - first) / SEASON, [value - first for value in series[:SEASON]]
+    return series[0], 0.0, [0.0] * SEASON
+
+
+def _smooth(series, alpha, beta, gamma):
+    level, trend, seasonals = _initial_state(series)
+    error = 0.0
+    for t, value in enumerate(series):
+        seasonal = seasonals[t % SEASON]
+        residual = value - (level + trend + seasonal)
+        if t:
+            error += residual * residual
+        previous = level
+        level = alpha * (value - seasonal) + (1 - alpha) * (level + trend)
+        trend = beta * (level - previous) + (1 - beta) * trend
+        seasonals[t % SEASON] = gamma * (value - level) + (1 - gamma) * seasonal
+    return SeasonalModel(alpha, beta, gamma, level, trend, seasonals, len(series), error)
+
+
+def trim_leading_zeros(series):
+    """Drop the months before a category was first used; they are not real zero-spend months"""
+    for start, value in enumerate(series):
+        if value:
+            return series[start:]
+    return series[-1:]
+
+
+def fit_series(series):
+    """Best-fitting SeasonalModel for one series (leading zero months ignored)"""
+    series = [float(value) for value in trim_leading_zeros(list(series))]
+    if len(series) < 3 or len(set(series)) == 1:
+        mean = sum(series) / len(series) if series else 0.0
+        return SeasonalModel(0.0, 0.0, 0.0, mean, 0.0, [], len(series), 0.0)
+    best = None
+    for alpha, beta, gamma in _grid(len(series)):
+        model = _smooth(series, alpha, beta, gamma)
+        if best is None or model.error < best.error:
+            best = model
+    return best
+
+
+def fit_batch(matrix):
+    """Fit one model per row of an equal-length series matrix (rows are used as given)"""
+    if not NUMPY_AVAILABLE or len(matrix) < 2 or len(matrix[0]) < 3:
+        return [fit_series(row) for row in matrix]
+
+    values = np.asarray(matrix, dtype=np.float64)
+    rows, length = values.shape
+    if length >= 2 * SEASON:
+        first = values[:, :SEASON].mean(axis=1)
+        initial = (first, (values[:, SEASON:2 * SEASON].mean(axis=1) - first) / SEASON,
+                   values[:, :SEASON] - first[:, None])
+    else:
+        initial = (values[:, 0].copy(), np.zeros(rows), np.zeros((rows, SEASON)))
+
+    best_error = np.full(rows, np.inf)
+    best = [None] * rows
+    for alpha, beta, gamma in _grid(length):
+        level, trend, seasonals = initial[0].copy(), initial[1].copy(), initial[2].copy()
+        error = np.zeros(rows)
+        for t in range(length):
+            value = values[:, t]
+            seasonal = seasonals[:, t % SEASON].copy()
+            residual = value - (level + trend + seasonal)
+            if t:
+                error += residual * residual
+            previous = level
+            level = alpha * (value - seasonal) + (1 - alpha) * (level + trend)
+            trend = beta * (level - previous) + (1 - beta) * trend
+            seasonals[:, t % SEASON] = gamma * (value - level) + (1 - gamma) * seasonal
+        for row in np.nonzero(error < best_error)[0]:
+            best_error[row] = error[row]
+            best[row] = SeasonalModel(alpha, beta, gamma, float(level[row]), float(trend[row]),
+                                      seasonals[row].tolist(), length, float(error[row]))
+    return best
+
+
+class ForecastCache:
+    """Fitted models per key (e.g. (user_id, category)), refitted only when their series changes"""
+
+    def __init__(self):
+        self._models = {}   # key -> (series tuple, SeasonalModel)
+        self.refits = 0
+
+    def forecast_many(self, series_by_key, steps=1):
+        """{key: series} -> {key: forecast}; stale keys are refitted together in one batch"""
+        stale = {}
+        for key, series in series_by_key.items():
+            series = tuple(trim_leading_zeros([round(float(value), 2) for value in series]))
+            cached = self._models.get(key)
+            if cached is None or cached[0] != series:
+                stale[key] = series
+
+        by_length = {}
+        for key, series in stale.items():
+            by_length.setdefault(len(series), []).append(key)
+        for keys in by_length.values():
+            for key, model in zip(keys, fit_batch([stale[key] for key in keys])):
+                self._models[key] = (stale[key], model)
+            self.refits += len(keys)
+
+        return {key: self._models[key][1].forecast(steps) for key in series_by_key}
+
+    def forecast(self, key, series, steps=1):
+        return self.forecast_many({key: series}, steps)[key]
+
+    def invalidate(self, predicate=None):
+        """Drop cached models (all, or those whose key matches predicate)"""
+        if predicate is None:
+            self._models.clear()
+        else:
+            for key in [key for key in self._models if predicate(key)]:
+                del self._models[key]
+
+
+def projected_month_end(spent, forecast, today=None):
+    """Spend so far plus the forecast's share of the days left, or the run rate without a forecast"""
+    today = today or date.today()
+    days = calendar.monthrange(today.year, today.month)[1]
+    remaining = (days - today.day) / days
+    if forecast is None:
+        return spent * days / today.day
+    return spent + forecast * remaining
@@ -1,21 +1,174 @@
+"""Calendar heatmap of daily expenses, colored by the user's own spending quantiles"""
+from array import array
+from bisect import bisect_left, insort
+from datetime import date
+
+from models.transaction import to_day
+from utils.analytics import to_columns
+from utils.dedup import to_paise
+
+# No spending, then one color per quantile band, lightest first
+HEAT_COLORS = ("#e0e0e0", "#4CAF50", "#FFEB3B", "#FF9800", "#F44336")
+QUANTILES = (0.25, 0.5, 0.75)
+
+
+class DailySeries:
+    """Totals per day in a dense array; index = day ordinal - origin"""
+
+    SLACK = 366   # days of room added when the series grows
+
+    def __init__(self):
+        self.origin = None
+        self.values = array("q")
+
+    def add(self, day, paise):
+        """Add to one day's total; returns (old, new) total"""
+        day = to_day(day)
+        if self.origin is None:
+            self.origin = day - self.SLACK
+            self.values = array("q", bytes(8 * 2 * self.SLACK))
+        elif day < self.origin:
+            grow = self.origin - day + self.SLACK
+            self.values = array("q", bytes(8 * grow)) + self.values
+            self.origin -= grow
+        index = day - self.origin
+        if index >= len(self.values):
+            self.values.extend(bytes(8 * (index - len(self.values) + self.SLACK)))
+        old = self.values[index]
+        self.values[index] = old + paise
+        return old, old + paise
+
+    def get(self, day):
+        index = to_day(day) - self.origin if self.origin is not None else -1
+        return self.values[index] if 0 <= index < len(self.values) else 0
+
+    def window(self, first, last):
+        """Totals of the days first..last (ordinals, inclusive), zero outside the series"""
+        length = last - first + 1
+        if self.origin is None:
+            return array("q", bytes(8 * length))
+        start, stop = first - self.origin, last - self.origin + 1
+        inside = self.values[max(start, 0):max(min(stop, len(self.values)), 0)]
+        before = array("q", bytes(8 * min(max(-start, 0), length)))
+        return before + inside + array("q", bytes(8 * (length - len(before) - len(inside))))
+
+    def clear(self):
+        self.__init__()
+
+
+class HeatmapEngine:
+    """Daily expense series of one user; level 0 is no spending, then one level per quantile band"""
+
+    def __init__(self, quantiles=QUANTILES, colors=HEAT_COLORS):
+        self.series = DailySeries()
+        self.quantiles = quantiles
+        self.colors = colors
+        self._positive = array("q")   # positive day totals, sorted
+        self._breaks = None
+
+    @classmethod
+    def from_transactions(cls, transactions):
+        engine = cls()
+        engine.extend(transactions)
+        return engine
+
+    def add(self, day, amount):
+        """Record an expense of amount on day (negative to take one back)"""
+        old, new = self.series.add(day, to_paise(amount))
+        positive = self._positive
+        if old > 0:
+            del positive[bisect_left(positive, old)]
+        if new > 0:
+            insort(positive, new)
+        self._breaks = None
+
+    def extend(self, records):
+        """Add many records (dicts with date, type, amount), sorting the day totals once at the end"""
+        series = self.series
+        for record in records:
+            if str(record["type"]).lower() == "expense":
+                series.add(record["date"], to_paise(record["amount"]))
+        self._positive = array("q", sorted(total for total in series.values if total > 0))
+        self._breaks = None
+
+    def remove(self, day, amount):
+        self.add(day, -amount)
+
+    def add_record(self, record, sign=1):
+        if str(record["type"]).lower() == "expense":
+            self.add(record["date"], sign * record["amount"])
+
+    def clear(self):
+        self.series.clear()
+        self._positive = array("q")
+        self._breaks = None
+
+    def follow(self, store):
+        """Index a TransactionStore's records and keep up with its changes"""
+        self.extend(store)
+        store.subscribe(self._on_store_change)
+
+    def _on_store_change(self, event, record, previous):
+        if event in ("clear", "reset"):
+            self.clear()
+        if event in ("extend", "reset"):
+            self.extend(record)
+        elif event != "clear":
+            if previous is not None:
+                self.add_record(previous, -1)
+            self.add_record(record, -1 if event == "remove" else 1)
+
+    def breaks(self):
+        """Upper bounds (paise) of every level but the last"""
+        if self._breaks is None:
+            positive, count = self._positive, len(self._positive)
+            self._breaks = [positive[min(count - 1, int(q * count))] for q in self.quantiles] if count else []
+        return self._breaks
+
+    def level(self, paise):
+        return _level(paise, self.breaks())
+
+    def total(self, day):
+        return self.series.get(day) / 100
+
+    def color(self, day):
+        return self.colors[self.level(self.series.get(day))]
+
+    def colors_between(self, first, last):
+        """{date: color} for every day from first to last, inclusive"""
+        first, last = to_day(first), to_day(last)
+        breaks, colors = self.breaks(), self.colors
+        return {date.fromordinal(first + offset): colors[_level(paise, breaks)]
+                for offset, paise in enumerate(self.series.window(first, last))}
+
+    def year_view(self, year):
+        """Weeks (Monday first) of (date, amount, color) for a year; None pads the first and last week"""
+        first, last = date(year, 1, 1).toordinal(), date(year, 12, 31).toordinal()
+        breaks, colors = self.breaks(), self.colors
+        cells = [None] * date(year, 1, 1).weekday()
+        cells += [(date.fromordinal(first + offset), paise / 100, colors[_level(paise, breaks)])
+                  for offset, paise in enumerate(self.series.window(first, last))]
+        cells += [None] * (-len(cells) % 7)
+        return [cells[start:start + 7] for start in range(0, len(cells), 7)]
+
+
+def _level(paise, breaks):
+    return 0 if paise <= 0 else 1 + bisect_left(breaks, paise)
+
+
 def generate_heatmap(transactions):
-    # Return a dict: {date: color}
-    heatmap = {}
-    for t in transactions:
-        color = "#F44336" if t["type"] == "Expense" else "#4CAF50"
-        heatmap[t["date"]] = color
-    return heatmap
+    # Return a dict: {date: color} for every date with a transaction, by that day's total spending
+    engine = HeatmapEngine.from_transactions(transactions)
+    return {t["date"]: engine.color(t["date"]) for t in transactions}
 
 def get_daily_spending(transactions):
-    daily = {}
-    for t in transactions:
-        date = t["date"]
-        daily.setdefault(date, 0)
-        if t["type"] == "Expense":
-            daily[date] += t["amount"]
-    return daily
-
-def get_heat_color(amount):
+    # Expense total per date; dates with only income map to 0
+    return to_columns(transactions).daily_totals("Expense")
+
+def get_heat_color(amount, breaks=None):
+    # Quantile bands when given a HeatmapEngine's breaks (in paise), else a fixed scale
+    if breaks is not None:
+        return HEAT_COLORS[min(_level(to_paise(amount), breaks), len(HEAT_COLORS) - 1)]
     # Simple color scale: green < yellow < orange < red
     if amount == 0:
         return "#e0e0e0"
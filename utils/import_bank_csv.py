@@ -1,16 +1,11 @@
-import csv
+from utils.bank_import import import_bank_csv as _import_profile, iter_bank_csv
+
 
 def import_bank_csv(filename):
-    transactions = []
-    with open(filename, newline='', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            transactions.append({
-                "date": row.get("Date"),
-                "type": row.get("Type"),
-                "amount": float(row.get("Amount", 0)),
-                "category": row.get("Category", "Other"),
-                "notes": row.get("Notes", ""),
-                "tags": row.get("Tags", "").split(",") if row.get("Tags") else []
-            })
-    return transactions
+    """Import a CSV exported by WalletWhiz (Date, Type, Amount, Category, Notes, Tags)"""
+    return _import_profile(filename, profile="walletwhiz")
+
+
+def iter_walletwhiz_csv(filename, batch_size=1000, progress=None):
+    """Batched variant of import_bank_csv for large exports"""
+    return iter_bank_csv(filename, profile="walletwhiz", batch_size=batch_size, progress=progress)
@@ -1,15 +1,23 @@
+from utils.analytics import to_columns
+from utils.forecasting import ForecastCache
+
+# Models survive between calls, keyed by (user_id, category), so only series whose history changed are refitted
+_forecasts = ForecastCache()
+
 def spending_insights(transactions):
     insights = []
     # Example: Compare food spending month-to-month
-    food = [t for t in transactions if t["category"] == "Food"]
-    if food:
-        insights.append(f"You spent {sum(t['amount'] for t in food)} on Food.")
+    totals = to_columns(transactions).category_totals()
+    if "Food" in totals:
+        insights.append(f"You spent {totals['Food']} on Food.")
     # Add more insights as needed
     return insights
 
-def predict_expenses(transactions):
-    # Dummy prediction: next month same as this month
-    predictions = {}
-    for cat in set(t["category"] for t in transactions):
-        predictions[cat] = sum(t["amount"] for t in transactions if t["category"] == cat)
-    return predictions
+def predict_expenses(transactions, user_id=None):
+    # Next month's expense per category from a seasonal model of its monthly history;
+    # without a user_id the models are fitted fresh, since cached ones could be another user's
+    series, _ = to_columns(transactions).monthly_totals("Expense")
+    cache = _forecasts if user_id is not None else ForecastCache()
+    forecasts = cache.forecast_many({(user_id, category): values
+                                     for category, values in series.items() if any(values)})
+    return {category: round(value, 2) for (_, category), value in forecasts.items()}
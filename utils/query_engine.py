@@ -0,0 +1,443 @@
+"""Answer spending questions: parse the text, plan an aggregate query, execute it"""
+import calendar
+import re
+import time
+from datetime import date, timedelta
+from functools import lru_cache
+
+MONTHS = {name.lower(): number for number, name in enumerate(calendar.month_name) if name}
+MONTHS.update({name.lower(): number for number, name in enumerate(calendar.month_abbr) if name})
+MONTHS["sept"] = 9
+
+# Question words for the default categories that share no word with their names
+CATEGORY_SYNONYMS = {
+    "travel": "transportation", "transport": "transportation", "commute": "transportation",
+    "fuel": "transportation", "gas": "transportation", "taxi": "transportation",
+    "groceries": "food", "grocery": "food", "restaurants": "dining", "eating": "dining",
+    "movies": "entertainment", "fun": "entertainment",
+    "bills": "bills", "rent": "bills", "electricity": "utilities",
+    "medical": "healthcare", "doctor": "healthcare", "health": "healthcare", "pharmacy": "healthcare",
+    "clothes": "shopping",
+}
+
+STOPWORDS = frozenset("""
+    how much many what whats was were is are did do does i we my me our us on for in at of to the a an
+    have has had total spend spent spending spends expense expenses expenditure cost costs pay paid
+    money transactions transaction purchases purchase all so far altogether overall in during since
+    category categories give tell show please with from by each per and or there be been get got
+""".split())
+# Words the metric, type and grouping rules read, which are not category names either
+_RULE_WORDS = frozenset("""
+    average avg mean monthly largest biggest highest max maximum most expensive smallest lowest cheapest
+    min minimum number count breakdown month income earn earned earnings made make received receive
+    last past this
+""".split())
+
+_NORMALIZE = re.compile(r"[^a-z0-9]+")
+_MONTH_NAMES = "|".join(sorted(MONTHS, key=len, reverse=True))
+_UNIT = r"(day|week|month|quarter|year)s?"
+_PERIODS = (
+    (re.compile(r"\b(?:year to date|ytd)\b"), lambda m: ("this", "year")),
+    (re.compile(r"\b(today|yesterday)\b"), lambda m: (m.group(1),)),
+    (re.compile(rf"\b(?:last|past|previous) (\d+) {_UNIT}\b"), lambda m: ("past", int(m.group(1)), m.group(2))),
+    (re.compile(rf"\b(this|current|last|previous) {_UNIT}\b"),
+     lambda m: ("this" if m.group(1) in ("this", "current") else "last", m.group(2))),
+    (re.compile(r"\bq([1-4])(?: (\d{4}))?\b"),
+     lambda m: ("quarter", int(m.group(1)), int(m.group(2)) if m.group(2) else None)),
+    (re.compile(rf"\b({_MONTH_NAMES})(?: (\d{{4}}))?\b"),
+     lambda m: ("month", MONTHS[m.group(1)], int(m.group(2)) if m.group(2) else None)),
+    (re.compile(r"\b((?:19|20)\d\d)\b"), lambda m: ("year", int(m.group(1)))),
+)
+_TOP = re.compile(r"\b(top|bottom|biggest|largest|smallest|least|most)(?: (\d+))? (categor(?:y|ies)|months?)\b")
+_GROUP = re.compile(r"\b(?:by|per|each|every|for each) (categor(?:y|ies)|month)\b|\b(breakdown|monthly)\b")
+_INCOME = re.compile(r"\b(income|earn\w*|made|make|received|receive)\b")
+_METRICS = (
+    ("monthly_average", re.compile(r"\b(?:average|avg|mean)\b.*\b(?:monthly|per month|a month|each month)\b|"
+                                   r"\bmonthly (?:average|avg|mean)\b")),
+    ("average", re.compile(r"\b(?:average|avg|mean)\b")),
+    ("count", re.compile(r"\b(?:how many|number of|count)\b")),
+    ("max", re.compile(r"\b(?:largest|biggest|highest|max|maximum|most expensive)\b")),
+    ("min", re.compile(r"\b(?:smallest|lowest|cheapest|min|minimum)\b")),
+)
+
+
+def normalize_question(text):
+    """Lower case, punctuation removed, single spaces"""
+    return _NORMALIZE.sub(" ", str(text).lower()).strip()
+
+
+class Question:
+    """What a question asks, independent of the date it is asked on and of whose data it reads"""
+
+    __slots__ = ("text", "metric", "type", "period", "group_by", "order", "limit", "terms")
+
+    def __init__(self, text, metric="sum", type="expense", period=None, group_by=None, order=None,
+                 limit=None, terms=()):
+        self.text = text            # normalized question
+        self.metric = metric        # sum, count, average, monthly_average, max or min
+        self.type = type            # expense or income
+        self.period = period        # tuple such as ("month", 6, None) or ("past", 3, "month"); None for all time
+        self.group_by = group_by    # None, category or month
+        self.order = order          # desc or asc for top/bottom N
+        self.limit = limit
+        self.terms = terms          # words left over, matched against category names when planning
+
+    def __repr__(self):
+        return (f"Question(metric={self.metric!r}, type={self.type!r}, period={self.period!r}, "
+                f"group_by={self.group_by!r}, order={self.order!r}, limit={self.limit!r}, terms={self.terms!r})")
+
+
+def parse_question(text):
+    """Question for text; repeated questions (after normalization) come from a cache"""
+    return _parse(normalize_question(text))
+
+
+@lru_cache(maxsize=1024)
+def _parse(text):
+    rest = f" {text} "
+    period = None
+    for pattern, build in _PERIODS:
+        match = pattern.search(rest)
+        if match:
+            period = build(match)
+            rest = rest[:match.start()] + " " + rest[match.end():]
+            break
+
+    group_by = order = limit = None
+    match = _TOP.search(rest)
+    if match:
+        word, count, what = match.groups()
+        group_by = "month" if what.startswith("month") else "category"
+        order = "asc" if word in ("bottom", "smallest", "least") else "desc"
+        limit = int(count) if count else (5 if what.endswith(("ies", "s")) else 1)
+        rest = rest[:match.start()] + " " + rest[match.end():]
+    else:
+        match = _GROUP.search(rest)
+        if match:
+            what = match.group(1) or match.group(2)
+            group_by = "category" if what in ("category", "categories", "breakdown") else "month"
+
+    metric = "sum"
+    for name, pattern in _METRICS:
+        if pattern.search(rest):
+            metric = name
+            break
+    if metric == "monthly_average":
+        group_by = None
+    elif group_by == "month" and metric in ("max", "min"):
+        raise ValueError("largest/smallest amounts cannot be grouped by month")
+    transaction_type = "income" if _INCOME.search(rest) else "expense"
+
+    terms = tuple(word for word in rest.split()
+                  if word not in STOPWORDS and word not in _RULE_WORDS and not word.isdigit())
+    return Question(text, metric, transaction_type, period, group_by, order, limit, terms)
+
+
+def _add_months(day, months):
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _month_end(year, month):
+    return date(year, month, calendar.monthrange(year, month)[1])
+
+
+def resolve_period(period, today):
+    """(first day, last day) of a parsed period, both inclusive; (None, None) for all time"""
+    if period is None:
+        return None, None
+    kind = period[0]
+    if kind == "today":
+        return today, today
+    if kind == "yesterday":
+        return today - timedelta(days=1), today - timedelta(days=1)
+    if kind == "month":
+        _, month, year = period
+        if year is None:
+            # The latest such month that has started
+            year = today.year if month <= today.month else today.year - 1
+        return date(year, month, 1), _month_end(year, month)
+    if kind == "quarter":
+        _, quarter, year = period
+        if year is None:
+            year = today.year if quarter <= (today.month - 1) // 3 + 1 else today.year - 1
+        return date(year, quarter * 3 - 2, 1), _month_end(year, quarter * 3)
+    if kind == "year":
+        return date(period[1], 1, 1), date(period[1], 12, 31)
+    if kind == "past":
+        _, count, unit = period
+        if unit == "day":
+            return today - timedelta(days=count - 1), today
+        if unit == "week":
+            return today - timedelta(days=7 * count - 1), today
+        months = count * {"month": 1, "quarter": 3, "year": 12}[unit]
+        # The last N whole months before this one
+        return _add_months(today, -months), _add_months(today, 0) - timedelta(days=1)
+    # "this"/"last" week, month, quarter or year, as calendar periods
+    which, unit = period
+    shift = 0 if which == "this" else -1
+    if unit == "day":
+        day = today + timedelta(days=shift)
+        return day, day
+    if unit == "week":
+        start = today - timedelta(days=today.weekday()) + timedelta(weeks=shift)
+        return start, start + timedelta(days=6)
+    months = {"month": 1, "quarter": 3, "year": 12}[unit]
+    current = today.year * 12 + today.month - 1
+    first = (current // months + shift) * months
+    start = date(first // 12, first % 12 + 1, 1)
+    return start, _add_months(start, months) - timedelta(days=1)
+
+
+def period_label(date_from, date_to):
+    if date_from is None:
+        return "in total"
+    if date_from.day == 1 and date_to == _month_end(date_to.year, date_to.month):
+        if (date_from.year, date_from.month) == (date_to.year, date_to.month):
+            return f"in {calendar.month_name[date_from.month]} {date_from.year}"
+        if (date_from.month, date_to.month) == (1, 12) and date_from.year == date_to.year:
+            return f"in {date_from.year}"
+        if date_from.month % 3 == 1 and date_to == _month_end(date_from.year, date_from.month + 2):
+            return f"in Q{date_from.month // 3 + 1} {date_from.year}"
+    if date_from == date_to:
+        return f"on {date_from.isoformat()}"
+    return f"from {date_from.isoformat()} to {date_to.isoformat()}"
+
+
+def _words(name):
+    return set(_NORMALIZE.sub(" ", name.lower()).split())
+
+
+def _category_hits(wanted, categories):
+    return [name for name in categories
+            if any(word == wanted or (len(wanted) >= 4 and word.startswith(wanted)) or
+                   (len(word) >= 4 and wanted.startswith(word)) for word in _words(name))]
+
+
+def match_categories(terms, categories):
+    """(matched category names, unmatched terms) for question words against category names"""
+    matched, unmatched = [], []
+    for term in terms:
+        # The user's own category names win; a synonym only stands in when none matches
+        hits = _category_hits(term, categories)
+        if not hits and term in CATEGORY_SYNONYMS:
+            hits = _category_hits(CATEGORY_SYNONYMS[term], categories)
+        if hits:
+            matched.extend(name for name in hits if name not in matched)
+        else:
+            unmatched.append(term)
+    return matched, unmatched
+
+
+class QueryPlan:
+    """A Question made concrete for one user and day"""
+
+    __slots__ = ("question", "date_from", "date_to", "categories", "category_ids", "unmatched", "source")
+
+    def __init__(self, question, date_from, date_to, categories, category_ids, unmatched, source):
+        self.question = question
+        self.date_from = date_from
+        self.date_to = date_to
+        self.categories = categories        # names, empty for every category
+        self.category_ids = category_ids
+        self.unmatched = unmatched          # leftover words that named no category
+        self.source = source                # aggregates, transactions or memory
+
+    def __repr__(self):
+        return (f"QueryPlan({self.question!r}, {self.date_from}..{self.date_to}, categories={self.categories!r}, "
+                f"source={self.source!r})")
+
+
+def _whole_months(date_from, date_to):
+    return ((date_from is None or date_from.day == 1) and
+            (date_to is None or date_to == _month_end(date_to.year, date_to.month)))
+
+
+def choose_source(question, date_from, date_to):
+    """aggregates when MonthlyAggregates holds the answer, transactions when it needs the rows"""
+    if question.metric in ("max", "min") or not _whole_months(date_from, date_to):
+        return "transactions"
+    return "aggregates"
+
+
+def build_plan(question, categories, today, source=None):
+    """QueryPlan for a question on ``today``; ``categories`` maps names to ids (or is a set of names)"""
+    date_from, date_to = resolve_period(question.period, today)
+    if question.metric == "monthly_average":
+        if date_from is None:
+            raise ValueError("a monthly average needs a period, such as 'this year'")
+        # Months that have not started yet would only dilute the average
+        date_to = min(date_to, _month_end(today.year, today.month))
+    names, unmatched = match_categories(question.terms, categories)
+    category_ids = [categories[name] for name in names] if isinstance(categories, dict) else []
+    return QueryPlan(question, date_from, date_to, names, category_ids, unmatched,
+                     source or choose_source(question, date_from, date_to))
+
+
+def _months_between(date_from, date_to):
+    return (date_to.year - date_from.year) * 12 + date_to.month - date_from.month + 1
+
+
+class QueryEngine:
+    """Answers questions about one user's money from the database, caching plans for the day"""
+
+    def __init__(self, db, user_id, currency="₹", slow_ms=None):
+        self.db = db
+        self.user_id = user_id
+        self.currency = currency
+        self.slow_ms = slow_ms
+        self._categories = None     # name -> id
+        self._plans = {}            # normalized question -> plan, for self._planned_on
+        self._planned_on = None
+
+    def refresh(self):
+        """Forget cached categories and plans, after categories change"""
+        self._categories = None
+        self._plans.clear()
+
+    def categories(self):
+        if self._categories is None:
+            self._categories = {}
+            for category_id, name, _ in self.db.get_categories(self.user_id):
+                self._categories.setdefault(name, category_id)
+        return self._categories
+
+    def plan(self, question, today=None):
+        today = today or date.today()
+        if today != self._planned_on:
+            self._plans.clear()
+            self._planned_on = today
+        plan = self._plans.get(question.text)
+        if plan is None:
+            plan = self._plans[question.text] = build_plan(question, self.categories(), today)
+        return plan
+
+    def execute(self, plan):
+        """(value, rows) for a plan; rows are (label, value) for grouped questions"""
+        question = plan.question
+        metric, group_by = question.metric, question.group_by
+        if metric == "monthly_average":
+            metric, group_by = "sum", None
+        rows = self.db.query_spending(self.user_id, metric, question.type, plan.date_from, plan.date_to,
+                                      plan.category_ids, group_by, question.order, question.limit, plan.source)
+        return _result(question, plan, rows)
+
+    def ask(self, text, today=None):
+        timings = {}
+        started = time.perf_counter()
+        try:
+            question = parse_question(text)
+            timings["parse"] = (time.perf_counter() - started) * 1000
+            mark = time.perf_counter()
+            plan = self.plan(question, today)
+            timings["plan"] = (time.perf_counter() - mark) * 1000
+            mark = time.perf_counter()
+            value, rows = self.execute(plan)
+            timings["execute"] = (time.perf_counter() - mark) * 1000
+        except ValueError as e:
+            return {"answer": f"Sorry, {e}.", "value": None, "rows": [], "plan": None, "timings": timings}
+        timings["total"] = (time.perf_counter() - started) * 1000
+        if self.slow_ms is not None and timings["total"] > self.slow_ms:
+            print(f"Slow question ({', '.join(f'{stage} {ms:.1f}ms' for stage, ms in timings.items())}): "
+                  f"{text!r} -> {plan!r}")
+        return {"answer": describe(plan, value, rows, self.currency), "value": value, "rows": rows,
+                "plan": plan, "timings": timings}
+
+
+def _result(question, plan, rows):
+    if question.metric == "monthly_average":
+        total = rows[0][0] if rows and rows[0][0] is not None else 0.0
+        return total / _months_between(plan.date_from, plan.date_to), []
+    if question.group_by == "category":
+        return None, [(name, value) for name, value in rows]
+    if question.group_by == "month":
+        return None, [(f"{calendar.month_abbr[month]} {year}", value) for year, month, value in rows]
+    value = rows[0][0] if rows else None
+    if value is None and question.metric in ("sum", "count"):
+        value = 0.0
+    return value, []
+
+
+def run_in_memory(plan, transactions):
+    """(value, rows) for a plan over transaction records, for callers without a database"""
+    question = plan.question
+    wanted = set(plan.categories)
+    first = plan.date_from.isoformat() if plan.date_from else ""
+    last = plan.date_to.isoformat() if plan.date_to else "9999"
+    groups = {}
+    for t in transactions:
+        if str(t["type"]).lower() != question.type or (wanted and t["category"] not in wanted):
+            continue
+        day = str(t["date"])[:10]
+        if not first <= day <= last:
+            continue
+        key = t["category"] if question.group_by == "category" else day[:7] if question.group_by == "month" else None
+        groups.setdefault(key, []).append(float(t["amount"]))
+
+    def reduce(amounts):
+        metric = "sum" if question.metric == "monthly_average" else question.metric
+        if metric == "sum":
+            return sum(amounts)
+        if metric == "count":
+            return float(len(amounts))
+        if metric == "average":
+            return sum(amounts) / len(amounts)
+        return max(amounts) if metric == "max" else min(amounts)
+
+    if question.group_by is None:
+        amounts = groups.get(None, [])
+        if not amounts and question.metric not in ("sum", "count", "monthly_average"):
+            return None, []
+        value = reduce(amounts)
+        if question.metric == "monthly_average":
+            value /= _months_between(plan.date_from, plan.date_to)
+        return value, []
+    rows = [(key, reduce(amounts)) for key, amounts in groups.items()]
+    if question.order or question.group_by == "category":
+        rows.sort(key=lambda row: row[1], reverse=question.order != "asc")
+    else:
+        rows.sort()
+    if question.limit:
+        rows = rows[:question.limit]
+    if question.group_by == "month":
+        rows = [(f"{calendar.month_abbr[int(key[5:7])]} {key[:4]}", value) for key, value in rows]
+    return None, rows
+
+
+def _money(value, currency):
+    return f"{currency}{value:,.2f}"
+
+
+def describe(plan, value, rows, currency="₹"):
+    """One-sentence answer for a plan's result"""
+    question = plan.question
+    if question.terms and not plan.categories:
+        return f"No category matches '{' '.join(plan.unmatched)}'."
+    when = period_label(plan.date_from, plan.date_to)
+    what = ", ".join(plan.categories) if plan.categories else None
+    verb = "Earned" if question.type == "income" else "Spent"
+    on = f" {'from' if question.type == 'income' else 'on'} {what}" if what else ""
+    if question.group_by:
+        if not rows:
+            return f"No {question.type} transactions{on} {when}."
+        if question.limit:
+            label = "category" if question.group_by == "category" else "month"
+            if len(rows) > 1:
+                label = f"{len(rows)} {question.type} {'categories' if label == 'category' else 'months'}"
+            else:
+                label = f"{question.type} {label}"
+            label = f"{'Top' if question.order == 'desc' else 'Bottom'} {label}"
+        else:
+            label = f"{question.type.capitalize()} by {question.group_by}"
+        amounts = ", ".join(f"{key} {value:,.0f}" if question.metric == "count" else f"{key} {_money(value, currency)}"
+                            for key, value in rows)
+        return f"{label}{on} {when}: {amounts}."
+    if question.metric == "count":
+        return f"{int(value)} {question.type} transactions{on} {when}."
+    if value is None:
+        return f"No {question.type} transactions{on} {when}."
+    if question.metric == "sum":
+        return f"{verb} {_money(value, currency)}{on} {when}."
+    kind = {"average": "Average", "monthly_average": "Monthly average", "max": "Largest",
+            "min": "Smallest"}[question.metric]
+    return f"{kind} {question.type}{on} {when}: {_money(value, currency)}."
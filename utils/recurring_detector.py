@@ -1,8 +1,109 @@
-def detect_recurring(transactions):
-    # Stub: Find transactions with similar amount/description monthly
-    recurring = []
+"""Detect recurring payments (subscriptions, rent, EMIs) by merchant, amount band and period"""
+import re
+from collections import defaultdict
+from datetime import date
+
+from models.recurring import advance
+from models.transaction import to_day
+from utils.dedup import normalize_description
+
+# frequency -> (nominal gap in days, tolerance in days, minimum occurrences)
+PERIODS = {
+    "weekly": (7, 1, 4),
+    "monthly": (30.44, 4, 3),
+    "quarterly": (91.31, 10, 3),
+    "yearly": (365.25, 15, 2),
+}
+AMOUNT_TOLERANCE = 0.1   # Amounts within 10% of the band's first amount belong to it
+MIN_REGULARITY = 0.75    # Share of gaps that must fit the period
+MERCHANT_WORDS = 3
+
+_DIGITS = re.compile(r"\b\w*\d\w*\b")
+
+
+def merchant_key(description):
+    """'NETFLIX.COM 8812 Mumbai' and 'Netflix.com 9931 mumbai' -> 'netflix com mumbai'"""
+    words = _DIGITS.sub(" ", normalize_description(description)).split()
+    return " ".join(words[:MERCHANT_WORDS])
+
+
+def _description(t):
+    return t.get("description") or t.get("notes") or ""
+
+
+def amount_bands(amounts):
+    """Group indexes of amounts whose values are within AMOUNT_TOLERANCE of the band's smallest"""
+    order = sorted(range(len(amounts)), key=lambda index: amounts[index])
+    bands, current, floor = [], [], None
+    for index in order:
+        if current and amounts[index] > floor * (1 + AMOUNT_TOLERANCE):
+            bands.append(current)
+            current = []
+        if not current:
+            floor = amounts[index]
+        current.append(index)
+    if current:
+        bands.append(current)
+    return bands
+
+
+def infer_period(days):
+    """(frequency, regularity) for sorted day ordinals, or None if they do not recur"""
+    gaps = [later - earlier for earlier, later in zip(days, days[1:]) if later != earlier]
+    if not gaps:
+        return None
+    best = None
+    for frequency, (nominal, tolerance, minimum) in PERIODS.items():
+        if len(gaps) + 1 < minimum:
+            continue
+        fitting = 0
+        for gap in gaps:
+            periods = max(1, round(gap / nominal))
+            # A skipped occurrence (two or three periods apart) is still on schedule
+            if periods <= 3 and abs(gap - periods * nominal) <= tolerance * periods:
+                fitting += 1 if periods == 1 else 0.5
+        regularity = fitting / len(gaps)
+        if regularity >= MIN_REGULARITY and (best is None or regularity > best[1]):
+            best = (frequency, regularity)
+    return best
+
+
+def detect_recurring(transactions, today=None):
+    """Recurring payment patterns in transactions, soonest next_occurrence first"""
+    today = today or date.today()
+    groups = defaultdict(list)
     for t in transactions:
-        # Add logic for frequency detection
-        if "netflix" in t["notes"].lower():
-            recurring.append(t)
-    return recurring
+        key = merchant_key(_description(t))
+        if key:
+            groups[(t.get("type"), key)].append(t)
+
+    patterns = []
+    for (transaction_type, key), group in groups.items():
+        amounts = [float(t["amount"]) for t in group]
+        for band in amount_bands(amounts):
+            members = sorted((group[index] for index in band), key=lambda t: to_day(t["date"]))
+            days = [to_day(t["date"]) for t in members]
+            period = infer_period(days)
+            if period is None:
+                continue
+            frequency, regularity = period
+            last = members[-1]
+            last_date = date.fromordinal(days[-1])
+            next_occurrence = advance(last_date, frequency)
+            patterns.append({
+                "merchant": key,
+                "description": _description(last),
+                "amount": float(last["amount"]),
+                "category": last.get("category"),
+                "type": transaction_type,
+                "frequency": frequency,
+                "regularity": round(regularity, 2),
+                "occurrences": len(members),
+                "first_date": date.fromordinal(days[0]),
+                "last_date": last_date,
+                "next_occurrence": next_occurrence,
+                # Still running if the next payment is not more than one period overdue
+                "active": advance(next_occurrence, frequency) >= today,
+            })
+    patterns.sort(key=lambda pattern: pattern["next_occurrence"])
+    return patterns
@@ -0,0 +1,231 @@
+"""Restore database snapshots written by utils.backup into a user account, in one transaction, and verify them.
+
+Derived tables (MonthlyAggregates, AnomalyState, tags) are rebuilt rather than restored.
+"""
+import time
+from collections import defaultdict
+
+from utils.backup import REFERENCE_TABLES, SNAPSHOT_TABLES, BackupEngine, ContentDigest, _HashingReader, \
+    get_target, iter_snapshot, row_hash
+
+# Columns holding ids of restored rows, and the table whose id map translates them
+REMAPPED_COLUMNS = {"category_id": "Categories", "parent_category_id": "Categories",
+                    "template_id": "TransactionTemplates", "recurring_schedule_id": "RecurringSchedules"}
+DERIVED_TABLES = ("MonthlyAggregates", "AnomalyState", "UsageSketches")
+
+
+def verify_file(target, entry):
+    """Raise ValueError unless the stored snapshot's SHA-256 matches its manifest entry"""
+    with target.open(entry["file"]) as raw:
+        hashing = _HashingReader(raw)
+        hashing.drain()
+    if hashing.sha256.hexdigest() != entry["sha256"]:
+        raise ValueError(f"Checksum mismatch in {entry['file']}")
+
+
+def _compare(expected, actual, label):
+    """Mismatch messages between {table: {"rows", "digest"}} and {table: ContentDigest}"""
+    problems = []
+    for table, summary in expected.items():
+        digest = actual.get(table) or ContentDigest()
+        if digest.rows != summary["rows"] or digest.hexdigest() != summary["digest"]:
+            problems.append(f"{label} {table}: expected {summary['rows']} rows/{summary['digest']}, "
+                            f"got {digest.rows}/{digest.hexdigest()}")
+    return problems
+
+
+class _TableWriter:
+    """Inserts snapshot rows of one table into the target user's account, remapping ids"""
+
+    def __init__(self, cursor, table, user_id, id_maps):
+        cursor.execute(f"SELECT * FROM {table} WHERE 1 = 0")
+        cursor.fetchall()
+        self.target_columns = [column[0] for column in cursor.description]
+        self.table = table
+        self.user_id = user_id
+        self.id_maps = id_maps
+        self.columns = None
+        self.query = None
+
+    def _plan(self, row):
+        """Build the INSERT for the columns the first row has, and where each needs fixing up"""
+        self.columns = [column for column in self.target_columns if column != "id" and column in row]
+        if "user_id" not in self.columns:
+            self.columns.append("user_id")
+        self.query = (f"INSERT INTO {self.table} ({', '.join(self.columns)}) "
+                      f"VALUES ({', '.join(['%s'] * len(self.columns))})")
+        self.user_index = self.columns.index("user_id")
+        # parent_category_id is set once every category has its new id
+        self.cleared = [i for i, column in enumerate(self.columns) if column == "parent_category_id"]
+        self.remapped = [(i, self.id_maps[REMAPPED_COLUMNS[column]]) for i, column in enumerate(self.columns)
+                         if column in REMAPPED_COLUMNS and column != "parent_category_id"]
+        self.timestamps = [i for i, column in enumerate(self.columns) if column.endswith("_at")]
+
+    def prepare(self, row):
+        """Column values for row, in the order of self.query"""
+        if self.columns is None:
+            self._plan(row)
+        values = [row.get(column) for column in self.columns]
+        values[self.user_index] = self.user_id
+        for i in self.cleared:
+            values[i] = None
+        for i, id_map in self.remapped:
+            if values[i] is not None:
+                values[i] = id_map.get(values[i])
+        for i in self.timestamps:
+            # Snapshots store datetimes as ISO strings with 'T'; the schema's timestamps use a space
+            if isinstance(values[i], str):
+                values[i] = values[i].replace("T", " ", 1)
+        return tuple(values)
+
+
+class RestorePipeline:
+    """Restores one user's backup chain into user_id (replacing that account's data by default)"""
+
+    def __init__(self, db, source_user_id, user_id, target=None, chunk_size=5000, progress=None):
+        self.db = db
+        self.user_id = user_id
+        self.target = target or get_target()
+        self.chain = BackupEngine(db, source_user_id, self.target).restore_chain()
+        self.chunk_size = chunk_size
+        self.progress = progress
+        self.id_maps = defaultdict(dict)
+        self.loaded = defaultdict(ContentDigest)   # what was written, per table
+        self.problems = []
+
+    def run(self, replace=True):
+        """Restore and verify; returns counts, timing and any verification problems"""
+        if not self.chain:
+            raise ValueError("No full snapshot to restore from")
+        started = time.perf_counter()
+        for entry in self.chain:
+            verify_file(self.target, entry)
+
+        latest, reference = self._read_incrementals()
+        full = self.chain[0]
+        read = defaultdict(ContentDigest)
+        writer = None
+        pending = []
+        total = 0
+        # One transaction, so a failure part-way leaves the account as it was
+        with self.db.transaction(defer_constraints=True) as cursor:
+            if replace:
+                self._clear_account(cursor)
+            if len(self.chain) > 1:
+                self._load_reference(cursor, reference)
+            for table, row in iter_snapshot(self.target, full):
+                digest = row_hash(row)
+                read[table].add_hash(digest)
+                if table != "Transactions":
+                    if len(self.chain) == 1:
+                        reference[table].append(row)
+                    continue
+                if writer is None:
+                    writer = self._transactions_writer(cursor, reference)
+                if row["id"] in latest:
+                    continue   # A newer copy is in an incremental
+                pending.append(writer.prepare(row))
+                self.loaded["Transactions"].add_hash(digest)
+                if len(pending) >= self.chunk_size:
+                    total += self._flush(cursor, writer, pending, started, total)
+            if writer is None:
+                writer = self._transactions_writer(cursor, reference)
+            for row, digest in latest.values():
+                pending.append(writer.prepare(row))
+                self.loaded["Transactions"].add_hash(digest)
+                if len(pending) >= self.chunk_size:
+                    total += self._flush(cursor, writer, pending, started, total)
+            total += self._flush(cursor, writer, pending, started, total)
+        self.problems += _compare(full["tables"], read, full["file"])
+
+        self.problems += self._verify_database()
+        self.db.rebuild_monthly_aggregates(self.user_id)
+        self.db.rebuild_anomaly_state(self.user_id)
+        self.db.rebuild_tags(self.user_id)
+        self.db.invalidate_category_cache(self.user_id)
+
+        seconds = time.perf_counter() - started
+        return {"snapshots": len(self.chain),
+                "rows": {table: digest.rows for table, digest in self.loaded.items()},
+                "seconds": seconds, "rows_per_second": total / seconds if seconds else 0,
+                "verified": not self.problems, "problems": self.problems}
+
+    def _read_incrementals(self):
+        """Latest Transactions rows (with their hashes) by source id, and the last snapshot's reference rows"""
+        latest, reference = {}, defaultdict(list)
+        for entry in self.chain[1:]:
+            read = defaultdict(ContentDigest)
+            last = entry is self.chain[-1]
+            for table, row in iter_snapshot(self.target, entry):
+                digest = row_hash(row)
+                read[table].add_hash(digest)
+                if table == "Transactions":
+                    latest[row["id"]] = (row, digest)
+                elif last:
+                    reference[table].append(row)
+            self.problems += _compare(entry["tables"], read, entry["file"])
+        return latest, reference
+
+    def _clear_account(self, cursor):
+        # MySQL skips ON DELETE CASCADE while foreign key checks are off
+        cursor.execute("DELETE FROM TransactionTags WHERE tag_id IN (SELECT id FROM Tags WHERE user_id = %s)",
+                       (self.user_id,))
+        cursor.execute("DELETE FROM Tags WHERE user_id = %s", (self.user_id,))
+        for table in reversed(SNAPSHOT_TABLES + DERIVED_TABLES):
+            cursor.execute(f"DELETE FROM {table} WHERE user_id = %s", (self.user_id,))
+
+    def _load_reference(self, cursor, reference):
+        """Insert reference rows one at a time, recording each old id's new id"""
+        parents = []
+        for table in REFERENCE_TABLES:
+            writer = _TableWriter(cursor, table, self.user_id, self.id_maps)
+            for row in reference.get(table, ()):
+                values = writer.prepare(row)
+                cursor.execute(writer.query, values)
+                self.id_maps[table][row["id"]] = cursor.lastrowid
+                self.loaded[table].add(row)
+                if row.get("parent_category_id") is not None:
+                    parents.append((row["id"], row["parent_category_id"]))
+        categories = self.id_maps["Categories"]
+        if parents:
+            cursor.executemany("UPDATE Categories SET parent_category_id = %s WHERE id = %s",
+                               [(categories.get(parent), categories[child]) for child, parent in parents])
+
+    def _transactions_writer(self, cursor, reference):
+        """Writer for Transactions; loads the reference tables first when they come from the full snapshot"""
+        if len(self.chain) == 1:
+            self._load_reference(cursor, reference)
+            reference.clear()
+        return _TableWriter(cursor, "Transactions", self.user_id, self.id_maps)
+
+    def _flush(self, cursor, writer, pending, started, done):
+        """Insert pending Transactions rows in one batch; returns how many"""
+        count = len(pending)
+        if count:
+            cursor.executemany(writer.query, pending)
+            pending.clear()
+            if self.progress:
+                self.progress(done + count, time.perf_counter() - started)
+        return count
+
+    def _verify_database(self):
+        """Compare the restored rows in the database with what was loaded"""
+        stored = defaultdict(ContentDigest)
+        with self.db.read_snapshot() as cursor:
+            for table in SNAPSHOT_TABLES:
+                cursor.execute(f"SELECT * FROM {table} WHERE user_id = %s", (self.user_id,))
+                columns = [column[0] for column in cursor.description]
+                while True:
+                    rows = cursor.fetchmany(5000)
+                    if not rows:
+                        break
+                    for values in rows:
+                        stored[table].add(dict(zip(columns, values)))
+        expected = {table: {"rows": digest.rows, "digest": digest.hexdigest()}
+                    for table, digest in self.loaded.items()}
+        return _compare(expected, stored, "restored")
+
+
+def restore_backup(db, source_user_id, user_id, target=None, replace=True, chunk_size=5000, progress=None):
+    """Restore source_user_id's latest backup chain into user_id; see RestorePipeline"""
+    return RestorePipeline(db, source_user_id, user_id, target, chunk_size, progress).run(replace)
@@ -0,0 +1,56 @@
+"""Search query parsing: prefix words, "quoted phrases" and -exclusions"""
+import re
+
+# BM25 weights of the description, notes and location columns (SQLite)
+COLUMN_WEIGHTS = (4.0, 1.0, 2.0)
+
+_TOKEN = re.compile(r'(-?)"([^"]*)"?|(-?)([^\s"]+)')
+_WORD = re.compile(r"\w+")
+
+
+def parse_query(text):
+    """(required, excluded) lists of terms; a term is a tuple of lower-case words, more than one for a phrase"""
+    required, excluded = [], []
+    for match in _TOKEN.finditer(text or ""):
+        negated = match.group(1) or match.group(3)
+        body = match.group(2) if match.group(2) is not None else match.group(4)
+        words = tuple(word.lower() for word in _WORD.findall(body))
+        if words:
+            (excluded if negated else required).append(words)
+    return required, excluded
+
+
+def _fts5_term(words):
+    return f'"{words[0]}"*' if len(words) == 1 else '"' + " ".join(words) + '"'
+
+
+def fts5_expression(required, excluded):
+    """FTS5 MATCH expression, or None when nothing is required"""
+    if not required:
+        return None
+    expression = " AND ".join(_fts5_term(words) for words in required)
+    return expression + "".join(f" NOT {_fts5_term(words)}" for words in excluded)
+
+
+def _boolean_term(words):
+    return f"{words[0]}*" if len(words) == 1 else '"' + " ".join(words) + '"'
+
+
+def mysql_boolean_expression(required, excluded):
+    """MATCH ... AGAINST (... IN BOOLEAN MODE) expression, or None when nothing is required"""
+    if not required:
+        return None
+    return " ".join([f"+{_boolean_term(words)}" for words in required] +
+                    [f"-{_boolean_term(words)}" for words in excluded])
+
+
+# LIKE escape character; a backslash would itself need escaping in MySQL string literals
+LIKE_ESCAPE = "!"
+
+
+def like_pattern(words):
+    """LIKE pattern (with ESCAPE LIKE_ESCAPE) matching a term anywhere in lower-cased text"""
+    text = " ".join(words)
+    for special in (LIKE_ESCAPE, "%", "_"):
+        text = text.replace(special, LIKE_ESCAPE + special)
+    return f"%{text}%"
@@ -1,2 +1,5 @@
+from utils.tags import filter_transactions_by_tag
+
+
 def filter_by_tag(transactions, tag):
-    return [t for t in transactions if tag in t.get("tags", [])]
+    return filter_transactions_by_tag(transactions, tag)
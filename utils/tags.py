@@ -1,15 +1,258 @@
+"""Tags: extraction from notes, autocomplete and filtering"""
+import heapq
+from functools import lru_cache
+
+
 def extract_tags(text):
     # Extract tags from notes or description (e.g., "#food #urgent")
     return [word[1:] for word in text.split() if word.startswith("#")]
 
-def suggest_tags(transactions, prefix):
-    # Suggest tags based on prefix and past entries
-    tags = set()
-    for t in transactions:
-        for tag in t.get("tags", []):
-            if tag.startswith(prefix):
-                tags.add(tag)
-    return list(tags)
+
+@lru_cache(maxsize=4096)
+def normalize_tag(tag):
+    """Canonical form of a tag: no surrounding spaces or leading '#', lower case"""
+    return str(tag).strip().lstrip("#").strip().lower()
+
+
+def normalize_tags(tags):
+    """Distinct canonical tags, in first-seen order"""
+    seen = {}
+    for tag in tags or ():
+        tag = normalize_tag(tag)
+        if tag:
+            seen[tag] = None
+    return tuple(seen)
+
+
+def _bitmap(slots):
+    """int with the given bit positions set"""
+    bits = bytearray((max(slots) >> 3) + 1)
+    for slot in slots:
+        bits[slot >> 3] |= 1 << (slot & 7)
+    return int.from_bytes(bits, "little")
+
+
+def _positions(bitmap):
+    """Set bit positions of bitmap, lowest first"""
+    bits = bin(bitmap)[:1:-1]
+    position = bits.find("1")
+    while position != -1:
+        yield position
+        position = bits.find("1", position + 1)
+
+
+class _TrieNode:
+    __slots__ = ("children", "count", "top")
+
+    def __init__(self):
+        self.children = {}
+        self.count = 0      # uses of the tag ending here
+        self.top = None     # cached most used tags below this node, None when stale
+
+
+class TagTrie:
+    """Prefix tree of tag usage counts; each node caches its most used tags"""
+
+    def __init__(self, cached=10):
+        self.root = _TrieNode()
+        self.cached = cached
+
+    def add(self, tag, delta=1):
+        node = self.root
+        node.top = None
+        for char in tag:
+            child = node.children.get(char)
+            if child is None:
+                child = node.children[char] = _TrieNode()
+            node = child
+            node.top = None
+        node.count += delta
+
+    def count(self, tag):
+        node = self._find(tag)
+        return node.count if node else 0
+
+    def top(self, prefix="", k=10):
+        """Up to k tags starting with prefix, most used first (ties alphabetical)"""
+        node = self._find(prefix)
+        if node is None:
+            return []
+        if k > self.cached:
+            ranked = heapq.nsmallest(k, self._walk(node, prefix))
+        else:
+            ranked = self._top(node, prefix)[:k]
+        return [tag for _, tag in ranked]
+
+    def _find(self, prefix):
+        node = self.root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return None
+        return node
+
+    def _top(self, node, prefix):
+        if node.top is None:
+            candidates = [(-node.count, prefix)] if node.count > 0 else []
+            for char, child in node.children.items():
+                candidates += self._top(child, prefix + char)
+            node.top = heapq.nsmallest(self.cached, candidates)
+        return node.top
+
+    def _walk(self, node, prefix):
+        if node.count > 0:
+            yield -node.count, prefix
+        for char, child in node.children.items():
+            yield from self._walk(child, prefix + char)
+
+
+class TagIndex:
+    """Inverted index from tag to a bitmap of transaction slots (bit positions, reused after removal)"""
+
+    def __init__(self):
+        self.bitmaps = {}
+        self.trie = TagTrie()
+        self._slots = {}      # transaction id -> slot
+        self._ids = []        # slot -> transaction id
+        self._tags = []       # slot -> its tags
+        self._records = []    # slot -> record, if one was given
+        self._free = []
+
+    @classmethod
+    def from_transactions(cls, transactions):
+        index = cls()
+        index.extend((t.get("id"), t.get("tags"), t) for t in transactions)
+        return index
+
+    def __len__(self):
+        return len(self._slots)
+
+    def __contains__(self, transaction_id):
+        return transaction_id in self._slots
+
+    def add(self, transaction_id, tags, record=None):
+        """Index (or re-index) one transaction"""
+        self.extend([(transaction_id, tags, record)])
+
+    def extend(self, items):
+        """Index many (transaction_id, tags, record) items; each tag's bitmap is rebuilt once"""
+        latest = {}
+        for transaction_id, tags, record in items:
+            # Records without an id (plain lists of transactions) get a private key
+            latest[object() if transaction_id is None else transaction_id] = (tags, record)
+        added = {}
+        for transaction_id, (tags, record) in latest.items():
+            self.remove(transaction_id)
+            tags = normalize_tags(tags)
+            if not tags:
+                continue
+            if self._free:
+                slot = self._free.pop()
+                self._ids[slot], self._tags[slot], self._records[slot] = transaction_id, tags, record
+            else:
+                slot = len(self._ids)
+                self._ids.append(transaction_id)
+                self._tags.append(tags)
+                self._records.append(record)
+            self._slots[transaction_id] = slot
+            for tag in tags:
+                added.setdefault(tag, []).append(slot)
+        for tag, slots in added.items():
+            self.bitmaps[tag] = self.bitmaps.get(tag, 0) | _bitmap(slots)
+            self.trie.add(tag, len(slots))
+
+    def remove(self, transaction_id):
+        slot = self._slots.pop(transaction_id, None)
+        if slot is None:
+            return
+        mask = ~(1 << slot)
+        for tag in self._tags[slot]:
+            bitmap = self.bitmaps[tag] & mask
+            if bitmap:
+                self.bitmaps[tag] = bitmap
+            else:
+                del self.bitmaps[tag]
+            self.trie.add(tag, -1)
+        self._ids[slot], self._tags[slot], self._records[slot] = None, (), None
+        self._free.append(slot)
+
+    def clear(self):
+        self.__init__()
+
+    def follow(self, store):
+        """Index a TransactionStore's records and keep up with its changes"""
+        self.extend((record["id"], record.get("tags"), record) for record in store)
+        store.subscribe(self._on_store_change)
+
+    def _on_store_change(self, event, record, previous):
+        if event in ("clear", "reset"):
+            self.clear()
+        if event in ("extend", "reset"):
+            self.extend((added["id"], added.get("tags"), added) for added in record)
+        elif event == "remove":
+            self.remove(record["id"])
+        elif event != "clear":
+            self.add(record["id"], record.get("tags"), record)
+
+    def tags_of(self, transaction_id):
+        slot = self._slots.get(transaction_id)
+        return self._tags[slot] if slot is not None else ()
+
+    def count(self, tag):
+        return self.trie.count(normalize_tag(tag))
+
+    def suggest(self, prefix, k=10):
+        """Up to k tags starting with prefix, most used first"""
+        return self.trie.top(normalize_tag(prefix), k)
+
+    def match(self, all_of=(), any_of=(), none_of=()):
+        """Bitmap of transactions with every tag in all_of, any in any_of and none in none_of"""
+        bitmaps = self.bitmaps
+        result = None
+        for tag in normalize_tags(all_of):
+            result = bitmaps.get(tag, 0) if result is None else result & bitmaps.get(tag, 0)
+            if not result:
+                return 0
+        any_of = normalize_tags(any_of)
+        if any_of:
+            either = 0
+            for tag in any_of:
+                either |= bitmaps.get(tag, 0)
+            result = either if result is None else result & either
+        if not result:
+            return 0
+        for tag in normalize_tags(none_of):
+            result &= ~bitmaps.get(tag, 0)
+        return result
+
+    def ids(self, all_of=(), any_of=(), none_of=()):
+        """Ids of the matching transactions, as given to add (sorted when they are numbers)"""
+        ids = [self._ids[slot] for slot in _positions(self.match(all_of, any_of, none_of))]
+        try:
+            ids.sort()
+        except TypeError:
+            pass
+        return ids
+
+    def records(self, all_of=(), any_of=(), none_of=()):
+        """Records of the matching transactions, in slot order"""
+        return [self._records[slot] for slot in _positions(self.match(all_of, any_of, none_of))]
+
+
+def suggest_tags(transactions, prefix, limit=10):
+    """Most used tags starting with prefix; pass a TagIndex to avoid a scan per keystroke"""
+    index = transactions if isinstance(transactions, TagIndex) else TagIndex.from_transactions(transactions)
+    return index.suggest(prefix, limit)
+
 
 def filter_transactions_by_tag(transactions, tag):
-    return [t for t in transactions if tag in t.get("tags", [])]
+    """Transactions carrying tag; a TagIndex answers from its bitmap"""
+    if isinstance(transactions, TagIndex):
+        return transactions.records(all_of=(tag,))
+    tag = normalize_tag(tag)
+    return [t for t in transactions if tag in normalize_tags(t.get("tags"))]
+
+
+def filter_transactions_by_tags(index, all_of=(), any_of=(), none_of=()):
+    """Records in a TagIndex matching an AND/OR/NOT combination of tags"""
+    return index.records(all_of, any_of, none_of)
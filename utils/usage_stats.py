@@ -0,0 +1,254 @@
+"""Payment-method, merchant and location statistics in bounded, mergeable memory"""
+import base64
+import hashlib
+import heapq
+import zlib
+from array import array
+from functools import lru_cache
+
+from utils.dedup import normalize_description, to_paise
+
+DIMENSIONS = ("payment_method", "merchant", "location")
+UNKNOWN = "Unknown"
+
+
+@lru_cache(maxsize=65536)
+def _cells(item, width, depth):
+    """Table cell of item in each row of a width x depth sketch; stable across processes, unlike hash()"""
+    digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+    first, second = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+    return tuple(row * width + (first + row * second) % width for row in range(depth))
+
+
+class SpaceSaving:
+    """Top-k heavy hitters over a weighted stream; totals overestimate by at most their error"""
+
+    def __init__(self, capacity=64):
+        self.capacity = capacity
+        self.counts = {}    # item -> upper bound of its total
+        self.errors = {}    # item -> how much of that bound may be inherited
+        self._heap = []     # (count, item), with stale entries skipped when popped
+
+    def __len__(self):
+        return len(self.counts)
+
+    def add(self, item, weight=1):
+        counts = self.counts
+        if item in counts:
+            counts[item] += weight
+        elif len(counts) < self.capacity:
+            counts[item] = weight
+            self.errors[item] = 0
+        else:
+            victim, floor = self._pop_smallest()
+            del counts[victim], self.errors[victim]
+            counts[item] = floor + weight
+            self.errors[item] = floor
+        heapq.heappush(self._heap, (counts[item], item))
+        if len(self._heap) > 8 * self.capacity:
+            self._heap = [(count, key) for key, count in counts.items()]
+            heapq.heapify(self._heap)
+
+    def _pop_smallest(self):
+        while True:
+            count, item = heapq.heappop(self._heap)
+            if self.counts.get(item) == count:
+                return item, count
+
+    def floor(self):
+        """Largest total an unmonitored item can have"""
+        return min(self.counts.values()) if len(self.counts) >= self.capacity else 0
+
+    def top(self, k=10):
+        """[(item, total, error)] for the k largest totals"""
+        ranked = heapq.nsmallest(k, self.counts.items(), key=lambda entry: (-entry[1], entry[0]))
+        return [(item, count, self.errors[item]) for item, count in ranked]
+
+    def merge(self, other):
+        """Fold another summary in; absent items count as the other side's floor"""
+        floor, other_floor = self.floor(), other.floor()
+        counts, errors = {}, {}
+        for item in self.counts.keys() | other.counts.keys():
+            counts[item] = self.counts.get(item, floor) + other.counts.get(item, other_floor)
+            errors[item] = self.errors.get(item, floor) + other.errors.get(item, other_floor)
+        kept = heapq.nlargest(self.capacity, counts.items(), key=lambda entry: (entry[1], entry[0]))
+        self.counts = dict(kept)
+        self.errors = {item: errors[item] for item in self.counts}
+        self._heap = [(count, item) for item, count in kept]
+        heapq.heapify(self._heap)
+        return self
+
+    def to_dict(self):
+        return {"capacity": self.capacity, "items": [[item, count, self.errors[item]]
+                                                     for item, count in self.counts.items()]}
+
+    @classmethod
+    def from_dict(cls, data):
+        summary = cls(data["capacity"])
+        for item, count, error in data["items"]:
+            summary.counts[item] = count
+            summary.errors[item] = error
+        summary._heap = [(count, item) for item, count in summary.counts.items()]
+        heapq.heapify(summary._heap)
+        return summary
+
+
+class CountMinSketch:
+    """Estimated total of any item: never below the truth, above it by at most
+    e/width of the stream total with probability 1 - e^-depth."""
+
+    def __init__(self, width=256, depth=4):
+        self.width = width
+        self.depth = depth
+        self.table = array("q", bytes(8 * width * depth))
+
+    def add(self, item, count=1):
+        table = self.table
+        for cell in _cells(item, self.width, self.depth):
+            table[cell] += count
+
+    def estimate(self, item):
+        table = self.table
+        return min(table[cell] for cell in _cells(item, self.width, self.depth))
+
+    def merge(self, other):
+        if (self.width, self.depth) != (other.width, other.depth):
+            raise ValueError("Count-Min sketches of different sizes cannot be merged")
+        table = self.table
+        for cell, count in enumerate(other.table):
+            if count:
+                table[cell] += count
+        return self
+
+    def to_dict(self):
+        return {"width": self.width, "depth": self.depth,
+                "table": base64.b64encode(zlib.compress(self.table.tobytes())).decode("ascii")}
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data["width"], data["depth"])
+        sketch.table = array("q")
+        sketch.table.frombytes(zlib.decompress(base64.b64decode(data["table"])))
+        return sketch
+
+
+class _Dimension:
+    """Counts and spend of the values of one dimension"""
+
+    __slots__ = ("by_count", "by_spend", "counts", "spend")
+
+    def __init__(self, capacity, width, depth):
+        self.by_count = SpaceSaving(capacity)
+        self.by_spend = SpaceSaving(capacity)
+        self.counts = CountMinSketch(width, depth)
+        self.spend = CountMinSketch(width, depth)
+
+    def add(self, value, paise):
+        self.by_count.add(value)
+        counts, spend = self.counts.table, self.spend.table
+        # Both sketches have the same shape, so value hits the same cells in each
+        for cell in _cells(value, self.counts.width, self.counts.depth):
+            counts[cell] += 1
+            spend[cell] += paise
+        if paise:
+            self.by_spend.add(value, paise)
+
+    def merge(self, other):
+        self.by_count.merge(other.by_count)
+        self.by_spend.merge(other.by_spend)
+        self.counts.merge(other.counts)
+        self.spend.merge(other.spend)
+
+
+class UsageStats:
+    """Frequencies and spend (in paise) per payment method, merchant and location"""
+
+    def __init__(self, capacity=128, width=512, depth=4):
+        self.capacity, self.width, self.depth = capacity, width, depth
+        self.count = 0
+        self.spend = 0
+        self.dimensions = {name: _Dimension(capacity, width, depth) for name in DIMENSIONS}
+
+    @classmethod
+    def from_transactions(cls, transactions, **sizes):
+        stats = cls(**sizes)
+        for t in transactions:
+            stats.add_record(t)
+        return stats
+
+    def add(self, amount, payment_method=None, merchant=None, location=None):
+        paise = abs(to_paise(amount or 0))
+        self.count += 1
+        self.spend += paise
+        dimensions = self.dimensions
+        dimensions["payment_method"].add(payment_method or UNKNOWN, paise)
+        dimensions["merchant"].add(normalize_description(merchant) or UNKNOWN, paise)
+        dimensions["location"].add((location or "").strip() or UNKNOWN, paise)
+
+    def add_record(self, record):
+        """Add a transaction dict (or Transaction); the merchant is its description, else its notes"""
+        self.add(record.get("amount"), record.get("payment_method"),
+                 record.get("description") or record.get("notes"), record.get("location"))
+
+    def merge(self, other):
+        """Fold in the stats of other transactions (e.g. another month); sizes must match"""
+        self.count += other.count
+        self.spend += other.spend
+        for name, dimension in self.dimensions.items():
+            dimension.merge(other.dimensions[name])
+        return self
+
+    def top(self, dimension, k=10, by="count"):
+        """[(value, total, error)] for the k most used (by='count') or most spent-at (by='spend') values"""
+        summaries = self.dimensions[dimension]
+        summary, sketch = (summaries.by_count, summaries.counts) if by == "count" else \
+            (summaries.by_spend, summaries.spend)
+        ranked = []
+        for value, total, error in summary.top(k):
+            bound = min(total, sketch.estimate(value))
+            ranked.append((value, bound, max(0, bound - (total - error))))
+        ranked.sort(key=lambda entry: (-entry[1], entry[0]))
+        if by == "spend":
+            return [(value, total / 100, error / 100) for value, total, error in ranked]
+        return ranked
+
+    def most_used(self, dimension):
+        """The most frequent value of a dimension, None when empty"""
+        top = self.top(dimension, 1)
+        return top[0][0] if top else None
+
+    def frequency(self, dimension, value):
+        """Estimated number of transactions with value (never an underestimate)"""
+        return self.dimensions[dimension].counts.estimate(value)
+
+    def spend_at(self, dimension, value):
+        """Estimated spend with value in currency units (never an underestimate)"""
+        return self.dimensions[dimension].spend.estimate(value) / 100
+
+    def to_dict(self):
+        return {"count": self.count, "spend": self.spend,
+                "sizes": [self.capacity, self.width, self.depth],
+                "dimensions": {name: {"by_count": d.by_count.to_dict(), "by_spend": d.by_spend.to_dict(),
+                                      "counts": d.counts.to_dict(), "spend": d.spend.to_dict()}
+                               for name, d in self.dimensions.items()}}
+
+    @classmethod
+    def from_dict(cls, data):
+        capacity, width, depth = data["sizes"]
+        stats = cls(capacity, width, depth)
+        stats.count, stats.spend = data["count"], data["spend"]
+        for name, parts in data["dimensions"].items():
+            dimension = stats.dimensions[name]
+            dimension.by_count = SpaceSaving.from_dict(parts["by_count"])
+            dimension.by_spend = SpaceSaving.from_dict(parts["by_spend"])
+            dimension.counts = CountMinSketch.from_dict(parts["counts"])
+            dimension.spend = CountMinSketch.from_dict(parts["spend"])
+        return stats
+
+
+def merge_usage_stats(parts, **sizes):
+    """One UsageStats for several (e.g. monthly) ones"""
+    merged = UsageStats(**sizes)
+    for part in parts:
+        merged.merge(part)
+    return merged